@@ -0,0 +1,73 @@
+"""
+Учёт активности пользователей.
+
+Время последнего запроса (`last_seen`) не пишется в базу данных на каждый запрос:
+оно копится в Redis в хэше `accounts:activity:last_seen` (id пользователя ->
+unix-время), а задача `flush_user_activity` периодически сохраняет его пачками.
+Если Redis недоступен, время пишется в базу данных сразу.
+
+`last_login` сюда не входит: от него зависят токены сброса пароля
+(`PasswordResetTokenGenerator`), поэтому его сразу сохраняет `update_last_login`.
+"""
+
+import logging
+from datetime import datetime, timezone
+
+from redis import RedisError
+
+from django.conf import settings
+
+from accounts.models import User
+from config.redis import redis_connection
+
+ACTIVITY_FIELDS = ('last_seen', )
+
+logger = logging.getLogger(__name__)
+
+
+def _activity_key(field: str) -> str:
+    return f'accounts:activity:{field}'
+
+
+def record_user_activity(user_id: int) -> None:
+    """Запомнить, что пользователь `user_id` только что сделал запрос."""
+    now = datetime.now(tz=timezone.utc)
+    try:
+        pipeline = redis_connection.pipeline(transaction=False)
+        for field in ACTIVITY_FIELDS:
+            pipeline.hset(_activity_key(field), user_id, int(now.timestamp()))
+        pipeline.execute()
+    except RedisError:
+        logger.warning('Redis is unavailable, saving activity of user %s directly', user_id)
+        User.objects.filter(pk=user_id).update(**{field: now for field in ACTIVITY_FIELDS})
+
+
+def _take_activity(field: str) -> tuple[str, dict[int, datetime]]:
+    """
+    Забрать накопленные значения `field`. Хэш атомарно переименовывается, и новые
+    записи идут в новый хэш. Если прошлое сохранение упало, сначала повторяется оно.
+    """
+    key = _activity_key(field)
+    flushing_key = f'{key}:flushing'
+    if not redis_connection.exists(flushing_key) and redis_connection.exists(key):
+        redis_connection.rename(key, flushing_key)
+    values = {
+        int(user_id): datetime.fromtimestamp(int(timestamp), tz=timezone.utc)
+        for user_id, timestamp in redis_connection.hgetall(flushing_key).items()
+    }
+    return flushing_key, values
+
+
+def flush_user_activity() -> dict[str, int]:
+    """Сохранить накопленные входы и активность пользователей в базу данных."""
+    flushed = {}
+    for field in ACTIVITY_FIELDS:
+        flushing_key, values = _take_activity(field)
+        User.objects.bulk_update(
+            [User(pk=user_id, **{field: moment}) for user_id, moment in values.items()],
+            [field],
+            batch_size=settings.USER_ACTIVITY_FLUSH_BATCH_SIZE,
+        )
+        redis_connection.delete(flushing_key)
+        flushed[field] = len(values)
+    return flushed
@@ -1,11 +1,22 @@
+from pathlib import Path
+
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.models import Group
-from django.urls import reverse
+from django.contrib.sites.shortcuts import get_current_site
+from django.core.exceptions import PermissionDenied
+from django.core.files.storage import default_storage
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
 from django.utils.safestring import mark_safe
 
-from accounts.forms import AdminUserChangeForm, SignUpForm
+from accounts.forms import AdminUserChangeForm, SignUpForm, UserImportForm
 from accounts.models import Profile, User
+from accounts.tasks import import_users_in_background
+from common.jobs import create_admin_job
+from common.mixins import ReplicaChangelistAdminMixin
+from common.pagination import EstimatedCountPaginator
 
 admin.site.unregister(Group)
 
@@ -15,7 +26,7 @@ class ProfileInline(admin.StackedInline):
 
 
 @admin.register(User)
-class UserAdmin(UserAdmin):
+class UserAdmin(ReplicaChangelistAdminMixin, UserAdmin):
     inlines = [ProfileInline]
     list_display = (
         'email',
@@ -28,11 +39,13 @@ class UserAdmin(UserAdmin):
         'email',
         'name',
         'surname',
+        'patronymic',
     )
     readonly_fields = (
         'id',
         'date_joined',
         'last_login',
+        'last_seen',
     )
     ordering = ('surname', )
     list_filter = (
@@ -42,6 +55,8 @@ class UserAdmin(UserAdmin):
         'is_email_confirmed',
         'role',
     )
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     form = AdminUserChangeForm
     fieldsets = (
@@ -78,6 +93,7 @@ class UserAdmin(UserAdmin):
             {
                 'fields': (
                     'last_login',
+                    'last_seen',
                     'date_joined',
                 ),
             },
@@ -112,9 +128,52 @@ class UserAdmin(UserAdmin):
 
     get_profile_admin_link.short_description = 'Ссылка на профиль в панели администратора'
 
+    change_list_template = 'admin/accounts/user/change_list.html'
+
+    def get_urls(self):
+        return [
+            path(
+                'import/',
+                self.admin_site.admin_view(self.import_users_view),
+                name='accounts_user_import',
+            ),
+        ] + super(UserAdmin, self).get_urls()
+
+    def import_users_view(self, request):
+        """Загрузить файл и импортировать из него пользователей фоновой задачей."""
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        form = UserImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            title = 'Импорт пользователей'
+            job_id = create_admin_job(user_id=request.user.pk, title=title, total=0)
+            upload = form.cleaned_data['file']
+            file = default_storage.save(
+                f'admin_jobs/{job_id}{Path(upload.name).suffix.lower()}',
+                upload,
+            )
+            import_users_in_background.delay(
+                job_id=job_id,
+                file=file,
+                send_activation_emails=form.cleaned_data['send_activation_emails'],
+                domain=get_current_site(request).domain,
+                scheme=request.scheme,
+            )
+            return redirect('admin_job', job_id=job_id)
+        return TemplateResponse(
+            request,
+            'admin/accounts/user/import_users.html',
+            context={
+                **self.admin_site.each_context(request),
+                'title': 'Импорт пользователей',
+                'opts': self.model._meta,
+                'form': form,
+            },
+        )
+
 
 @admin.register(Profile)
-class ProfileAdmin(admin.ModelAdmin):
+class ProfileAdmin(ReplicaChangelistAdminMixin, admin.ModelAdmin):
     list_display = (
         '__str__',
         'date_of_birth',
@@ -129,6 +188,9 @@ class ProfileAdmin(admin.ModelAdmin):
         'user__surname',
     )
     list_filter = ('year_of_study', )
+    list_select_related = ('user', )
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     def get_user_admin_link(self, obj: User):
         return mark_safe(
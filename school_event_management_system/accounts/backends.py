@@ -0,0 +1,30 @@
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import PermissionDenied
+
+from accounts.models import User
+
+
+class ProfileModelBackend(ModelBackend):
+    """
+    `ModelBackend`, загружающий `request.user` вместе с профилем одним запросом:
+    почти каждая страница обращается к `user.profile`.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        user = super(ProfileModelBackend, self).authenticate(
+            request,
+            username=username,
+            password=password,
+            **kwargs,
+        )
+        if user is None:
+            # Не проверять пароль ещё раз в `ModelBackend`, оставленном для старых сессий
+            raise PermissionDenied
+        return user
+
+    def get_user(self, user_id):
+        try:
+            user = User.objects.with_profile().get(pk=user_id)
+        except User.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
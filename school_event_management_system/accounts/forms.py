@@ -14,12 +14,13 @@ from django.contrib.auth.forms import (
     UserCreationForm,
 )
 from django.core.exceptions import ValidationError
-from django.core.validators import RegexValidator
+from django.core.validators import FileExtensionValidator, RegexValidator
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from accounts.models import Profile, User
 from accounts.tasks import send_password_reset_code
+from common.imports import TABLE_FILE_EXTENSIONS
 
 
 class SignUpForm(UserCreationForm):
@@ -66,6 +67,7 @@ class SignUpForm(UserCreationForm):
         required=False,
     )
 
+    # Уникальность почты проверяет сама модельная форма, здесь задан только текст ошибки
     email = forms.EmailField(
         widget=forms.EmailInput(
             attrs={
@@ -73,6 +75,9 @@ class SignUpForm(UserCreationForm):
                 'autocomplete': 'username',
             },
         ),
+        error_messages={
+            'unique': _('Пользователь с такой почтой уже существует.'),
+        },
     )
 
     name = forms.CharField(
@@ -150,14 +155,6 @@ class SignUpForm(UserCreationForm):
         self.fields['password1'].label = '*Пароль'
         self.fields['password2'].label = '*Подтверждение пароля'
 
-    def clean_email(self):
-        email = self.cleaned_data.get('email')
-        if User.objects.filter(email=email).exists():
-            raise forms.ValidationError(
-                _('Пользователь с такой почтой уже существует.'),
-            )
-        return email
-
     def clean_year_of_study(self):
         year_of_study = self.cleaned_data.get('year_of_study')
         if year_of_study is None and year_of_study == '-----':
@@ -351,3 +348,48 @@ class ProfileForm(forms.ModelForm):
                     code='underage',
                 )
         return date_of_birth
+
+
+class UserImportRowForm(forms.Form):
+    """Проверка одной строки файла импорта пользователей (без запросов к базе данных)."""
+
+    email = forms.EmailField(max_length=60)
+    surname = forms.CharField(max_length=30)
+    name = forms.CharField(max_length=30)
+    patronymic = forms.CharField(max_length=30, required=False)
+    role = forms.ChoiceField(
+        choices=User.RoleChoices.choices,
+        required=False,
+    )
+    phone_number = PhoneNumberField(
+        required=False,
+        validators=[SignUpForm.phone_regex],
+    )
+    school = forms.CharField(max_length=255, required=False)
+    year_of_study = forms.IntegerField(min_value=1, max_value=11, required=False)
+    password = forms.CharField(required=False)
+
+    def clean_role(self):
+        return self.cleaned_data['role'] or User.RoleChoices.STUDENT
+
+    def clean_school(self):
+        return self.cleaned_data['school'] or environ.get('SCHOOL_NAME')
+
+
+class UserImportForm(forms.Form):
+    """Форма загрузки файла импорта пользователей (используется в админ-панели)."""
+
+    file = forms.FileField(
+        label='Файл',
+        validators=[FileExtensionValidator(TABLE_FILE_EXTENSIONS)],
+        help_text=(
+            'CSV или XLSX с заголовком. Столбцы: email, surname, name, patronymic, role, '
+            'phone_number, school, year_of_study, password (или почта, фамилия, имя, отчество, '
+            'роль, телефон, школа, класс, пароль). Обязательны почта, фамилия и имя.'
+        ),
+    )
+    send_activation_emails = forms.BooleanField(
+        label='Отправить письма для подтверждения почты',
+        required=False,
+        initial=True,
+    )
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.contrib.auth.hashers import ScryptPasswordHasher
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """
+    scrypt с параметрами из настроек (`PASSWORD_SCRYPT_*`), подобранными командой
+    `calibrate_password_hasher` под наши серверы.
+
+    Хэши с другими параметрами и хэши PBKDF2 пересчитываются при входе пользователя.
+    """
+
+    @property
+    def work_factor(self) -> int:
+        return settings.PASSWORD_SCRYPT_WORK_FACTOR
+
+    @property
+    def block_size(self) -> int:
+        return settings.PASSWORD_SCRYPT_BLOCK_SIZE
+
+    @property
+    def parallelism(self) -> int:
+        return settings.PASSWORD_SCRYPT_PARALLELISM
+
+    @property
+    def maxmem(self) -> int:
+        # Только ограничение OpenSSL (по умолчанию 32 Мб), а не выделяемая память. С запасом,
+        # чтобы проверялись и хэши, созданные с параметрами до уменьшения настроек
+        return max(256 * self.work_factor * self.block_size * self.parallelism, 2 ** 27)
@@ -0,0 +1,159 @@
+"""
+Массовый импорт пользователей из CSV или XLSX.
+
+Файл обрабатывается частями по `USER_IMPORT_CHUNK_SIZE` строк: строки каждой части
+проверяются формой, уже занятые почты ищутся одним запросом, пароли хэшируются
+в пуле процессов, а `User` и `Profile` создаются через `bulk_create`.
+"""
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import current_process
+from os import environ
+from typing import Callable, Iterable
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from accounts.forms import UserImportRowForm
+from accounts.models import Profile, User, UserManager
+from accounts.tasks import send_email_verification_codes
+from common.imports import batched
+from common.jobs import chunked
+
+USER_IMPORT_COLUMN_ALIASES = {
+    'почта': 'email',
+    'фамилия': 'surname',
+    'имя': 'name',
+    'отчество': 'patronymic',
+    'роль': 'role',
+    'телефон': 'phone_number',
+    'школа': 'school',
+    'класс': 'year_of_study',
+    'пароль': 'password',
+}
+
+
+@dataclass
+class UserImportResult:
+    created: int = 0
+    errors: list[tuple[int, str]] = field(default_factory=list)
+
+    def summary(self, max_errors: int = 10) -> str:
+        lines = [f'Создано пользователей: {self.created}, строк с ошибками: {len(self.errors)}']
+        lines += [f'строка {number}: {error}' for number, error in self.errors[:max_errors]]
+        if len(self.errors) > max_errors:
+            lines.append('…')
+        return '; '.join(lines)
+
+
+def _get_hashing_executor(workers: int | None) -> Executor:
+    # Процессы воркеров Celery - демоны и не могут запускать дочерние процессы.
+    # hashlib освобождает GIL при хэшировании, поэтому там хватает потоков
+    if current_process().daemon:
+        return ThreadPoolExecutor(max_workers=workers)
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def _format_form_errors(form: UserImportRowForm) -> str:
+    return ', '.join(
+        f'{name}: {" ".join(errors)}' for name, errors in form.errors.items()
+    )
+
+
+def _import_users_chunk(
+        rows: list[tuple[int, dict[str, str]]],
+        executor: Executor,
+        seen_emails: set[str],
+        result: UserImportResult,
+) -> list[User]:
+    valid_rows = []
+    for number, row in rows:
+        form = UserImportRowForm(data=row)
+        if not form.is_valid():
+            result.errors.append((number, _format_form_errors(form)))
+            continue
+        data = form.cleaned_data
+        data['email'] = UserManager.normalize_email(data['email'])
+        if data['email'].lower() in seen_emails:
+            result.errors.append((number, 'почта повторяется в файле'))
+            continue
+        seen_emails.add(data['email'].lower())
+        valid_rows.append((number, data))
+
+    existing_emails = set(
+        User.objects.filter(
+            email__in=[data['email'] for _, data in valid_rows],
+        ).values_list('email', flat=True),
+    )
+    new_rows = []
+    for number, data in valid_rows:
+        if data['email'] in existing_emails:
+            result.errors.append((number, 'пользователь с такой почтой уже существует'))
+        else:
+            new_rows.append(data)
+    if not new_rows:
+        return []
+
+    passwords = executor.map(make_password, [data['password'] or None for data in new_rows])
+    users = [
+        User(
+            email=data['email'],
+            surname=data['surname'],
+            name=data['name'],
+            patronymic=data['patronymic'],
+            role=data['role'],
+            password=password,
+        )
+        for data, password in zip(new_rows, passwords)
+    ]
+    with transaction.atomic():
+        # `bulk_create` не вызывает `post_save`, поэтому профили создаются здесь же
+        users = User.objects.bulk_create(users)
+        Profile.objects.bulk_create(
+            [
+                Profile(
+                    user=user,
+                    phone_number=data['phone_number'] or '',
+                    school=data['school'],
+                    from_current_school=data['school'] == environ.get('SCHOOL_NAME'),
+                    year_of_study=data['year_of_study'],
+                )
+                for user, data in zip(users, new_rows)
+            ],
+        )
+    result.created += len(users)
+    return users
+
+
+def import_users(
+        rows: Iterable[tuple[int, dict[str, str]]],
+        send_activation_emails: bool = False,
+        domain: str = '',
+        scheme: str = 'https',
+        hash_workers: int | None = None,
+        on_chunk: Callable[[int], None] | None = None,
+) -> UserImportResult:
+    """
+    Создать пользователей из строк `rows` (см. `common.imports.iter_table_rows`).
+
+    Строки с ошибками и уже занятыми почтами пропускаются и попадают в `errors`
+    результата. Письма для подтверждения почты ставятся в очередь пачками по
+    `USER_IMPORT_EMAIL_BATCH_SIZE`. `on_chunk(rows_count)` вызывается после каждой части.
+    """
+    result = UserImportResult()
+    seen_emails = set()
+    with _get_hashing_executor(hash_workers) as executor:
+        for rows_chunk in batched(rows, settings.USER_IMPORT_CHUNK_SIZE):
+            users = _import_users_chunk(rows_chunk, executor, seen_emails, result)
+            if send_activation_emails:
+                for users_batch in chunked(users, settings.USER_IMPORT_EMAIL_BATCH_SIZE):
+                    send_email_verification_codes.delay(
+                        domain=domain,
+                        scheme=scheme,
+                        user_ids=[user.pk for user in users_batch],
+                    )
+            if on_chunk:
+                on_chunk(len(rows_chunk))
+    return result
@@ -0,0 +1,74 @@
+import statistics
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from accounts.hashers import TunedScryptPasswordHasher
+
+
+class Command(BaseCommand):
+    """
+    Command for choosing scrypt parameters of `TunedScryptPasswordHasher`.\n
+
+    Measures hashing time on the current machine for growing work factors and
+    picks the largest one that fits into the time and memory budget. Run it on
+    a production VM and put the printed values into the environment.
+    """
+
+    help = 'Benchmark scrypt work factors and print the recommended password hasher settings'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            '--target-ms',
+            type=int,
+            default=100,
+            help='Maximum median time of one hash in milliseconds (default 100)',
+        )
+        parser.add_argument(
+            '--max-memory-mb',
+            type=int,
+            default=32,
+            help='Maximum memory of one hash in megabytes (default 32)',
+        )
+        parser.add_argument(
+            '--block-size',
+            type=int,
+            default=8,
+            help='scrypt block size r (default 8)',
+        )
+        parser.add_argument(
+            '--rounds',
+            type=int,
+            default=5,
+            help='Number of hashes measured for every work factor (default 5)',
+        )
+
+    def handle(self, *args: Any, **kwargs: Any) -> None:
+        block_size = kwargs['block_size']
+        hasher = TunedScryptPasswordHasher()
+        salt = hasher.salt()
+        best = None
+        work_factor = 2 ** 10
+        while 128 * work_factor * block_size <= kwargs['max_memory_mb'] * 1024 * 1024:
+            timings = []
+            for _ in range(kwargs['rounds']):
+                started = time.perf_counter()
+                hasher.encode('calibration password', salt, n=work_factor, r=block_size, p=1)
+                timings.append((time.perf_counter() - started) * 1000)
+            median = statistics.median(timings)
+            memory = 128 * work_factor * block_size / 1024 / 1024
+            power = work_factor.bit_length() - 1
+            self.stdout.write(f'N=2**{power}: {median:.1f} ms, {memory:g} MB')
+            if median > kwargs['target_ms']:
+                break
+            best = work_factor
+            work_factor *= 2
+
+        if best is None:
+            self.stderr.write('Even the smallest work factor is slower than the target')
+            return
+        self.stdout.write(self.style.SUCCESS('Recommended environment:'))
+        self.stdout.write(f'PASSWORD_SCRYPT_WORK_FACTOR={best}')
+        self.stdout.write(f'PASSWORD_SCRYPT_BLOCK_SIZE={block_size}')
+        self.stdout.write('PASSWORD_SCRYPT_PARALLELISM=1')
@@ -0,0 +1,74 @@
+from os import environ
+from pathlib import Path
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.imports import USER_IMPORT_COLUMN_ALIASES, import_users
+from common.imports import UnsupportedFileFormatError, iter_table_rows
+
+
+class Command(BaseCommand):
+    """
+    Command for creating users from a CSV or XLSX file.\n
+
+    The file needs a header row with `email`, `surname`, `name` and optional
+    `patronymic`, `role`, `phone_number`, `school`, `year_of_study`, `password`
+    columns (Russian names from the admin upload form work too). Rows with
+    errors or already registered emails are skipped and reported.
+    """
+
+    help = 'Import users with profiles from a CSV or XLSX file'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            'path',
+            help='Path to a .csv or .xlsx file',
+        )
+        parser.add_argument(
+            '--send-activation-emails',
+            action='store_true',
+            help='Queue email confirmation letters for created users',
+        )
+        parser.add_argument(
+            '--domain',
+            default=environ.get('DOMAIN', ''),
+            help='Domain used in email confirmation links (default $DOMAIN)',
+        )
+        parser.add_argument(
+            '--scheme',
+            default='https',
+            help='Scheme used in email confirmation links (default https)',
+        )
+        parser.add_argument(
+            '--hash-workers',
+            type=int,
+            default=None,
+            help='Number of processes hashing passwords (default number of CPUs)',
+        )
+
+    def handle(self, *args: Any, **kwargs: Any) -> None:
+        path = Path(kwargs['path'])
+        if not path.is_file():
+            raise CommandError(f'File {path} does not exist')
+
+        with open(path, 'rb') as table:
+            try:
+                result = import_users(
+                    iter_table_rows(table, path.name, aliases=USER_IMPORT_COLUMN_ALIASES),
+                    send_activation_emails=kwargs['send_activation_emails'],
+                    domain=kwargs['domain'],
+                    scheme=kwargs['scheme'],
+                    hash_workers=kwargs['hash_workers'],
+                    on_chunk=lambda rows_count: self.stdout.write(f'Processed {rows_count} rows'),
+                )
+            except UnsupportedFileFormatError:
+                raise CommandError('Only .csv and .xlsx files are supported')
+
+        for number, error in result.errors:
+            self.stderr.write(f'Row {number}: {error}')
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Created {result.created} users, skipped {len(result.errors)} rows',
+            ),
+        )
@@ -6,6 +6,10 @@ class UserManager(BaseUserManager):
 
     use_in_migrations = True
 
+    def with_profile(self):
+        """Пользователи вместе с профилем (одним запросом), для мест, где нужен `user.profile`."""
+        return self.get_queryset().select_related('profile')
+
     def create_user(
             self,
             email: str,
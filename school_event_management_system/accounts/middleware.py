@@ -0,0 +1,17 @@
+from typing import Callable
+
+from django.http import HttpRequest, HttpResponse
+
+from accounts.activity import record_user_activity
+
+
+class UserActivityMiddleware:
+    """Запоминает время последнего запроса пользователя (см. `accounts.activity`)."""
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if request.user.is_authenticated:
+            record_user_activity(request.user.pk)
+        return self.get_response(request)
@@ -0,0 +1,43 @@
+from django.db import migrations
+
+TRIGRAM_INDEXED_COLUMNS = (
+    'email',
+    'name',
+    'surname',
+    'patronymic',
+)
+
+
+def add_trigram_indexes(apps, schema_editor):
+    """
+    Добавить GIN индексы pg_trgm по `UPPER(column)` для поиска пользователей.
+
+    Django компилирует `icontains` и `istartswith` на PostgreSQL в `UPPER(column) LIKE UPPER(%s)`,
+    поэтому индексируется именно это выражение. Только для PostgreSQL.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in TRIGRAM_INDEXED_COLUMNS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS accounts_user_{column}_trgm_idx '
+            f'ON accounts_user USING GIN (UPPER("{column}"::text) gin_trgm_ops)',
+        )
+
+
+def remove_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in TRIGRAM_INDEXED_COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS accounts_user_{column}_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_alter_profile_from_current_school_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_trigram_indexes, remove_trigram_indexes),
+    ]
@@ -39,9 +39,16 @@ class User(AbstractBaseUser, PermissionsMixin):
         verbose_name=_('дата присоединения'),
         auto_now_add=True,
     )
+    # Вход и активность копятся в Redis и сохраняются пачками задачей `flush_user_activity`
     last_login = models.DateTimeField(
         verbose_name=_('последний вход в систему'),
-        auto_now=True,
+        blank=True,
+        null=True,
+    )
+    last_seen = models.DateTimeField(
+        verbose_name=_('последняя активность'),
+        blank=True,
+        null=True,
     )
 
     class RoleChoices(models.TextChoices):
@@ -87,6 +94,13 @@ class User(AbstractBaseUser, PermissionsMixin):
     class Meta:
         verbose_name = _('пользователь')
         verbose_name_plural = _('пользователи')
+        indexes = [
+            # Поиск пользователя по ФИО (`get_user_by_fio`, `get_users_by_fios`)
+            models.Index(
+                fields=['surname', 'name', 'patronymic'],
+                name='user_fio_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.surname} {self.name}'
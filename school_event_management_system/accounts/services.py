@@ -1,6 +1,9 @@
 from os import environ
+from typing import Iterable
 
+from django.conf import settings
 from django.contrib.auth.models import Group
+from django.db import transaction
 from django.db.models import Q, QuerySet
 from django.shortcuts import get_object_or_404
 from django.template.loader import get_template, render_to_string
@@ -10,7 +13,12 @@ from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 from accounts.models import Profile, User, UserManager
 from accounts.tasks import send_email_verification_code
 from accounts.tokens import account_activation_token
-from common.services import is_cooldown_ended, set_key_with_timeout
+from common.services import (
+    get_json_value,
+    is_cooldown_ended,
+    set_json_value_with_timeout,
+    set_key_with_timeout,
+)
 from mailings.services import send_email_with_attachments
 
 
@@ -127,13 +135,13 @@ def get_user_by_fio(fio: str) -> User | None:
         return None
     try:
         if len(fio_list) == 3:
-            return User.objects.filter(
+            return User.objects.with_profile().filter(
                 Q(surname=fio_list[0]) &
                 Q(name=fio_list[1]) &
                 Q(patronymic=fio_list[2]),
             ).first()
         else:
-            return User.objects.filter(
+            return User.objects.with_profile().filter(
                 Q(surname=fio_list[0]) &
                 Q(name=fio_list[1]),
             ).first()
@@ -141,6 +149,86 @@ def get_user_by_fio(fio: str) -> User | None:
         return None
 
 
+def _split_fio(fio: str) -> list[str]:
+    return ' '.join(fio.strip().split()).split(' ')
+
+
+def get_users_by_fios(fios: Iterable[str]) -> dict[str, User]:
+    """
+    Найти пользователей сразу для нескольких ФИО одним запросом.
+
+    Правила те же, что у `get_user_by_fio`: из трёх слов ФИО ищется полное
+    совпадение, из двух и более четырёх - совпадение фамилии и имени. Вернуть
+    словарь ФИО (с нормализованными пробелами) -> пользователь для найденных ФИО.
+    """
+    conditions = Q()
+    fio_keys = {}
+    for fio in fios:
+        words = _split_fio(fio or '')
+        if len(words) < 2:
+            continue
+        key = tuple(words) if len(words) == 3 else tuple(words[:2])
+        fio_keys[' '.join(words)] = key
+        if len(key) == 3:
+            conditions |= Q(surname=key[0], name=key[1], patronymic=key[2])
+        else:
+            conditions |= Q(surname=key[0], name=key[1])
+    if not fio_keys:
+        return {}
+
+    users = {}
+    # Как и `.first()` в `get_user_by_fio`, из однофамильцев выбирается первый по `pk`
+    for user in User.objects.with_profile().filter(conditions).order_by('-pk'):
+        users[(user.surname, user.name, user.patronymic)] = user
+        users[(user.surname, user.name)] = user
+    return {fio: users[key] for fio, key in fio_keys.items() if key in users}
+
+
+def _fio_suggestions_cache_key(prefix: str, role: str) -> str:
+    return f'accounts:fio_autocomplete:{role or "any"}:{prefix.lower()}'
+
+
+def get_user_fio_suggestions(prefix: str, role: str = '', limit: int = 10) -> list[str]:
+    """
+    Вернуть до `limit` ФИО пользователей, начинающихся с `prefix` (с ролью `role`, если указана).
+
+    Слова `prefix` сопоставляются по порядку с фамилией, именем и отчеством.
+    Результат кэшируется в Redis по префиксу на `FIO_AUTOCOMPLETE_CACHE_SECONDS`.
+    """
+    words = prefix.split()[:3]
+    if not words or len(' '.join(words)) < settings.FIO_AUTOCOMPLETE_MIN_LENGTH:
+        return []
+    prefix = ' '.join(words)
+    cache_key = _fio_suggestions_cache_key(prefix=prefix, role=role)
+    suggestions = get_json_value(cache_key)
+    if suggestions is not None:
+        return suggestions
+
+    users = User.objects.all()
+    if role:
+        users = users.filter(role=role)
+    for field_name, word in zip(('surname', 'name', 'patronymic'), words):
+        users = users.filter(**{f'{field_name}__istartswith': word})
+    suggestions = [
+        ' '.join(fio)
+        for fio in users.order_by(
+            'surname',
+            'name',
+            'patronymic',
+        ).values_list(
+            'surname',
+            'name',
+            'patronymic',
+        ).distinct()[:limit]
+    ]
+    set_json_value_with_timeout(
+        cache_key,
+        settings.FIO_AUTOCOMPLETE_CACHE_SECONDS,
+        suggestions,
+    )
+    return suggestions
+
+
 def is_user_with_fio_exist(fio: str) -> bool:
     fio_list = ' '.join(fio.strip().split()).split(' ')
     if len(fio_list) < 2:
@@ -173,15 +261,26 @@ def get_user_by_id(id: int) -> User:
         return None
 
 
-def set_profile_values_after_user_registration(
-        profile: Profile,
+def create_user_with_profile(
+        user: User,
         phone_number,
-        school,
-        year_of_study,
-):
-    profile.phone_number = phone_number
-    if school != environ.get('SCHOOL_NAME'):
-        profile.from_current_school = False
-    profile.school = school
-    profile.year_of_study = year_of_study
-    profile.save()
+        school: str,
+        year_of_study: int | None,
+) -> User:
+    """
+    Сохранить нового пользователя `user` (например, из `SignUpForm.save(commit=False)`)
+    вместе с заполненным профилем одной транзакцией: два INSERT без последующего UPDATE.
+
+    Профиль присваивается пользователю до сохранения, поэтому сигнал `create_user_profile`
+    не создаёт пустой профиль.
+    """
+    user.profile = Profile(
+        phone_number=phone_number,
+        school=school,
+        from_current_school=school == environ.get('SCHOOL_NAME'),
+        year_of_study=year_of_study,
+    )
+    with transaction.atomic():
+        user.save()
+        user.profile.save()
+    return user
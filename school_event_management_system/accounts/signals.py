@@ -1,10 +1,18 @@
+from django.contrib.auth.signals import user_logged_in
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
+from accounts.activity import record_user_activity
 from accounts.models import Profile, User
 
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
-    if created:
+    # Профиль, присвоенный до сохранения (см. `create_user_with_profile`), сохраняет сервис
+    if created and not User.profile.is_cached(instance):
         Profile.objects.create(user=instance)
+
+
+@receiver(user_logged_in)
+def record_user_login(sender, request, user, **kwargs):
+    record_user_activity(user.pk)
@@ -1,22 +1,119 @@
+from pathlib import Path
+from smtplib import SMTPException
+
 from celery import shared_task
+from celery.utils.time import get_exponential_backoff_interval
 
+from django.conf import settings
 
-@shared_task
+from common.idempotency import (
+    EMAIL_REQUEST_DEDUPLICATION_TIMEOUT,
+    deduplicate,
+    get_email_deduplication_key,
+)
+from common.jobs import (
+    ADMIN_JOB_SOFT_TIME_LIMIT,
+    ADMIN_JOB_TIME_LIMIT,
+    advance_admin_job,
+    fail_admin_job,
+    finish_admin_job,
+    set_admin_job_total,
+)
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=(SMTPException, OSError),
+    max_retries=5,
+    retry_backoff=10,
+    retry_backoff_max=60 * 10,  # Десять минут в секундах
+    retry_jitter=True,
+    rate_limit='120/m',
+    soft_time_limit=30,
+    time_limit=60,
+)
 def send_email_verification_code(
+        self,
         domain: str,
         scheme: str,
         user_id: int | str,
 ) -> None:
     from .services import send_verification_email
-    send_verification_email(
-        domain=domain,
-        scheme=scheme,
-        user_id=user_id,
-    )
 
+    key = get_email_deduplication_key('account_activation', user_id, object_id=user_id)
+    with deduplicate(
+        key,
+        owner=self.request.id,
+        timeout=EMAIL_REQUEST_DEDUPLICATION_TIMEOUT,
+    ) as should_send:
+        if should_send:
+            send_verification_email(
+                domain=domain,
+                scheme=scheme,
+                user_id=user_id,
+            )
 
-@shared_task
+
+@shared_task(
+    bind=True,
+    max_retries=5,
+    soft_time_limit=60 * 5,  # 5 минут в секундах
+    time_limit=60 * 6,  # 6 минут в секундах
+)
+def send_email_verification_codes(
+        self,
+        domain: str,
+        scheme: str,
+        user_ids: list[int],
+) -> None:
+    """
+    Отправить письма для подтверждения почты пачке импортированных пользователей.
+
+    При ошибке отправки задача повторяется с экспоненциальной задержкой (до часа)
+    только для пользователей, начиная с того, чьё письмо не ушло.
+    """
+    from .services import send_verification_email
+
+    for index, user_id in enumerate(user_ids):
+        key = get_email_deduplication_key('account_activation', user_id, object_id=user_id)
+        try:
+            with deduplicate(
+                key,
+                owner=self.request.id,
+                timeout=EMAIL_REQUEST_DEDUPLICATION_TIMEOUT,
+            ) as should_send:
+                if should_send:
+                    send_verification_email(
+                        domain=domain,
+                        scheme=scheme,
+                        user_id=user_id,
+                    )
+        except (SMTPException, OSError) as error:
+            raise self.retry(
+                exc=error,
+                kwargs={'domain': domain, 'scheme': scheme, 'user_ids': user_ids[index:]},
+                countdown=get_exponential_backoff_interval(
+                    factor=60,
+                    retries=self.request.retries,
+                    maximum=60 * 60,  # Один час в секундах
+                    full_jitter=True,
+                ),
+            )
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=(SMTPException, OSError),
+    max_retries=5,
+    retry_backoff=10,
+    retry_backoff_max=60 * 10,  # Десять минут в секундах
+    retry_jitter=True,
+    rate_limit='120/m',
+    soft_time_limit=30,
+    time_limit=60,
+)
 def send_password_reset_code(
+        self,
         subject_template_name: str,
         email_template_name: str,
         context: dict,
@@ -26,12 +123,63 @@ def send_password_reset_code(
 ) -> None:
     from .services import _send_password_reset_email, get_user_by_pk
 
-    context['user'] = get_user_by_pk(pk=context['user'])
-    _send_password_reset_email(
-        subject_template_name=subject_template_name,
-        email_template_name=email_template_name,
-        context=context,
-        from_email=from_email,
-        to_email=to_email,
-        html_email_template_name=html_email_template_name,
-    )
+    key = get_email_deduplication_key('password_reset', to_email, object_id=context['user'])
+    with deduplicate(
+        key,
+        owner=self.request.id,
+        timeout=EMAIL_REQUEST_DEDUPLICATION_TIMEOUT,
+    ) as should_send:
+        if should_send:
+            context['user'] = get_user_by_pk(pk=context['user'])
+            _send_password_reset_email(
+                subject_template_name=subject_template_name,
+                email_template_name=email_template_name,
+                context=context,
+                from_email=from_email,
+                to_email=to_email,
+                html_email_template_name=html_email_template_name,
+            )
+
+
+@shared_task
+def flush_user_activity() -> None:
+    """Сохранить накопленную в Redis активность пользователей (запускается Celery beat)."""
+    from . import activity
+
+    activity.flush_user_activity()
+
+
+@shared_task(
+    soft_time_limit=ADMIN_JOB_SOFT_TIME_LIMIT,
+    time_limit=ADMIN_JOB_TIME_LIMIT,
+)
+def import_users_in_background(
+        job_id: str,
+        file: str,
+        send_activation_emails: bool,
+        domain: str,
+        scheme: str,
+) -> None:
+    """Импортировать пользователей из файла `file` (путь относительно `MEDIA_ROOT`)."""
+    from common.imports import iter_table_rows
+
+    from .imports import USER_IMPORT_COLUMN_ALIASES, import_users
+
+    path = Path(settings.MEDIA_ROOT) / file
+    try:
+        with open(path, 'rb') as table:
+            set_admin_job_total(job_id, sum(1 for _ in iter_table_rows(table, path.name)))
+        with open(path, 'rb') as table:
+            result = import_users(
+                iter_table_rows(table, path.name, aliases=USER_IMPORT_COLUMN_ALIASES),
+                send_activation_emails=send_activation_emails,
+                domain=domain,
+                scheme=scheme,
+                on_chunk=lambda rows_count: advance_admin_job(job_id, rows_count),
+            )
+    except Exception as error:
+        fail_admin_job(job_id, message=str(error))
+        raise
+    finally:
+        path.unlink(missing_ok=True)
+    finish_admin_job(job_id, message=result.summary())
@@ -0,0 +1,182 @@
+from smtplib import SMTPException
+from unittest import mock
+
+from redis import RedisError
+
+from django.contrib.auth.tokens import default_token_generator
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from accounts import activity, services, tasks
+from accounts.models import User
+from config.redis import redis_connection
+
+
+@override_settings(RATE_LIMIT_ENABLED=False)
+@mock.patch.object(services.send_email_verification_code, 'delay')
+class SignUpViewTestCase(TestCase):
+    data = {
+        'email': 'student@example.com',
+        'phone_number': '+79990000000',
+        'surname': 'Иванов',
+        'name': 'Иван',
+        'patronymic': '',
+        'role': User.RoleChoices.STUDENT,
+        'school': 'Другая школа',
+        'year_of_study': 5,
+        'password1': 'Sign-up-passw0rd',
+        'password2': 'Sign-up-passw0rd',
+    }
+
+    def test_signup_creates_user_with_profile_and_signs_in(self, send_email_verification_code):
+        response = self.client.post(reverse('signup'), self.data)
+
+        self.assertRedirects(response, reverse('events_list'), fetch_redirect_response=False)
+        user = User.objects.with_profile().get(email=self.data['email'])
+        self.assertEqual(user.profile.phone_number, self.data['phone_number'])
+        self.assertEqual(user.profile.school, self.data['school'])
+        self.assertEqual(user.profile.year_of_study, 5)
+        self.assertFalse(user.profile.from_current_school)
+        self.assertEqual(int(self.client.session['_auth_user_id']), user.pk)
+        self.assertEqual(
+            self.client.session['_auth_user_backend'],
+            'accounts.backends.ProfileModelBackend',
+        )
+        send_email_verification_code.assert_called_once()
+
+    def test_signup_queries(self, send_email_verification_code):
+        # Проверка уникальности почты, INSERT пользователя и профиля, проверка ключа
+        # и INSERT сессии и UPDATE `last_login` в `login()`, UPDATE сессии в конце
+        # запроса - 7 запросов. Внутри транзакции `TestCase` каждый `atomic()`
+        # добавляет SAVEPOINT и RELEASE
+        with self.assertNumQueries(13):
+            response = self.client.post(reverse('signup'), self.data)
+
+        self.assertEqual(response.status_code, 302)
+
+    def test_signup_with_taken_email_shows_form(self, send_email_verification_code):
+        User.objects.create_user(email=self.data['email'], password='x', surname='a', name='b')
+
+        response = self.client.post(reverse('signup'), self.data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('email', response.context['form'].errors)
+        self.assertEqual(User.objects.filter(email=self.data['email']).count(), 1)
+        send_email_verification_code.assert_not_called()
+
+
+class UserActivityTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='student@example.com',
+            name='Иван',
+            surname='Иванов',
+            password='Student-passw0rd',
+        )
+
+    def setUp(self):
+        for field in activity.ACTIVITY_FIELDS:
+            redis_connection.delete(f'accounts:activity:{field}')
+
+    def test_sign_in_saves_last_login_at_once(self):
+        # Токен сброса пароля зависит от `last_login` и после входа перестаёт подходить
+        token = default_token_generator.make_token(self.user)
+
+        self.client.force_login(self.user, backend='accounts.backends.ProfileModelBackend')
+
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+        self.assertFalse(default_token_generator.check_token(self.user, token))
+
+        # Сохранение активности пачкой не меняет токен, выданный после входа
+        token = default_token_generator.make_token(self.user)
+        activity.flush_user_activity()
+
+        self.user.refresh_from_db()
+        self.assertTrue(default_token_generator.check_token(self.user, token))
+
+    def test_activity_is_saved_in_batches(self):
+        activity.record_user_activity(self.user.pk)
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.last_seen)
+
+        activity.flush_user_activity()
+
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_seen)
+
+    def test_activity_is_saved_directly_without_redis(self):
+        with mock.patch.object(
+            activity.redis_connection,
+            'pipeline',
+            side_effect=RedisError('Connection refused'),
+        ):
+            with self.assertLogs(activity.logger, 'WARNING'):
+                activity.record_user_activity(self.user.pk)
+
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_seen)
+
+
+@mock.patch.object(services, 'send_verification_email')
+class EmailDeduplicationTestCase(SimpleTestCase):
+    """Повторная постановка того же письма в очередь не отправляет его ещё раз."""
+
+    def setUp(self):
+        keys = redis_connection.keys('common:email:*')
+        if keys:
+            redis_connection.delete(*keys)
+
+    def test_activation_email_is_sent_once(self, send_verification_email):
+        for _ in range(2):
+            tasks.send_email_verification_code.apply(
+                kwargs={'domain': 'example.com', 'scheme': 'https', 'user_id': 1},
+            )
+
+        send_verification_email.assert_called_once_with(
+            domain='example.com',
+            scheme='https',
+            user_id=1,
+        )
+
+    def test_activation_emails_of_other_users_are_sent(self, send_verification_email):
+        for user_id in (1, 2):
+            tasks.send_email_verification_code.apply(
+                kwargs={'domain': 'example.com', 'scheme': 'https', 'user_id': user_id},
+            )
+
+        self.assertEqual(send_verification_email.call_count, 2)
+
+    @mock.patch.object(services, 'get_user_by_pk')
+    @mock.patch.object(services, '_send_password_reset_email')
+    def test_password_reset_email_is_sent_once(
+            self,
+            send_password_reset_email,
+            get_user_by_pk,
+            send_verification_email,
+    ):
+        for _ in range(2):
+            tasks.send_password_reset_code.apply(
+                kwargs={
+                    'subject_template_name': 'subject.txt',
+                    'email_template_name': 'email.html',
+                    'context': {'user': 1},
+                    'from_email': 'school@example.com',
+                    'to_email': 'Student@example.com',
+                },
+            )
+
+        send_password_reset_email.assert_called_once()
+
+    def test_batch_retry_continues_from_failed_email(self, send_verification_email):
+        send_verification_email.side_effect = [None, SMTPException(), None, None]
+
+        tasks.send_email_verification_codes.apply(
+            kwargs={'domain': 'example.com', 'scheme': 'https', 'user_ids': [1, 2, 3]},
+        )
+
+        self.assertEqual(
+            [call.kwargs['user_id'] for call in send_verification_email.call_args_list],
+            [1, 2, 2, 3],
+        )
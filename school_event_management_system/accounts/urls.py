@@ -5,6 +5,7 @@ from accounts.views import (
     AccountActivationView,
     AccountSettingsDashboardView,
     ActivationRequiredView,
+    FioAutocompleteView,
     PasswordChangeDoneView,
     PasswordChangeView,
     PasswordResetCompleteView,
@@ -106,4 +107,11 @@ urlpatterns = [
         view=ActivationRequiredView.as_view(),
         name='activation_required',
     ),
+
+    # autocomplete urls
+    path(
+        route='autocomplete/fio/',
+        view=FioAutocompleteView.as_view(),
+        name='fio_autocomplete',
+    ),
 ]
@@ -12,7 +12,7 @@ from django.contrib.auth.views import (
     PasswordResetView,
 )
 from django.contrib.sites.shortcuts import get_current_site
-from django.http import HttpRequest
+from django.http import HttpRequest, JsonResponse
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
 from django.views.generic import TemplateView, View
@@ -36,22 +36,26 @@ from accounts.forms import (
 from accounts.mixins import AnonymousUserRequiredMixin, UnconfirmedEmailRequiredMixin
 from accounts.models import User
 from accounts.services import (
+    create_user_with_profile,
+    get_user_fio_suggestions,
     get_user_from_uid,
     send_verification_link,
-    set_profile_values_after_user_registration,
     update_user_email_confirmation_status,
     update_user_profile_year_of_study,
 )
 from accounts.tokens import account_activation_token
+from common.mixins import RateLimitMixin
 
 
 class SignUpView(
     AnonymousUserRequiredMixin,
+    RateLimitMixin,
     TemplateResponseMixin,
     View,
 ):
     """Просмотр для создания новой учетной записи."""
 
+    ratelimit_scope = 'signup'
     form_class = SignUpForm
     template_name = 'registration/signup.html'
 
@@ -66,19 +70,18 @@ class SignUpView(
         form = self.form_class(request.POST)
 
         if form.is_valid():
-            user = form.save()
-            login(request, user)
+            user = create_user_with_profile(
+                user=form.save(commit=False),
+                phone_number=form.cleaned_data['phone_number'],
+                school=form.cleaned_data['school'],
+                year_of_study=form.cleaned_data['year_of_study'],
+            )
+            login(request, user, backend='accounts.backends.ProfileModelBackend')
             send_verification_link(
                 get_current_site(request).domain,
                 request.scheme,
                 user,
             )
-            set_profile_values_after_user_registration(
-                profile=user.profile,
-                phone_number=form.cleaned_data['phone_number'],
-                school=form.cleaned_data['school'],
-                year_of_study=form.cleaned_data['year_of_study'],
-            )
             messages.add_message(
                 request,
                 messages.SUCCESS,
@@ -94,13 +97,18 @@ class SignUpView(
 
 class SignInView(
     AnonymousUserRequiredMixin,
+    RateLimitMixin,
     LoginView,
 ):
     """Просмотр для входа в систему."""
 
+    ratelimit_scope = 'signin'
     form_class = AuthenticationForm
     template_name = 'registration/signin.html'
 
+    def get_ratelimit_account(self, request: HttpRequest) -> str:
+        return request.POST.get('username', '').strip()
+
 
 class SignOutView(
     LoginRequiredMixin,
@@ -141,15 +149,22 @@ class AccountActivationView(
         return redirect('security_dashboard')
 
 
-class PasswordResetView(PasswordResetView):
+class PasswordResetView(
+    RateLimitMixin,
+    PasswordResetView,
+):
     """Просмотр для сброса пароля."""
 
+    ratelimit_scope = 'password_reset'
     template_name = 'registration/password_reset.html'
     success_url = reverse_lazy('password_reset_done')
     html_email_template_name = 'registration/password_reset_email.html'
     email_template_name = 'registration/password_reset_email.html'
     form_class = PasswordResetForm
 
+    def get_ratelimit_account(self, request: HttpRequest) -> str:
+        return request.POST.get('email', '').strip()
+
 
 class PasswordResetDoneView(PasswordResetDoneView):
     """Просмотр для показа, что сброс пароля выполнен."""
@@ -298,3 +313,23 @@ class SecurityDashboardView(
     """Представление для отображения панели управления `Login & Security`."""
 
     template_name = 'settings/security_dashboard.html'
+
+
+class FioAutocompleteView(
+    LoginRequiredMixin,
+    View,
+):
+    """Подсказки ФИО пользователей для полей форм регистрации на мероприятия."""
+
+    def get(self, request: HttpRequest, *args, **kwargs):
+        role = request.GET.get('role', '')
+        if role not in User.RoleChoices.values:
+            role = ''
+        return JsonResponse(
+            {
+                'results': get_user_fio_suggestions(
+                    prefix=request.GET.get('q', '')[:255],
+                    role=role,
+                ),
+            },
+        )
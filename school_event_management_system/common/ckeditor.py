@@ -0,0 +1,122 @@
+"""
+Изображения, загружаемые через CKEditor (`Event.description`, `Task.task`).
+
+`DeferredPillowBackend` сохраняет загруженный файл как есть и сразу отвечает
+редактору, а уменьшение, сжатие и удаление EXIF выполняет задача Celery
+`optimize_ckeditor_image`. Копия лежит вне `CKEDITOR_UPLOAD_PATH` (окно выбора
+файлов её не показывает): `content/ckeditor/2026/10/19/photo.jpg` ->
+`CKEDITOR_OPTIMIZED_PATH/2026/10/19/photo.jpg.webp`.
+
+Имя готовой копии сохраняется в `CKEditorImage`, и фильтр шаблонов `optimized_images`
+подставляет копии одним запросом к базе данных, не обращаясь к хранилищу; пока копии
+нет, показывается оригинал. Готовая копия отправляет сигнал `ckeditor_image_optimized`,
+чтобы страницы с изображением обновили `ETag`.
+"""
+
+import re
+from posixpath import join, relpath
+
+from ckeditor_uploader import utils
+from ckeditor_uploader.backends import PillowBackend
+from ckeditor_uploader.backends.pillow_backend import THUMBNAIL_SIZE
+from PIL import Image
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.dispatch import Signal
+
+from common.images import encode_image, open_image, resize_image
+from common.models import CKEditorImage
+from common.tasks import optimize_ckeditor_image
+
+# Отправляется с `name` оригинала, когда его сжатая копия сохранена
+ckeditor_image_optimized = Signal()
+
+_UPLOADED_IMAGE_SRC_RE = re.compile(
+    r'(?<=\bsrc=["\'])' + re.escape(settings.MEDIA_URL) +
+    r'(' + re.escape(settings.CKEDITOR_UPLOAD_PATH) + r'[^"\']+)',
+)
+
+
+class DeferredPillowBackend(PillowBackend):
+    """Бэкенд `CKEDITOR_IMAGE_BACKEND`: изображения обрабатываются в Celery, а не в запросе."""
+
+    def save_as(self, filepath: str) -> str:
+        is_image = self.is_image
+        saved_path = self.storage_engine.save(filepath, self.file_object)
+        if is_image:
+            optimize_ckeditor_image.delay(name=saved_path)
+        return saved_path
+
+
+def get_uploaded_image_names(*htmls: str | None) -> set[str]:
+    """Вернуть имена загруженных через CKEditor изображений, на которые ссылаются `htmls`."""
+    return {name for html in htmls if html for name in _UPLOADED_IMAGE_SRC_RE.findall(html)}
+
+
+def get_ckeditor_images(names: set[str]) -> list[CKEditorImage]:
+    """Вернуть `CKEditorImage` изображений `names`, создав недостающие."""
+    CKEditorImage.objects.bulk_create(
+        [CKEditorImage(name=name) for name in names],
+        ignore_conflicts=True,
+    )
+    return list(CKEditorImage.objects.filter(name__in=names))
+
+
+def get_optimized_image_name(name: str) -> str:
+    """Вернуть имя сжатой копии изображения `name`, загруженного через CKEditor."""
+    relative_name = relpath(name, settings.CKEDITOR_UPLOAD_PATH)
+    return join(settings.CKEDITOR_OPTIMIZED_PATH, f'{relative_name}.webp')
+
+
+def save_optimized_ckeditor_image(name: str) -> str | None:
+    """
+    Сохранить копию загруженного изображения `name` шириной не больше
+    `CKEDITOR_IMAGE_MAX_WIDTH` в WebP без EXIF и миниатюру для окна выбора файлов.
+    Вернуть имя копии или None, если копия не нужна (анимация или копия не меньше оригинала).
+    """
+    storage = utils.storage
+    with storage.open(name, 'rb') as file, Image.open(file) as original:
+        # Пересжатие оставило бы от анимации первый кадр
+        if getattr(original, 'is_animated', False):
+            return None
+    with storage.open(name, 'rb') as file:
+        image = open_image(file)
+
+    thumbnail = image.copy()
+    thumbnail.thumbnail(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+    thumbnail_name = utils.get_thumb_filename(name)
+    storage.delete(thumbnail_name)
+    storage.save(thumbnail_name, ContentFile(encode_image(thumbnail, 'JPEG', 75)))
+
+    resized = resize_image(image, settings.CKEDITOR_IMAGE_MAX_WIDTH)
+    content = encode_image(resized, 'WEBP', settings.CKEDITOR_IMAGE_QUALITY)
+    if len(content) >= storage.size(name):
+        return None
+    optimized_name = get_optimized_image_name(name)
+    # Повторная обработка заменяет прежнюю копию, а не создаёт ещё одну
+    storage.delete(optimized_name)
+    optimized_name = storage.save(optimized_name, ContentFile(content))
+    CKEditorImage.objects.update_or_create(name=name, defaults={'optimized_name': optimized_name})
+    ckeditor_image_optimized.send(sender=CKEditorImage, name=name)
+    return optimized_name
+
+
+def replace_optimized_images(html: str | None) -> str:
+    """Заменить в `html` ссылки на загруженные через CKEditor изображения ссылками на их копии."""
+    names = get_uploaded_image_names(html)
+    if not names:
+        return html or ''
+    storage = utils.storage
+    optimized = {
+        name: storage.url(optimized_name)
+        for name, optimized_name in CKEditorImage.objects.filter(
+            name__in=names,
+        ).exclude(optimized_name='').values_list('name', 'optimized_name')
+    }
+    if not optimized:
+        return html
+    return _UPLOADED_IMAGE_SRC_RE.sub(
+        lambda match: optimized.get(match[1], match[0]),
+        html,
+    )
@@ -0,0 +1,55 @@
+from django import forms
+from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.db.models.fields.related import RelatedField
+
+
+class AutocompleteListFilter(admin.RelatedFieldListFilter):
+    """
+    Фильтр списка объектов админ-панели по связанному объекту с поиском (select2).
+
+    В отличие от `RelatedFieldListFilter` не загружает все связанные объекты в
+    боковую панель: варианты подгружаются через `admin:autocomplete`, поэтому у
+    `ModelAdmin` связанной модели должны быть `search_fields`.
+    Скрипты select2 подключает `common.mixins.AutocompleteListFilterAdminMixin`.
+    """
+
+    template = 'admin/autocomplete_list_filter.html'
+
+    def __init__(self, field: RelatedField, request, params, model, model_admin, field_path):
+        super(AutocompleteListFilter, self).__init__(
+            field,
+            request,
+            params,
+            model,
+            model_admin,
+            field_path,
+        )
+        self.form_field = forms.ModelChoiceField(
+            queryset=field.remote_field.model._default_manager.all(),
+            to_field_name=field.target_field.name,
+            widget=AutocompleteSelect(field, model_admin.admin_site),
+            required=False,
+        )
+
+    def field_choices(self, field, request, model_admin):
+        return []
+
+    def has_output(self) -> bool:
+        return True
+
+    def choices(self, changelist):
+        yield {
+            'query_string': changelist.get_query_string(
+                remove=[self.lookup_kwarg, self.lookup_kwarg_isnull],
+            ),
+            'widget': self.form_field.widget.render(
+                name=self.lookup_kwarg,
+                value=self.lookup_val,
+                attrs={
+                    'id': f'autocomplete_list_filter_{self.lookup_kwarg}',
+                    'data-autocomplete-list-filter': self.lookup_kwarg,
+                    'style': 'width: 100%',
+                },
+            ),
+        }
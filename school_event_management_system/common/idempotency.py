@@ -0,0 +1,63 @@
+"""
+Защита задач Celery от повторного выполнения.
+
+Задачи подтверждаются после выполнения (`acks_late`), поэтому одно и то же
+сообщение может быть доставлено повторно, а одно и то же письмо - поставлено
+в очередь дважды. Перед отправкой задача занимает в Redis ключ дедупликации
+(шаблон письма, получатель, объект) командой SET NX с таймаутом.
+"""
+
+from contextlib import contextmanager
+from typing import Iterator
+
+from common.metrics import increment_metric
+from config.redis import redis_connection
+
+DEDUPLICATION_PENDING_TIMEOUT = 60 * 60  # Один час в секундах
+DEDUPLICATION_DONE_TIMEOUT = 60 * 60 * 24 * 30  # Тридцать дней в секундах
+# Письма по запросу пользователя (подтверждение почты, сброс пароля): повторная постановка
+# того же письма приходит за секунды, а новый запрос после паузы повторной отправки
+# (`send_verification_link`) - это новое письмо
+EMAIL_REQUEST_DEDUPLICATION_TIMEOUT = 60
+
+DEDUPLICATION_DONE = 'done'
+
+
+def get_email_deduplication_key(template: str, recipient: int | str, object_id: int | str) -> str:
+    """Ключ письма `template` получателю `recipient` об объекте `object_id`."""
+    return f'common:email:{template}:{object_id}:{str(recipient).lower()}'
+
+
+@contextmanager
+def deduplicate(
+        key: str,
+        owner: str | None,
+        timeout: int = DEDUPLICATION_DONE_TIMEOUT,
+) -> Iterator[bool]:
+    """
+    Выполнить блок не более одного раза для ключа `key`.
+
+    Возвращает True, если блок нужно выполнить. Пока блок выполняется, ключ
+    хранит `pending:{owner}` (обычно `owner` - id задачи), и повторная доставка
+    того же сообщения после падения воркера выполнит блок снова. Любой другой
+    владелец получит False. После успеха ключ хранит `done` `timeout` секунд,
+    после исключения удаляется, чтобы `retry` выполнил блок заново.
+    """
+    if owner is None:
+        # Задача вызвана напрямую, а не через брокер - повторной доставки не будет
+        yield True
+        return
+
+    pending = f'pending:{owner}'
+    acquired = redis_connection.set(key, pending, nx=True, ex=DEDUPLICATION_PENDING_TIMEOUT)
+    if not acquired and redis_connection.get(key) != pending.encode():
+        increment_metric('tasks.deduplicated')
+        yield False
+        return
+
+    try:
+        yield True
+    except BaseException:
+        redis_connection.delete(key)
+        raise
+    redis_connection.set(key, DEDUPLICATION_DONE, ex=timeout)
@@ -0,0 +1,59 @@
+"""
+Уменьшенные копии загруженных изображений (Pillow).
+
+Копии сохраняются без метаданных EXIF: поворот из EXIF применяется к пикселям,
+а остальные данные (камера, координаты съёмки) в файл не попадают.
+"""
+
+from io import BytesIO
+from posixpath import join, split, splitext
+from typing import BinaryIO
+
+from PIL import Image, ImageOps
+
+# Формат Pillow -> расширение файла
+IMAGE_FORMAT_EXTENSIONS = {
+    'WEBP': 'webp',
+    'JPEG': 'jpg',
+}
+
+
+def open_image(file: BinaryIO) -> Image.Image:
+    """Прочитать изображение из `file` и повернуть его согласно EXIF."""
+    with Image.open(file) as image:
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    return image
+
+
+def resize_image(image: Image.Image, width: int) -> Image.Image:
+    """Уменьшить `image` до ширины `width` с сохранением пропорций (не увеличивая)."""
+    if image.width <= width:
+        return image
+    height = max(round(image.height * width / image.width), 1)
+    return image.resize((width, height), Image.Resampling.LANCZOS)
+
+
+def encode_image(image: Image.Image, image_format: str, quality: int) -> bytes:
+    """Сжать `image` в `image_format` (WEBP или JPEG) с качеством `quality`."""
+    if image_format == 'JPEG' and image.mode == 'RGBA':
+        # В JPEG нет прозрачности: прозрачные области становятся белыми, а не чёрными
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    options = {'optimize': True, 'progressive': True} if image_format == 'JPEG' else {'method': 6}
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, quality=quality, **options)
+    return buffer.getvalue()
+
+
+def get_image_rendition_name(name: str, width: int, image_format: str) -> str:
+    """
+    Вернуть имя копии изображения `name` шириной `width`: папка `thumbnails`
+    рядом с оригиналом, например `upload/a/thumbnails/photo-400.webp`.
+    """
+    directory, filename = split(name)
+    stem = splitext(filename)[0]
+    return join(directory, 'thumbnails', f'{stem}-{width}.{IMAGE_FORMAT_EXTENSIONS[image_format]}')
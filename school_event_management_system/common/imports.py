@@ -0,0 +1,96 @@
+"""
+Чтение табличных файлов (CSV, XLSX) для массового импорта.
+
+Файлы читаются потоково, строка за строкой: XLSX открывается в режиме
+`read_only`, поэтому в памяти не держится весь лист.
+"""
+
+import csv
+from io import TextIOWrapper
+from itertools import islice
+from pathlib import Path
+from typing import IO, Iterable, Iterator
+
+from openpyxl import load_workbook
+
+TABLE_FILE_EXTENSIONS = ('csv', 'xlsx')
+
+
+class UnsupportedFileFormatError(ValueError):
+    """Файл импорта не CSV и не XLSX."""
+
+
+def _normalize_header(header: object) -> str:
+    return str(header or '').strip().lower()
+
+
+def _normalize_value(value: object) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        # Excel хранит числа (класс, телефон) как float
+        value = int(value)
+    return str(value).strip()
+
+
+def _iter_csv_rows(file: IO[bytes]) -> Iterator[list]:
+    text = TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    sample = text.read(4096)
+    text.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    yield from csv.reader(text, dialect)
+
+
+def _iter_xlsx_rows(file: IO[bytes]) -> Iterator[tuple]:
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def iter_table_rows(
+        file: IO[bytes],
+        filename: str,
+        aliases: dict[str, str] | None = None,
+) -> Iterator[tuple[int, dict[str, str]]]:
+    """
+    Вернуть пары (номер строки в файле, словарь столбец -> значение) для всех
+    непустых строк после заголовка. Заголовки приводятся к нижнему регистру и
+    переводятся по `aliases` (например, `{'почта': 'email'}`).
+    """
+    extension = Path(filename).suffix.lower().lstrip('.')
+    if extension == 'csv':
+        rows = _iter_csv_rows(file)
+    elif extension == 'xlsx':
+        rows = _iter_xlsx_rows(file)
+    else:
+        raise UnsupportedFileFormatError(filename)
+
+    aliases = aliases or {}
+    headers = [_normalize_header(header) for header in next(rows, [])]
+    headers = [aliases.get(header, header) for header in headers]
+    for number, row in enumerate(rows, start=2):
+        values = [_normalize_value(value) for value in row]
+        if not any(values):
+            continue
+        yield number, dict(zip(headers, values))
+
+
+def write_error_report(path: Path, errors: Iterable[tuple[int, str]]) -> None:
+    """Сохранить ошибки импорта (номер строки, текст ошибки) в CSV, который открывается в Excel."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8-sig', newline='') as report:
+        writer = csv.writer(report, delimiter=';')
+        writer.writerow(('Строка', 'Ошибка'))
+        writer.writerows(errors)
+
+
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    """Разбить поток `items` на списки по `size` элементов."""
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
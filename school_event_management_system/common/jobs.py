@@ -0,0 +1,134 @@
+"""
+Фоновые задачи админ-панели.
+
+Тяжёлые массовые действия (архивирование, смена статусов, выгрузка, удаление)
+ставятся в очередь Celery, а их прогресс хранится в Redis в хэше
+`common:admin_job:{job_id}` и показывается на странице задачи.
+"""
+
+from typing import Callable, Iterator, Sequence
+from uuid import uuid4
+
+from django.conf import settings
+
+from config.redis import redis_connection
+
+ADMIN_JOB_TIMEOUT = 60 * 60 * 24  # Один день в секундах
+
+ADMIN_JOB_SOFT_TIME_LIMIT = 60 * 30  # 30 минут в секундах
+ADMIN_JOB_TIME_LIMIT = 60 * 35  # 35 минут в секундах
+
+ADMIN_JOB_PENDING = 'pending'
+ADMIN_JOB_RUNNING = 'running'
+ADMIN_JOB_DONE = 'done'
+ADMIN_JOB_FAILED = 'failed'
+
+ADMIN_JOB_STATUS_DISPLAY = {
+    ADMIN_JOB_PENDING: 'В очереди',
+    ADMIN_JOB_RUNNING: 'Выполняется',
+    ADMIN_JOB_DONE: 'Завершено',
+    ADMIN_JOB_FAILED: 'Ошибка',
+}
+
+
+def _admin_job_key(job_id: str) -> str:
+    return f'common:admin_job:{job_id}'
+
+
+def create_admin_job(user_id: int, title: str, total: int) -> str:
+    """Создать задачу на `total` объектов и вернуть её идентификатор."""
+    job_id = uuid4().hex
+    key = _admin_job_key(job_id)
+    redis_connection.hset(
+        key,
+        mapping={
+            'title': title,
+            'user_id': user_id,
+            'status': ADMIN_JOB_PENDING,
+            'total': total,
+            'processed': 0,
+            'message': '',
+            'file': '',
+        },
+    )
+    redis_connection.expire(key, ADMIN_JOB_TIMEOUT)
+    return job_id
+
+
+def get_admin_job(job_id: str) -> dict | None:
+    """Вернуть состояние задачи или None, если задачи нет (или она устарела)."""
+    job = redis_connection.hgetall(_admin_job_key(job_id))
+    if not job:
+        return None
+    job = {key.decode(): value.decode() for key, value in job.items()}
+    job['id'] = job_id
+    job['user_id'] = int(job['user_id'])
+    job['total'] = int(job['total'])
+    job['processed'] = int(job['processed'])
+    job['percent'] = 100 * job['processed'] // job['total'] if job['total'] else 100
+    job['status_display'] = ADMIN_JOB_STATUS_DISPLAY[job['status']]
+    job['finished'] = job['status'] in (ADMIN_JOB_DONE, ADMIN_JOB_FAILED)
+    return job
+
+
+def set_admin_job_total(job_id: str, total: int) -> None:
+    """Задать количество объектов задачи, если оно стало известно после её создания."""
+    redis_connection.hset(_admin_job_key(job_id), 'total', total)
+
+
+def advance_admin_job(job_id: str, processed: int) -> None:
+    """Отметить, что обработано ещё `processed` объектов."""
+    key = _admin_job_key(job_id)
+    pipeline = redis_connection.pipeline()
+    pipeline.hset(key, 'status', ADMIN_JOB_RUNNING)
+    pipeline.hincrby(key, 'processed', processed)
+    pipeline.execute()
+
+
+def finish_admin_job(job_id: str, message: str = '', file: str = '') -> None:
+    """Завершить задачу. `file` - путь к результату относительно `MEDIA_ROOT`."""
+    redis_connection.hset(
+        _admin_job_key(job_id),
+        mapping={
+            'status': ADMIN_JOB_DONE,
+            'message': message,
+            'file': file,
+        },
+    )
+
+
+def fail_admin_job(job_id: str, message: str) -> None:
+    redis_connection.hset(
+        _admin_job_key(job_id),
+        mapping={
+            'status': ADMIN_JOB_FAILED,
+            'message': message,
+        },
+    )
+
+
+def chunked(items: Sequence, size: int | None = None) -> Iterator[Sequence]:
+    """Разбить `items` на части по `size` (по умолчанию `ADMIN_JOB_CHUNK_SIZE`) элементов."""
+    size = size or settings.ADMIN_JOB_CHUNK_SIZE
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def run_admin_job_in_chunks(
+        job_id: str,
+        ids: Sequence[int],
+        process_chunk: Callable[[Sequence[int]], None],
+        chunk_size: int | None = None,
+) -> None:
+    """
+    Вызвать `process_chunk(chunk)` для каждой части `ids`, обновляя прогресс задачи.
+
+    Исключение помечает задачу как завершившуюся с ошибкой и пробрасывается дальше.
+    """
+    try:
+        for chunk in chunked(ids, chunk_size):
+            process_chunk(chunk)
+            advance_admin_job(job_id, len(chunk))
+    except Exception as error:
+        fail_admin_job(job_id, message=str(error))
+        raise
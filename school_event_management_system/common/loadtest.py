@@ -0,0 +1,369 @@
+"""
+Нагрузочный тест дня открытия регистрации.
+
+Виртуальные пользователи ходят по сайту через HTTP (стандартная библиотека,
+по потоку на пользователя) и воспроизводят реальный трафик: анонимный просмотр
+мероприятий, регистрация аккаунтов, регистрация на индивидуальные и командные
+мероприятия, редактирование анкет, отправка решений и выгрузка списков
+участников персоналом.
+"""
+
+import re
+import time
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.cookiejar import CookieJar
+from random import Random
+from threading import Lock
+from typing import Callable
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, Request, build_opener
+from uuid import uuid4
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from accounts.models import Profile, User
+from events.models import Event, EventStatusChoices, EventTypeChoices
+
+LOADTEST_PREFIX = 'loadtest'
+LOADTEST_PASSWORD = 'LoadTest-Passw0rd'
+
+
+@dataclass
+class Sample:
+    name: str
+    status: int
+    latency: float
+    queries: int | None
+
+
+@dataclass
+class Fixtures:
+    students: list[User]
+    teacher: User
+    staff: User
+    individual_events: list[Event]
+    team_events: list[Event]
+    public_slugs: list[str]
+
+
+@dataclass
+class Report:
+    samples: list[Sample] = field(default_factory=list)
+    lock: Lock = field(default_factory=Lock)
+
+    def add(self, sample: Sample) -> None:
+        with self.lock:
+            self.samples.append(sample)
+
+    @property
+    def rate_limited(self) -> int:
+        return sum(1 for sample in self.samples if sample.status == HTTPStatus.TOO_MANY_REQUESTS)
+
+    def rows(self) -> list[dict]:
+        """
+        Сводка по эндпоинтам. Ответы 429 (ограничение частоты запросов) считаются
+        отдельно от ошибок и не входят в процентили: они измеряют ограничитель, а не эндпоинт.
+        """
+        names = sorted({sample.name for sample in self.samples})
+        rows = []
+        for name in names:
+            samples = [sample for sample in self.samples if sample.name == name]
+            served = [
+                sample for sample in samples if sample.status != HTTPStatus.TOO_MANY_REQUESTS
+            ]
+            latencies = sorted(sample.latency * 1000 for sample in served)
+            queries = [sample.queries for sample in served if sample.queries is not None]
+            rows.append({
+                'name': name,
+                'requests': len(samples),
+                'rate_limited': len(samples) - len(served),
+                'errors': sum(1 for sample in served if sample.status >= 400),
+                'p50': percentile(latencies, 50),
+                'p95': percentile(latencies, 95),
+                'p99': percentile(latencies, 99),
+                'queries': sum(queries) / len(queries) if queries else None,
+                'max_queries': max(queries) if queries else None,
+            })
+        return rows
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Процентиль методом ближайшего ранга по отсортированному списку."""
+    if not values:
+        return 0.0
+    rank = max(int(round(percent / 100 * len(values) + 0.5)) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+class _NoRedirect(HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class VirtualUser:
+    """HTTP-сессия одного виртуального пользователя (cookies, CSRF, замеры)."""
+
+    csrf_input_regex = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+    def __init__(self, base_url: str, report: Report):
+        self.base_url = base_url.rstrip('/')
+        self.report = report
+        self.cookies = CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.cookies), _NoRedirect())
+        self.csrf_token = ''
+
+    def request(self, name: str, path: str, data: dict | None = None) -> tuple[int, str]:
+        body = None
+        headers = {'User-Agent': 'school-events-loadtest'}
+        if data is not None:
+            data = dict(data, csrfmiddlewaretoken=self.csrf_token)
+            body = urlencode(data, doseq=True).encode()
+            headers['Referer'] = self.base_url + path
+        request = Request(self.base_url + path, data=body, headers=headers)
+
+        started = time.perf_counter()
+        try:
+            response = self.opener.open(request, timeout=60)
+            status = response.status
+            content = response.read()
+            response_headers = response.headers
+        except HTTPError as error:
+            status = error.code
+            content = error.read()
+            response_headers = error.headers
+        latency = time.perf_counter() - started
+
+        queries = response_headers.get('X-Query-Count')
+        self.report.add(
+            Sample(
+                name=name,
+                status=status,
+                latency=latency,
+                queries=int(queries) if queries is not None else None,
+            ),
+        )
+        text = content.decode('utf-8', errors='replace')
+        match = self.csrf_input_regex.search(text)
+        if match:
+            self.csrf_token = match.group(1)
+        return status, text
+
+    def get(self, name: str, path: str) -> tuple[int, str]:
+        return self.request(name, path)
+
+    def post(self, name: str, path: str, data: dict) -> tuple[int, str]:
+        return self.request(name, path, data)
+
+    def sign_in(self, email: str, password: str) -> None:
+        self.get('signin [GET]', '/signin/')
+        self.post('signin [POST]', '/signin/', {'username': email, 'password': password})
+
+
+def create_fixtures(students: int, events: int) -> Fixtures:
+    """Создать аккаунты и открытые мероприятия с известными паролями для нагрузочного теста."""
+    run_id = uuid4().hex[:6]
+    password = make_password(LOADTEST_PASSWORD)
+    with transaction.atomic():
+        users = User.objects.bulk_create(
+            [
+                User(
+                    email=f'{LOADTEST_PREFIX}-{run_id}-student-{i}@example.com',
+                    name=f'Ученик{i}',
+                    surname=f'Нагрузочный{run_id}',
+                    patronymic='Тестович',
+                    password=password,
+                    is_email_confirmed=True,
+                )
+                for i in range(students)
+            ] + [
+                User(
+                    email=f'{LOADTEST_PREFIX}-{run_id}-teacher@example.com',
+                    name='Учитель',
+                    surname=f'Нагрузочный{run_id}',
+                    patronymic='Тестович',
+                    password=password,
+                    role=User.RoleChoices.TEACHER,
+                    is_email_confirmed=True,
+                ),
+                User(
+                    email=f'{LOADTEST_PREFIX}-{run_id}-staff@example.com',
+                    name='Сотрудник',
+                    surname=f'Нагрузочный{run_id}',
+                    patronymic='Тестович',
+                    password=password,
+                    role=User.RoleChoices.TEACHER,
+                    is_staff=True,
+                    is_email_confirmed=True,
+                ),
+            ],
+        )
+        Profile.objects.bulk_create(
+            [Profile(user=user, phone_number='+79990000000') for user in users],
+        )
+        *student_users, teacher, staff = users
+        individual_events = [
+            Event.objects.create(
+                name=f'{LOADTEST_PREFIX} {run_id} индивидуальное {i}',
+                slug=f'{LOADTEST_PREFIX}-{run_id}-individual-{i}',
+                type=EventTypeChoices.INDIVIDUAL,
+                status=EventStatusChoices.REGISTRATION_OPEN,
+                published=True,
+            )
+            for i in range(events)
+        ]
+        team_events = [
+            Event.objects.create(
+                name=f'{LOADTEST_PREFIX} {run_id} командное {i}',
+                slug=f'{LOADTEST_PREFIX}-{run_id}-team-{i}',
+                type=EventTypeChoices.TEAM,
+                status=EventStatusChoices.REGISTRATION_OPEN,
+                minimum_number_of_team_members=1,
+                maximum_number_of_team_members=3,
+                need_account=False,
+                published=True,
+            )
+            for i in range(events)
+        ]
+    public_slugs = list(
+        Event.objects.filter(published=True).values_list('slug', flat=True)[:200],
+    )
+    return Fixtures(
+        students=student_users,
+        teacher=teacher,
+        staff=staff,
+        individual_events=individual_events,
+        team_events=team_events,
+        public_slugs=public_slugs,
+    )
+
+
+def delete_fixtures() -> int:
+    """Удалить все данные, созданные нагрузочным тестом. Вернуть количество удалённых объектов."""
+    deleted_events, _ = Event.objects.filter(slug__startswith=f'{LOADTEST_PREFIX}-').delete()
+    deleted_users, _ = User.objects.filter(email__startswith=f'{LOADTEST_PREFIX}-').delete()
+    return deleted_events + deleted_users
+
+
+def browse_events(user: VirtualUser, fixtures: Fixtures, random: Random) -> None:
+    """Анонимный посетитель: список, карточка, QR-код и архив мероприятий."""
+    user.get('events_list', '/events/')
+    if fixtures.public_slugs:
+        slug = random.choice(fixtures.public_slugs)
+        user.get('event_detail', f'/event/{slug}/')
+        if random.random() < 0.2:
+            user.get('event_qr_code', f'/event/{slug}/qr_code/')
+    if random.random() < 0.3:
+        user.get('events_archive', '/events/archive/')
+
+
+def sign_up(user: VirtualUser, fixtures: Fixtures, random: Random) -> None:
+    """Новый пользователь заводит аккаунт."""
+    user.get('signup [GET]', '/signup/')
+    user.post(
+        'signup [POST]',
+        '/signup/',
+        {
+            'email': f'{LOADTEST_PREFIX}-{uuid4().hex}@example.com',
+            'phone_number': '+79990000000',
+            'surname': 'Нагрузочный',
+            'name': 'Новичок',
+            'patronymic': 'Тестович',
+            'role': User.RoleChoices.STUDENT,
+            'school': '',
+            'year_of_study': random.randint(1, 11),
+            'password1': LOADTEST_PASSWORD,
+            'password2': LOADTEST_PASSWORD,
+        },
+    )
+
+
+def register_individual(user: VirtualUser, fixtures: Fixtures, random: Random) -> None:
+    """Ученик регистрируется на индивидуальное мероприятие, правит анкету и отправляет работу."""
+    student = random.choice(fixtures.students)
+    event = random.choice(fixtures.individual_events)
+    user.sign_in(student.email, LOADTEST_PASSWORD)
+    user.get('register_on_event [GET]', f'/event/{event.slug}/register/')
+    user.post(
+        'register_on_event [POST individual]',
+        f'/event/{event.slug}/register/',
+        {
+            'participant_fio': student.full_name,
+            'fio': fixtures.teacher.full_name,
+        },
+    )
+    user.get('edit_participant_event [GET]', f'/event/{event.slug}/edit/')
+    user.post(
+        'edit_participant_event [POST]',
+        f'/event/{event.slug}/edit/',
+        {
+            'participant_fio': student.full_name,
+            'fio': 'Другой Руководитель Тестович',
+            'email': 'supervisor@example.com',
+            'phone_number': '+79990000001',
+        },
+    )
+    user.get('event_solution [GET]', f'/event/{event.slug}/solution/')
+    user.post(
+        'event_solution [POST]',
+        f'/event/{event.slug}/solution/',
+        {
+            'topic': 'Тема проекта',
+            'subject': 'Информатика',
+            'theses': 'Краткие тезисы',
+            'url': 'https://example.com/solution',
+        },
+    )
+
+
+def register_team(user: VirtualUser, fixtures: Fixtures, random: Random) -> None:
+    """Учитель регистрирует команду на командное мероприятие."""
+    event = random.choice(fixtures.team_events)
+    user.sign_in(fixtures.teacher.email, LOADTEST_PASSWORD)
+    user.get('register_on_event [GET]', f'/event/{event.slug}/register/')
+    user.post(
+        'register_on_event [POST team]',
+        f'/event/{event.slug}/register/',
+        {
+            'name': f'Команда {uuid4().hex[:12]}',
+            'school_class': '',
+            'participant_1': 'Первый Участник Тестович',
+            'participant_2': 'Второй Участник Тестович',
+            'fio': fixtures.teacher.full_name,
+        },
+    )
+
+
+def export_participants(user: VirtualUser, fixtures: Fixtures, random: Random) -> None:
+    """Сотрудник выгружает списки участников мероприятия."""
+    event = random.choice(fixtures.individual_events + fixtures.team_events)
+    user.sign_in(fixtures.staff.email, LOADTEST_PASSWORD)
+    user.get('export_event_participants', f'/event/{event.slug}/export_participants/')
+
+
+SCENARIOS: dict[str, tuple[Callable[[VirtualUser, Fixtures, Random], None], int]] = {
+    'browse': (browse_events, 60),
+    'signup': (sign_up, 10),
+    'register_individual': (register_individual, 15),
+    'register_team': (register_team, 10),
+    'export': (export_participants, 5),
+}
+
+
+def run_virtual_user(
+        base_url: str,
+        fixtures: Fixtures,
+        report: Report,
+        deadline: float,
+        seed: int,
+        scenarios: dict[str, int],
+) -> None:
+    """Выполнять случайные сценарии (с весами) до истечения `deadline`."""
+    random = Random(seed)
+    names = list(scenarios)
+    weights = [scenarios[name] for name in names]
+    while time.monotonic() < deadline:
+        scenario, _ = SCENARIOS[random.choices(names, weights=weights)[0]]
+        scenario(VirtualUser(base_url, report), fixtures, random)
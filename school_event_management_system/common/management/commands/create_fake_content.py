@@ -1,17 +1,31 @@
-from random import choice, randint
+from random import choice, randint, random, sample
 from typing import Any
+from uuid import uuid4
 
 from faker import Faker
 
 from django.conf import settings
+from django.contrib.auth.hashers import make_password
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils.text import slugify
 
 from accounts.models import Profile, User
-from events.models import Event, EventStageChoices, EventStatusChoices, EventTypeChoices
+from events.models import (
+    Event,
+    EventStageChoices,
+    EventStatusChoices,
+    EventTypeChoices,
+    Participant,
+    Solution,
+    Team,
+)
+from events.services import recalculate_event_counters
 
 BASE_DIR = settings.BASE_DIR
 
+BULK_BATCH_SIZE = 2000
+
 faker = Faker('ru_RU')
 
 
@@ -56,13 +70,9 @@ def create_fake_users_and_edit_profiles(coefficient: float = 1) -> None:
 
 def create_fake_events(coefficient: float = 1) -> None:
     """Create events use fake data."""
-    used_names = set()
-    for _ in range(int(20 * coefficient)):
-        while True:
-            name = f'Мероприятие {Event.objects.count() + 1}'
-            if name not in used_names:
-                used_names.add(name)
-                break
+    first_number = Event.objects.count() + 1
+    for number in range(first_number, first_number + int(20 * coefficient)):
+        name = f'Мероприятие {number}'
         maximum_number_of_team_members = randint(2, 8)
         event = Event.objects.create(
             name=name,
@@ -81,6 +91,163 @@ def create_fake_events(coefficient: float = 1) -> None:
         event.save()
 
 
+def bulk_create_fake_users_with_profiles(coefficient: float = 1) -> list[User]:
+    """
+    Create users and their profiles use fake data with `bulk_create`.
+
+    All users share one precomputed password hash and `post_save` signals are not sent,
+    so profiles are created in bulk too.
+    """
+    password = make_password(faker.password(length=10))
+    run = uuid4().hex[:8]
+    users = User.objects.bulk_create(
+        [
+            User(
+                email=f'{run}.{number}.{faker.user_name()}@{faker.free_email_domain()}',
+                name=faker.first_name(),
+                surname=faker.last_name(),
+                patronymic=faker.first_name_male(),
+                password=password,
+                role=User.RoleChoices.STUDENT if random() < 0.85 else User.RoleChoices.TEACHER,
+            )
+            for number in range(int(100 * coefficient))
+        ],
+        batch_size=BULK_BATCH_SIZE,
+    )
+    Profile.objects.bulk_create(
+        [
+            Profile(
+                user=user,
+                year_of_study=(
+                    faker.random_int(min=1, max=11)
+                    if user.role == User.RoleChoices.STUDENT else None
+                ),
+                phone_number=f'+7999{faker.random_number(digits=7, fix_len=True)}',
+            )
+            for user in users
+        ],
+        batch_size=BULK_BATCH_SIZE,
+    )
+    return users
+
+
+def bulk_create_fake_events(coefficient: float = 1) -> list[Event]:
+    """Create events use fake data with `bulk_create`."""
+    first_number = Event.objects.count() + 1
+    events = []
+    for number in range(first_number, first_number + int(20 * coefficient)):
+        name = f'Мероприятие {number}'
+        maximum_number_of_team_members = randint(2, 8)
+        events.append(
+            Event(
+                name=name,
+                slug=slugify(name),
+                description=faker.paragraph(),
+                maximum_number_of_team_members=maximum_number_of_team_members,
+                minimum_number_of_team_members=randint(1, maximum_number_of_team_members),
+                status=choice(EventStatusChoices.values),
+                type=choice(EventTypeChoices.values),
+                stage=choice(EventStageChoices.values),
+                date_of_starting_registration=faker.future_date(),
+                date_of_ending_registration=faker.future_date(),
+                date_of_starting_event=faker.future_date(),
+                published=faker.pybool(),
+            ),
+        )
+    return Event.objects.bulk_create(events, batch_size=BULK_BATCH_SIZE)
+
+
+def bulk_create_fake_registrations(events: list[Event], users: list[User]) -> None:
+    """Create teams, participants and solutions for `events` with `bulk_create`."""
+    students = [user for user in users if user.role == User.RoleChoices.STUDENT]
+    teachers = [user for user in users if user.role != User.RoleChoices.STUDENT] or users
+    if not students:
+        return
+
+    teams = []
+    for event in events:
+        if event.type == EventTypeChoices.INDIVIDUAL:
+            continue
+        for number in range(randint(1, 8)):
+            supervisor = choice(teachers)
+            teams.append(
+                Team(
+                    event=event,
+                    name=f'Команда {number + 1}',
+                    school_class=f'{randint(1, 11)}{choice("АБВГ")}',
+                    supervisor=supervisor,
+                    supervisor_fio=supervisor.full_name,
+                    supervisor_email=supervisor.email,
+                ),
+            )
+    teams = Team.objects.bulk_create(teams, batch_size=BULK_BATCH_SIZE)
+
+    participants = []
+    teams_by_event: dict[int, list[Team]] = {}
+    for team in teams:
+        teams_by_event.setdefault(team.event_id, []).append(team)
+    for event in events:
+        if event.type == EventTypeChoices.INDIVIDUAL:
+            for student in sample(students, min(randint(5, 30), len(students))):
+                supervisor = choice(teachers)
+                participants.append(
+                    Participant(
+                        event=event,
+                        user=student,
+                        fio=student.full_name,
+                        supervisor=supervisor,
+                        supervisor_fio=supervisor.full_name,
+                        supervisor_email=supervisor.email,
+                    ),
+                )
+        else:
+            event_teams = teams_by_event.get(event.id, [])
+            team_size = event.maximum_number_of_team_members or 1
+            members = sample(students, min(len(event_teams) * team_size, len(students)))
+            for index, student in enumerate(members):
+                participants.append(
+                    Participant(
+                        event=event,
+                        user=student,
+                        fio=student.full_name,
+                        team=event_teams[index % len(event_teams)],
+                    ),
+                )
+    participants = Participant.objects.bulk_create(participants, batch_size=BULK_BATCH_SIZE)
+
+    solutions = [
+        Solution(
+            event_id=participant.event_id,
+            participant=participant,
+            subject=faker.word(),
+            topic=faker.sentence(nb_words=4),
+            url=faker.url(),
+        )
+        for participant in participants
+        if participant.team_id is None and random() < 0.5
+    ] + [
+        Solution(
+            event_id=team.event_id,
+            team=team,
+            subject=faker.word(),
+            topic=faker.sentence(nb_words=4),
+            url=faker.url(),
+        )
+        for team in teams
+        if random() < 0.5
+    ]
+    Solution.objects.bulk_create(solutions, batch_size=BULK_BATCH_SIZE)
+
+
+@transaction.atomic
+def bulk_create_fake_content(coefficient: float = 1) -> None:
+    """Create users, profiles, events, teams, participants and solutions in bulk."""
+    users = bulk_create_fake_users_with_profiles(coefficient=coefficient)
+    events = bulk_create_fake_events(coefficient=coefficient)
+    bulk_create_fake_registrations(events=events, users=users)
+    recalculate_event_counters(events=Event.objects.filter(pk__in=[event.pk for event in events]))
+
+
 class Command(BaseCommand):
     """
     Command for create fake content. Fills the database with fake data.\n
@@ -90,7 +257,11 @@ class Command(BaseCommand):
 
     Formula:\n
     100 users * `coefficient` \n
-    20 events * `coefficient`
+    20 events * `coefficient`\n
+
+    `--bulk` - create everything with `bulk_create` (one password hash for all users)
+    and also fill events with teams, participants and solutions. Use it to generate
+    large benchmark datasets, e.g. `create_fake_content 1000 --bulk`.
     """
 
     def add_arguments(self, parser) -> None:
@@ -99,11 +270,20 @@ class Command(BaseCommand):
             type=float,
             help='Indicates the coefficient of fakedata',
         )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Create data with bulk_create, including teams, participants and solutions',
+        )
 
     def handle(self, *args: Any, **kwargs: Any) -> None:
         coefficient = kwargs['coefficient']
 
         Faker.seed(0)
 
+        if kwargs['bulk']:
+            bulk_create_fake_content(coefficient=coefficient)
+            return
+
         create_fake_users_and_edit_profiles(coefficient=coefficient)
         create_fake_events(coefficient=coefficient)
@@ -0,0 +1,155 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from common.loadtest import SCENARIOS, Report, create_fixtures, delete_fixtures, run_virtual_user
+
+
+class Command(BaseCommand):
+    """
+    Command for load testing a running server with registration-day traffic.\n
+
+    Run it against a server that uses the same database, e.g.:\n
+    QUERY_COUNT_HEADER=1 python manage.py runserver\n
+    python manage.py run_load_test --base-url http://localhost:8000 --seed 5\n
+
+    Reports p50/p95/p99 latency per endpoint and, when the server runs with
+    `QUERY_COUNT_HEADER=1`, average and maximum number of SQL queries per request.
+
+    All virtual users come from one IP address, so run the server with
+    `RATE_LIMIT_ENABLED=0` (or raised `RATE_LIMIT_*_IP` limits), otherwise the
+    signup and sign in scenarios measure 429 responses. 429 responses are
+    reported in the `429` column, apart from errors and latency percentiles.
+    """
+
+    help = 'Run registration-day load test against a running server'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            '--base-url',
+            default='http://localhost:8000',
+            help='URL of the server under test (default http://localhost:8000)',
+        )
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=20,
+            help='Number of concurrent virtual users (default 20)',
+        )
+        parser.add_argument(
+            '--duration',
+            type=int,
+            default=60,
+            help='Test duration in seconds (default 60)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=float,
+            default=0,
+            help='Run create_fake_content with this coefficient before the test',
+        )
+        parser.add_argument(
+            '--students',
+            type=int,
+            default=200,
+            help='Number of student accounts created for the test (default 200)',
+        )
+        parser.add_argument(
+            '--events',
+            type=int,
+            default=5,
+            help='Number of individual and team events created for the test (default 5)',
+        )
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            default=[],
+            metavar='NAME=WEIGHT',
+            help=f'Override scenario weight, scenarios: {", ".join(SCENARIOS)}',
+        )
+        parser.add_argument(
+            '--keep-data',
+            action='store_true',
+            help='Do not delete accounts and events created by the test',
+        )
+        parser.add_argument(
+            '--cleanup',
+            action='store_true',
+            help='Only delete data left by previous load tests and exit',
+        )
+
+    def handle(self, *args: Any, **kwargs: Any) -> None:
+        if kwargs['cleanup']:
+            self.stdout.write(f'Deleted {delete_fixtures()} objects')
+            return
+
+        scenarios = {name: weight for name, (_, weight) in SCENARIOS.items()}
+        for override in kwargs['scenario']:
+            name, _, weight = override.partition('=')
+            if name not in SCENARIOS or not weight.isdigit():
+                raise CommandError(f'Invalid scenario override: {override}')
+            scenarios[name] = int(weight)
+        scenarios = {name: weight for name, weight in scenarios.items() if weight > 0}
+        if not scenarios:
+            raise CommandError('All scenarios are disabled')
+
+        if kwargs['seed']:
+            call_command('create_fake_content', kwargs['seed'])
+        fixtures = create_fixtures(students=kwargs['students'], events=kwargs['events'])
+
+        report = Report()
+        deadline = time.monotonic() + kwargs['duration']
+        started = time.monotonic()
+        try:
+            with ThreadPoolExecutor(max_workers=kwargs['users']) as executor:
+                futures = [
+                    executor.submit(
+                        run_virtual_user,
+                        kwargs['base_url'],
+                        fixtures,
+                        report,
+                        deadline,
+                        seed,
+                        scenarios,
+                    )
+                    for seed in range(kwargs['users'])
+                ]
+                for future in futures:
+                    future.result()
+        finally:
+            if not kwargs['keep_data']:
+                delete_fixtures()
+        elapsed = time.monotonic() - started
+
+        self._print_report(report, elapsed)
+
+    def _print_report(self, report: Report, elapsed: float) -> None:
+        header = (
+            f'{"endpoint":<40} {"reqs":>6} {"429":>5} {"errs":>5} '
+            f'{"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"queries":>8} {"max q":>6}'
+        )
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for row in report.rows():
+            queries = f'{row["queries"]:.1f}' if row['queries'] is not None else '-'
+            max_queries = row['max_queries'] if row['max_queries'] is not None else '-'
+            self.stdout.write(
+                f'{row["name"]:<40} {row["requests"]:>6} {row["rate_limited"]:>5} '
+                f'{row["errors"]:>5} '
+                f'{row["p50"]:>8.1f} {row["p95"]:>8.1f} {row["p99"]:>8.1f} '
+                f'{queries:>8} {max_queries:>6}',
+            )
+        total = len(report.samples)
+        if report.rate_limited:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'{report.rate_limited} requests were rate limited (429): run the server '
+                    f'with RATE_LIMIT_ENABLED=0 or raised RATE_LIMIT_*_IP limits',
+                ),
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f'{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} rps)'),
+        )
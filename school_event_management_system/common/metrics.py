@@ -0,0 +1,37 @@
+"""
+Простые счётчики событий приложения.
+
+Счётчики копятся в Redis в хэше `common:metrics:{YYYY-MM-DD}` (по дням, хранятся
+`METRICS_TIMEOUT` секунд) и дублируются в лог `common.metrics`.
+"""
+
+import logging
+from datetime import date
+
+from django.utils import timezone
+
+from config.redis import redis_connection
+
+METRICS_TIMEOUT = 60 * 60 * 24 * 30  # Тридцать дней в секундах
+
+logger = logging.getLogger(__name__)
+
+
+def _metrics_key(day: date) -> str:
+    return f'common:metrics:{day.isoformat()}'
+
+
+def increment_metric(name: str, value: int = 1) -> None:
+    """Увеличить счётчик `name` на `value` за сегодняшний день."""
+    key = _metrics_key(timezone.localdate())
+    pipeline = redis_connection.pipeline()
+    pipeline.hincrby(key, name, value)
+    pipeline.expire(key, METRICS_TIMEOUT)
+    pipeline.execute()
+    logger.info('%s +%s', name, value)
+
+
+def get_metrics(day: date | None = None) -> dict[str, int]:
+    """Вернуть все счётчики за день `day` (по умолчанию за сегодня)."""
+    metrics = redis_connection.hgetall(_metrics_key(day or timezone.localdate()))
+    return {name.decode(): int(value) for name, value in metrics.items()}
@@ -0,0 +1,67 @@
+from contextlib import ExitStack
+from typing import Callable
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+
+from common.routers import is_replica_configured, pinned_to_primary
+from common.services import is_user_pinned_to_primary_database, pin_user_to_primary_database
+
+
+class PrimaryDatabasePinningMiddleware:
+    """
+    Закрепляет чтения пользователя за основной базой данных после записи.
+
+    После любого небезопасного запроса (POST, PUT, ...) пользователь на
+    `REPLICA_PIN_SECONDS` секунд читает только из `default`, чтобы сразу увидеть
+    свою регистрацию, даже если реплика ещё отстаёт.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if not is_replica_configured():
+            return self.get_response(request)
+
+        pinned = (
+            request.user.is_authenticated and
+            is_user_pinned_to_primary_database(request.user.pk)
+        )
+        with pinned_to_primary(pinned):
+            response = self.get_response(request)
+
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and request.user.is_authenticated:
+            pin_user_to_primary_database(request.user.pk, settings.REPLICA_PIN_SECONDS)
+        return response
+
+
+class QueryCountMiddleware:
+    """
+    Добавляет в ответ заголовок `X-Query-Count` с количеством SQL-запросов.
+
+    Включается настройкой `QUERY_COUNT_HEADER` и используется нагрузочным
+    тестом (`run_load_test`) для подсчёта запросов к базе данных на каждый запрос.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if not settings.QUERY_COUNT_HEADER:
+            return self.get_response(request)
+
+        queries = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count_query))
+            response = self.get_response(request)
+        response['X-Query-Count'] = str(queries)
+        return response
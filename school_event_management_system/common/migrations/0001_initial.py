@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CKEditorImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='файл')),
+                ('optimized_name', models.CharField(blank=True, max_length=255, verbose_name='сжатая копия')),
+            ],
+            options={
+                'verbose_name': 'изображение CKEditor',
+                'verbose_name_plural': 'изображения CKEditor',
+            },
+        ),
+    ]
@@ -0,0 +1,130 @@
+from datetime import datetime
+
+from celery import Task
+
+from django import forms
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.db.models import QuerySet
+from django.http import HttpRequest, HttpResponseRedirect
+from django.shortcuts import redirect
+from django.utils.cache import patch_cache_control
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+
+from common.jobs import create_admin_job
+from common.ratelimit import check_rate_limit, get_client_ip, rate_limited_response
+from common.routers import use_replica
+
+
+class ReplicaChangelistAdminMixin:
+    """Читать списки объектов в админ-панели с реплики базы данных."""
+
+    @method_decorator(use_replica)
+    def changelist_view(self, request, extra_context=None):
+        return super(ReplicaChangelistAdminMixin, self).changelist_view(request, extra_context)
+
+
+class AutocompleteListFilterAdminMixin:
+    """Подключить select2 к списку объектов для фильтров `common.filters.AutocompleteListFilter`."""
+
+    @property
+    def media(self) -> forms.Media:
+        media = super(AutocompleteListFilterAdminMixin, self).media
+        return media + AutocompleteSelect(None, self.admin_site).media
+
+
+class BackgroundActionsAdminMixin:
+    """Выполнять тяжёлые массовые действия админ-панели фоновыми задачами Celery."""
+
+    def run_in_background(
+            self,
+            request: HttpRequest,
+            queryset: QuerySet,
+            task: Task,
+            title: str,
+            **task_kwargs,
+    ) -> HttpResponseRedirect:
+        """
+        Поставить `task(job_id, ids, **task_kwargs)` в очередь, где `ids` - первичные
+        ключи объектов `queryset`, и перенаправить на страницу прогресса задачи.
+        """
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True))
+        job_id = create_admin_job(user_id=request.user.pk, title=title, total=len(ids))
+        task.delay(job_id, ids, **task_kwargs)
+        self.message_user(
+            request,
+            f'{title}: задача поставлена в очередь ({len(ids)} шт.)',
+            messages.INFO,
+        )
+        return redirect('admin_job', job_id=job_id)
+
+
+class RateLimitMixin:
+    """
+    Ограничить частоту запросов к представлению лимитами `settings.RATE_LIMITS[ratelimit_scope]`
+    по IP-адресу (`ip`) и по аккаунту (`account`, см. `get_ratelimit_account`).
+    """
+
+    ratelimit_scope: str = None
+    ratelimit_methods: tuple[str, ...] = ('POST', )
+
+    def get_ratelimit_account(self, request: HttpRequest) -> str | int | None:
+        """Вернуть идентификатор аккаунта, к которому относится запрос."""
+        if request.user.is_authenticated:
+            return request.user.pk
+        return None
+
+    def dispatch(self, request: HttpRequest, *args, **kwargs):
+        if request.method in self.ratelimit_methods:
+            result = check_rate_limit(
+                self.ratelimit_scope,
+                ip=get_client_ip(request),
+                account=self.get_ratelimit_account(request),
+            )
+            if not result.allowed:
+                return rate_limited_response(request, result)
+        return super(RateLimitMixin, self).dispatch(request, *args, **kwargs)
+
+
+class AnonymousConditionalGetMixin:
+    """
+    Условные ответы (`ETag`/`Last-Modified`, 304) анонимным пользователям.
+
+    Повторный запрос с совпадающим `If-None-Match` или `If-Modified-Since` получает
+    304 без выборки и рендеринга страницы. Ответы 200 и 304 помечаются публичными на
+    `ANONYMOUS_PAGE_MAX_AGE` секунд, чтобы его кэшировал nginx (`proxy_cache`).
+    Страницы авторизованных пользователей и страницы с непоказанными сообщениями
+    отдаются как обычно.
+    """
+
+    def get_etag(self, request: HttpRequest, *args, **kwargs) -> str | None:
+        return None
+
+    def get_last_modified(self, request: HttpRequest, *args, **kwargs) -> datetime | None:
+        return None
+
+    def _get_release_etag(self, request: HttpRequest, *args, **kwargs) -> str | None:
+        # Версия релиза меняет `ETag` после выкладки изменённых шаблонов
+        etag = self.get_etag(request, *args, **kwargs)
+        if etag is None or not settings.RELEASE_VERSION:
+            return etag
+        return f'{settings.RELEASE_VERSION}:{etag}'
+
+    def dispatch(self, request: HttpRequest, *args, **kwargs):
+        dispatch = super(AnonymousConditionalGetMixin, self).dispatch
+        if (
+            request.method not in ('GET', 'HEAD') or
+            request.user.is_authenticated or
+            messages.get_messages(request)
+        ):
+            return dispatch(request, *args, **kwargs)
+        response = condition(
+            etag_func=self._get_release_etag,
+            last_modified_func=self.get_last_modified,
+        )(dispatch)(request, *args, **kwargs)
+        # Ошибки и перенаправления не кэшируются: например, 404 неопубликованного события
+        if response.status_code in (200, 304):
+            patch_cache_control(response, public=True, max_age=settings.ANONYMOUS_PAGE_MAX_AGE)
+        return response
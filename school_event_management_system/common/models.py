@@ -0,0 +1,24 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class CKEditorImage(models.Model):
+    """Изображение, загруженное через CKEditor, и его сжатая копия (см. `common.ckeditor`)."""
+
+    name = models.CharField(
+        verbose_name=_('файл'),
+        max_length=255,
+        unique=True,
+    )
+    optimized_name = models.CharField(
+        verbose_name=_('сжатая копия'),
+        max_length=255,
+        blank=True,
+    )
+
+    class Meta:
+        verbose_name = _('изображение CKEditor')
+        verbose_name_plural = _('изображения CKEditor')
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,141 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date
+from typing import Any
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import BooleanField, F, Model, QuerySet
+from django.db.models.expressions import RawSQL
+from django.utils.functional import cached_property
+
+
+class InvalidCursorError(ValueError):
+    """Курсор постраничной навигации повреждён или подделан."""
+
+
+@dataclass
+class KeysetPage:
+    """Страница keyset-пагинации: объекты и курсор следующей страницы."""
+
+    object_list: list[Model]
+    next_cursor: str | None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+
+def encode_cursor(value: date | None, pk: int) -> str:
+    """Закодировать позицию (значение поля сортировки, `pk`) в курсор для URL."""
+    payload = json.dumps([value.isoformat() if value else None, pk], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple[date | None, int]:
+    """Раскодировать курсор, созданный `encode_cursor`."""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        value, pk = json.loads(payload)
+        return (date.fromisoformat(value) if value else None), int(pk)
+    except (binascii.Error, TypeError, ValueError) as error:
+        raise InvalidCursorError(cursor) from error
+
+
+def _get_row_comparison(
+        queryset: QuerySet,
+        field: str,
+        operator: str,
+        value: Any,
+        pk: int,
+) -> RawSQL:
+    """Условие `(field, id) <operator> (value, pk)`: сравнение пар - один диапазон индекса."""
+    quote_name = connections[queryset.db].ops.quote_name
+    opts = queryset.model._meta
+    table = quote_name(opts.db_table)
+    columns = ', '.join(
+        f'{table}.{quote_name(column)}' for column in (opts.get_field(field).column, opts.pk.column)
+    )
+    return RawSQL(f'({columns}) {operator} (%s, %s)', (value, pk), output_field=BooleanField())
+
+
+def keyset_paginate(
+        queryset: QuerySet,
+        field: str,
+        cursor: str | None,
+        page_size: int,
+        descending: bool = False,
+) -> KeysetPage:
+    """
+    Вернуть страницу `queryset`, упорядоченного по (`field`, `pk`), после позиции `cursor`.
+
+    Объекты с пустым `field` идут в конце. Страница выбирается в две фазы: сначала
+    объекты с `field` после позиции (сравнение пар `(field, id)`), затем, если их не
+    хватило, хвост с пустым `field` по `pk`. В каждой фазе `field` либо заполнен, либо
+    пуст, поэтому порядок NULL не важен и обе фазы - диапазон обычного индекса,
+    оканчивающегося на (`field`, `id`) с той же сортировкой. В отличие от OFFSET
+    стоимость любой страницы постоянна.
+    """
+    if descending:
+        ordering = (F(field).desc(), F('pk').desc())
+        operator, pk_after, empty_ordering = '<', 'pk__lt', F('pk').desc()
+    else:
+        ordering = (F(field).asc(), F('pk').asc())
+        operator, pk_after, empty_ordering = '>', 'pk__gt', F('pk').asc()
+
+    value, pk = decode_cursor(cursor) if cursor else (None, None)
+    object_list = []
+    if not cursor or value is not None:
+        filled = queryset.filter(**{f'{field}__isnull': False})
+        if cursor:
+            filled = filled.filter(_get_row_comparison(queryset, field, operator, value, pk))
+        object_list = list(filled.order_by(*ordering)[:page_size + 1])
+    if len(object_list) <= page_size:
+        empty = queryset.filter(**{f'{field}__isnull': True})
+        if cursor and value is None:
+            empty = empty.filter(**{pk_after: pk})
+        object_list += list(empty.order_by(empty_ordering)[:page_size + 1 - len(object_list)])
+
+    next_cursor = None
+    if len(object_list) > page_size:
+        object_list = object_list[:page_size]
+        last: Any = object_list[-1]
+        next_cursor = encode_cursor(getattr(last, field), last.pk)
+    return KeysetPage(object_list=object_list, next_cursor=next_cursor)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator, который для больших таблиц без фильтров берёт количество строк
+    из статистики PostgreSQL (`pg_class.reltuples`) вместо `SELECT COUNT(*)`.
+
+    Оценка используется, только если она не меньше `ESTIMATED_COUNT_THRESHOLD`.
+    Для отфильтрованных queryset'ов и других СУБД количество считается точно.
+    """
+
+    @cached_property
+    def count(self) -> int:
+        estimate = self._get_estimated_count()
+        if estimate is not None and estimate >= settings.ESTIMATED_COUNT_THRESHOLD:
+            return estimate
+        return super(EstimatedCountPaginator, self).count
+
+    def _get_estimated_count(self) -> int | None:
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet) or queryset.query.has_filters():
+            return None
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row is None or row[0] < 0:
+            return None
+        return row[0]
@@ -0,0 +1,113 @@
+"""
+Ограничение частоты запросов по IP-адресу и по аккаунту.
+
+Лимиты задаются в `settings.RATE_LIMITS` для каждой области (`scope`):
+`{'signin': {'ip': '20/m', 'account': '5/m'}}`. Каждая пара (вид ключа, значение)
+считается в Redis скользящим окном - отсортированным множеством с временем
+запросов `common:ratelimit:{scope}:{kind}:{value}`. Все окна одного запроса
+проверяются и пополняются одним Lua-скриптом, то есть за одно обращение к Redis.
+"""
+
+import time
+from dataclasses import dataclass
+from uuid import uuid4
+
+from django.conf import settings
+from django.http import HttpRequest
+from django.template.response import TemplateResponse
+
+from common.metrics import increment_metric
+from config.redis import redis_connection
+
+RATE_PERIODS = {
+    's': 1,
+    'm': 60,
+    'h': 60 * 60,
+    'd': 60 * 60 * 24,
+}
+
+# KEYS - окна, ARGV - текущее время (мс), уникальная метка запроса и пары (окно в мс, лимит).
+# Возвращает 0, если запрос разрешён (и учтён во всех окнах), иначе - через сколько
+# миллисекунд освободится место в самом загруженном окне.
+SLIDING_WINDOW_SCRIPT = redis_connection.register_script(
+    """
+    local now = tonumber(ARGV[1])
+    local member = ARGV[2]
+    local retry_after = 0
+    for i, key in ipairs(KEYS) do
+        local window = tonumber(ARGV[1 + i * 2])
+        local limit = tonumber(ARGV[2 + i * 2])
+        redis.call('ZREMRANGEBYSCORE', key, 0, now - window)
+        if redis.call('ZCARD', key) >= limit then
+            local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+            retry_after = math.max(retry_after, tonumber(oldest[2]) + window - now)
+        end
+    end
+    if retry_after > 0 then
+        return retry_after
+    end
+    for i, key in ipairs(KEYS) do
+        redis.call('ZADD', key, now, member)
+        redis.call('PEXPIRE', key, tonumber(ARGV[1 + i * 2]))
+    end
+    return 0
+    """,
+)
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    retry_after: int = 0  # Секунды
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    """Разобрать лимит вида `'5/m'` в (количество запросов, окно в секундах)."""
+    limit, period = rate.split('/')
+    return int(limit), RATE_PERIODS[period]
+
+
+def get_client_ip(request: HttpRequest) -> str:
+    """
+    Вернуть IP-адрес клиента. За nginx это последний адрес `X-Forwarded-For`:
+    его добавляет сам nginx, а предыдущие клиент может подставить любыми.
+    """
+    forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if forwarded_for and settings.RATE_LIMIT_TRUST_X_FORWARDED_FOR:
+        return forwarded_for.split(',')[-1].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def check_rate_limit(scope: str, **values: str | int | None) -> RateLimitResult:
+    """
+    Учесть запрос в области `scope` и проверить её лимиты для переданных значений
+    ключей (`ip=...`, `account=...`). Пустые значения и ключи без лимита пропускаются.
+    """
+    limits = settings.RATE_LIMITS.get(scope, {})
+    keys, args = [], []
+    for kind, value in values.items():
+        if not value or kind not in limits:
+            continue
+        limit, period = parse_rate(limits[kind])
+        keys.append(f'common:ratelimit:{scope}:{kind}:{str(value).lower()}')
+        args.extend((period * 1000, limit))
+    if not keys or not settings.RATE_LIMIT_ENABLED:
+        return RateLimitResult(allowed=True)
+
+    now = int(time.time() * 1000)
+    retry_after = int(SLIDING_WINDOW_SCRIPT(keys=keys, args=[now, f'{now}:{uuid4().hex}', *args]))
+    if retry_after:
+        increment_metric(f'ratelimit.{scope}.blocked')
+        return RateLimitResult(allowed=False, retry_after=-(-retry_after // 1000))
+    return RateLimitResult(allowed=True)
+
+
+def rate_limited_response(request: HttpRequest, result: RateLimitResult) -> TemplateResponse:
+    response = TemplateResponse(
+        request,
+        'errors/429.html',
+        context={'retry_after': result.retry_after},
+        status=429,
+    )
+    response['Retry-After'] = str(result.retry_after)
+    return response
@@ -0,0 +1,92 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Iterator
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpRequest
+
+REPLICA_DB_ALIAS = 'replica'
+
+_replica_reads_enabled: ContextVar[bool] = ContextVar('replica_reads_enabled', default=False)
+_pinned_to_primary: ContextVar[bool] = ContextVar('pinned_to_primary', default=False)
+
+
+def is_replica_configured() -> bool:
+    """Вернуть True, если в настройках описана база данных `replica`."""
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def replica_reads() -> Iterator[None]:
+    """Направить чтения внутри блока на реплику (если она настроена и чтения не закреплены)."""
+    token = _replica_reads_enabled.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads_enabled.reset(token)
+
+
+@contextmanager
+def pinned_to_primary(pinned: bool = True) -> Iterator[None]:
+    """Закрепить все чтения внутри блока за основной базой данных."""
+    token = _pinned_to_primary.set(pinned)
+    try:
+        yield
+    finally:
+        _pinned_to_primary.reset(token)
+
+
+def use_replica(view_func: Callable) -> Callable:
+    """
+    Декоратор представления: безопасные запросы (GET, HEAD) читают данные с реплики.
+
+    `TemplateResponse` рендерится внутри декоратора, чтобы ленивые queryset'ы,
+    вычисляемые в шаблоне, тоже ушли на реплику.
+    """
+
+    @wraps(view_func)
+    def wrapper(request: HttpRequest, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view_func(request, *args, **kwargs)
+        with replica_reads():
+            response = view_func(request, *args, **kwargs)
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.render()
+        return response
+
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+    """
+    Маршрутизатор баз данных.
+
+    Записи всегда уходят в `default`. Чтения уходят в `replica` только внутри
+    `replica_reads()` и только если пользователь не закреплён за основной базой
+    после недавней записи (см. `common.middleware.PrimaryDatabasePinningMiddleware`).
+    """
+
+    def db_for_read(self, model, **hints) -> str | None:
+        if (
+            _replica_reads_enabled.get() and
+            not _pinned_to_primary.get() and
+            is_replica_configured()
+        ):
+            return REPLICA_DB_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints) -> str:
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool | None:
+        databases = {DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db: str, app_label: str, model_name=None, **hints) -> bool | None:
+        if db == REPLICA_DB_ALIAS:
+            return False
+        return None
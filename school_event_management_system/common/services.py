@@ -1,3 +1,4 @@
+import json
 from typing import Any
 
 from config.redis import redis_connection
@@ -11,3 +12,30 @@ def is_cooldown_ended(key: str) -> bool:
 def set_key_with_timeout(key: str, timeout: int, value: int) -> Any:
     """Установите пару ключ-значение в Redis с указанным таймаутом."""
     return redis_connection.setex(key, timeout, value)
+
+
+def get_json_value(key: str) -> Any:
+    """Вернуть значение, сохранённое в Redis функцией `set_json_value_with_timeout`, или None."""
+    value = redis_connection.get(key)
+    if value is None:
+        return None
+    return json.loads(value)
+
+
+def set_json_value_with_timeout(key: str, timeout: int, value: Any) -> Any:
+    """Сохранить в Redis значение, сериализуемое в JSON, с указанным таймаутом."""
+    return redis_connection.setex(key, timeout, json.dumps(value, ensure_ascii=False))
+
+
+def _primary_database_pin_key(user_id: int | str) -> str:
+    return f'common:user:{user_id}:db.pinned'
+
+
+def pin_user_to_primary_database(user_id: int | str, timeout: int) -> None:
+    """Закрепить чтения пользователя за основной базой данных на `timeout` секунд."""
+    set_key_with_timeout(_primary_database_pin_key(user_id), timeout, 1)
+
+
+def is_user_pinned_to_primary_database(user_id: int | str) -> bool:
+    """Вернуть True, если пользователь недавно что-то записывал в базу данных."""
+    return not is_cooldown_ended(_primary_database_pin_key(user_id))
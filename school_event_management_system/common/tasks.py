@@ -0,0 +1,15 @@
+from celery import shared_task
+
+
+@shared_task(
+    autoretry_for=(OSError,),
+    max_retries=3,
+    retry_backoff=60,
+    soft_time_limit=60,
+    time_limit=120,
+)
+def optimize_ckeditor_image(name: str) -> None:
+    """Сжать изображение, загруженное через CKEditor, и сделать его миниатюру."""
+    from . import ckeditor
+
+    ckeditor.save_optimized_ckeditor_image(name=name)
@@ -0,0 +1,11 @@
+from django import template
+
+from common.ckeditor import replace_optimized_images
+
+register = template.Library()
+
+
+@register.filter
+def optimized_images(html: str | None) -> str:
+    """`{{ event.description|optimized_images|safe }}` - HTML со сжатыми копиями изображений."""
+    return replace_optimized_images(html)
@@ -0,0 +1,210 @@
+from datetime import date
+from io import BytesIO
+from tempfile import TemporaryDirectory
+
+from PIL import Image
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.files.storage import default_storage
+from django.http import HttpRequest, HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.views import View
+
+from common.ckeditor import (
+    get_optimized_image_name,
+    replace_optimized_images,
+    save_optimized_ckeditor_image,
+)
+from common.loadtest import Report, Sample
+from common.mixins import AnonymousConditionalGetMixin
+from common.models import CKEditorImage
+from common.pagination import InvalidCursorError, keyset_paginate
+from events.models import Event, EventTypeChoices
+
+
+class KeysetPaginateTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        dates = [
+            date(2024, 1, 1),
+            None,
+            date(2024, 1, 1),
+            date(2024, 2, 1),
+            None,
+            date(2023, 5, 1),
+            None,
+        ]
+        cls.events = [
+            Event.objects.create(
+                name=f'Мероприятие {number}',
+                slug=f'event-{number}',
+                type=EventTypeChoices.INDIVIDUAL,
+                date_of_starting_event=date_of_starting_event,
+            )
+            for number, date_of_starting_event in enumerate(dates)
+        ]
+
+    def _get_all_pages(self, page_size: int, descending: bool) -> list[int]:
+        pks, cursor = [], None
+        while True:
+            page = keyset_paginate(
+                queryset=Event.objects.all(),
+                field='date_of_starting_event',
+                cursor=cursor,
+                page_size=page_size,
+                descending=descending,
+            )
+            self.assertLessEqual(len(page.object_list), page_size)
+            pks += [event.pk for event in page.object_list]
+            if not page.has_next:
+                return pks
+            cursor = page.next_cursor
+
+    def _get_expected(self, descending: bool) -> list[int]:
+        filled = sorted(
+            (event for event in self.events if event.date_of_starting_event),
+            key=lambda event: (event.date_of_starting_event, event.pk),
+            reverse=descending,
+        )
+        empty = sorted(
+            (event for event in self.events if not event.date_of_starting_event),
+            key=lambda event: event.pk,
+            reverse=descending,
+        )
+        return [event.pk for event in filled + empty]
+
+    def test_ascending_pages_end_with_empty_dates(self):
+        for page_size in (1, 2, 4, 7, 10):
+            with self.subTest(page_size=page_size):
+                self.assertEqual(
+                    self._get_all_pages(page_size, descending=False),
+                    self._get_expected(descending=False),
+                )
+
+    def test_descending_pages_end_with_empty_dates(self):
+        for page_size in (1, 2, 4, 7, 10):
+            with self.subTest(page_size=page_size):
+                self.assertEqual(
+                    self._get_all_pages(page_size, descending=True),
+                    self._get_expected(descending=True),
+                )
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(InvalidCursorError):
+            keyset_paginate(
+                queryset=Event.objects.all(),
+                field='date_of_starting_event',
+                cursor='not-a-cursor',
+                page_size=2,
+            )
+
+
+class OptimizedCKEditorImagesTestCase(TestCase):
+    def setUp(self):
+        media_root = TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        media_settings = override_settings(MEDIA_ROOT=media_root.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+    def test_optimized_name_is_outside_upload_path(self):
+        self.assertEqual(
+            get_optimized_image_name('content/ckeditor/2024/01/01/photo.jpg'),
+            'content/ckeditor-optimized/2024/01/01/photo.jpg.webp',
+        )
+
+    def test_saves_optimized_copy_name(self):
+        content = BytesIO()
+        Image.linear_gradient('L').resize((2000, 1000)).convert('RGB').save(
+            content,
+            'JPEG',
+            quality=100,
+        )
+        name = default_storage.save('content/ckeditor/2024/01/01/photo.jpg', content)
+
+        optimized_name = save_optimized_ckeditor_image(name)
+
+        self.assertEqual(optimized_name, get_optimized_image_name(name))
+        self.assertTrue(default_storage.exists(optimized_name))
+        self.assertEqual(CKEditorImage.objects.get(name=name).optimized_name, optimized_name)
+
+    def test_replaces_only_images_with_optimized_copies(self):
+        CKEditorImage.objects.create(
+            name='content/ckeditor/2024/01/01/photo.jpg',
+            optimized_name='content/ckeditor-optimized/2024/01/01/photo.jpg.webp',
+        )
+        CKEditorImage.objects.create(name='content/ckeditor/2024/01/01/other.png')
+        html = (
+            '<img src="/media/content/ckeditor/2024/01/01/photo.jpg" style="width:300px">'
+            '<img src="/media/content/ckeditor/2024/01/01/other.png">'
+            '<img src="/media/content/ckeditor/2024/01/01/photo.jpg">'
+        )
+
+        # Один запрос на весь HTML, без обращений к хранилищу
+        with self.assertNumQueries(1):
+            replaced = replace_optimized_images(html)
+
+        self.assertEqual(
+            replaced,
+            '<img src="/media/content/ckeditor-optimized/2024/01/01/photo.jpg.webp" '
+            'style="width:300px">'
+            '<img src="/media/content/ckeditor/2024/01/01/other.png">'
+            '<img src="/media/content/ckeditor-optimized/2024/01/01/photo.jpg.webp">',
+        )
+
+    def test_empty_html(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(replace_optimized_images(None), '')
+            self.assertEqual(replace_optimized_images('<p>Текст</p>'), '<p>Текст</p>')
+
+
+class ConditionalPageView(AnonymousConditionalGetMixin, View):
+    status_code = 200
+
+    def get_etag(self, request: HttpRequest, *args, **kwargs) -> str:
+        return 'page'
+
+    def get(self, request: HttpRequest, *args, **kwargs):
+        return HttpResponse(status=self.status_code)
+
+
+@override_settings(ANONYMOUS_PAGE_MAX_AGE=60, RELEASE_VERSION='')
+class AnonymousConditionalGetMixinTestCase(SimpleTestCase):
+    def get(self, status_code: int = 200, **headers) -> HttpResponse:
+        request = RequestFactory().get('/', headers=headers)
+        request.user = AnonymousUser()
+        return ConditionalPageView.as_view(status_code=status_code)(request)
+
+    def test_ok_response_is_public(self):
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+
+    def test_not_modified_response_is_public(self):
+        response = self.get(if_none_match='"page"')
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+
+    def test_error_responses_are_not_public(self):
+        for status_code in (302, 404, 500):
+            with self.subTest(status_code=status_code):
+                self.assertFalse(self.get(status_code).has_header('Cache-Control'))
+
+
+class LoadTestReportTestCase(SimpleTestCase):
+    def test_rate_limited_responses_are_not_errors(self):
+        report = Report()
+        for status, latency in ((200, 0.1), (302, 0.2), (429, 0.001), (429, 0.001), (500, 0.4)):
+            report.add(Sample(name='signup [POST]', status=status, latency=latency, queries=6))
+
+        row, = report.rows()
+
+        self.assertEqual(report.rate_limited, 2)
+        self.assertEqual(row['requests'], 5)
+        self.assertEqual(row['rate_limited'], 2)
+        self.assertEqual(row['errors'], 1)
+        # Быстрые ответы 429 не занижают процентили
+        self.assertEqual(row['p50'], 200)
+        self.assertEqual(row['p99'], 400)
@@ -0,0 +1,16 @@
+from django.urls import path
+
+from common.views import AdminJobDownloadView, AdminJobView
+
+urlpatterns = [
+    path(
+        route='admin-jobs/<str:job_id>/',
+        view=AdminJobView.as_view(),
+        name='admin_job',
+    ),
+    path(
+        route='admin-jobs/<str:job_id>/download/',
+        view=AdminJobDownloadView.as_view(),
+        name='admin_job_download',
+    ),
+]
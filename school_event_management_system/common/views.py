@@ -0,0 +1,58 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib import admin
+from django.http import FileResponse, Http404, HttpRequest
+from django.views.generic import View
+from django.views.generic.base import TemplateResponseMixin
+
+from accounts.mixins import SuperOrStaffUserRequiredMixin
+from common.jobs import get_admin_job
+
+
+class AdminJobMixin(SuperOrStaffUserRequiredMixin):
+    """Загрузить фоновую задачу админ-панели, доступную текущему пользователю."""
+
+    def get_job(self, request: HttpRequest, job_id: str) -> dict:
+        job = get_admin_job(job_id)
+        if job is None:
+            raise Http404
+        if job['user_id'] != request.user.pk and not request.user.is_superuser:
+            raise Http404
+        return job
+
+
+class AdminJobView(
+    AdminJobMixin,
+    TemplateResponseMixin,
+    View,
+):
+    """Просмотр прогресса фоновой задачи админ-панели."""
+
+    template_name = 'admin/admin_job.html'
+
+    def get(self, request: HttpRequest, job_id: str):
+        job = self.get_job(request, job_id)
+        return self.render_to_response(
+            context={
+                **admin.site.each_context(request),
+                'title': job['title'],
+                'job': job,
+            },
+        )
+
+
+class AdminJobDownloadView(
+    AdminJobMixin,
+    View,
+):
+    """Скачивание результата фоновой задачи админ-панели."""
+
+    def get(self, request: HttpRequest, job_id: str):
+        job = self.get_job(request, job_id)
+        if not job['file']:
+            raise Http404
+        path = Path(settings.MEDIA_ROOT) / job['file']
+        if not path.exists():
+            raise Http404
+        return FileResponse(path.open('rb'), as_attachment=True, filename=path.name)
@@ -2,6 +2,8 @@ from os import environ
 from pathlib import Path
 from socket import gethostbyname_ex, gethostname
 
+from celery.schedules import crontab
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = environ.get('SECRET_KEY')
@@ -41,10 +43,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'common.middleware.QueryCountMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.middleware.UserActivityMiddleware',
+    'common.middleware.PrimaryDatabasePinningMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 
@@ -93,6 +98,27 @@ DATABASES = {
     },
 }
 
+# Optional read replica: listings, archive, diplomas, exports and admin changelists
+# read from it, see `common.routers.PrimaryReplicaRouter`.
+
+if environ.get('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': environ.get('DB_REPLICA_NAME', environ.get('DB_NAME')),
+        'USER': environ.get('DB_REPLICA_USER', environ.get('DB_USER')),
+        'PASSWORD': environ.get('DB_REPLICA_PASSWORD', environ.get('DB_PASSWORD')),
+        'HOST': environ.get('DB_REPLICA_HOST'),
+        'PORT': int(environ.get('DB_REPLICA_PORT', 5432)),
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    }
+
+DATABASE_ROUTERS = ['common.routers.PrimaryReplicaRouter']
+
+# Seconds during which a user reads from `default` after writing something
+REPLICA_PIN_SECONDS = int(environ.get('DB_REPLICA_PIN_SECONDS', 10))
+
 
 # Password validation
 
@@ -112,10 +138,31 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing. New and changed passwords use scrypt, older hashes (PBKDF2)
+# are rehashed on the next sign in. Tune parameters with `calibrate_password_hasher`
+
+PASSWORD_HASHERS = [
+    'accounts.hashers.TunedScryptPasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
+PASSWORD_SCRYPT_WORK_FACTOR = int(environ.get('PASSWORD_SCRYPT_WORK_FACTOR', 2 ** 14))
+PASSWORD_SCRYPT_BLOCK_SIZE = int(environ.get('PASSWORD_SCRYPT_BLOCK_SIZE', 8))
+PASSWORD_SCRYPT_PARALLELISM = int(environ.get('PASSWORD_SCRYPT_PARALLELISM', 1))
+
 # Authentication
 
 AUTH_USER_MODEL = 'accounts.User'
 
+# request.user is loaded together with its profile. ModelBackend stays only for
+# sessions created before ProfileModelBackend and can be dropped after SESSION_COOKIE_AGE
+
+AUTHENTICATION_BACKENDS = [
+    'accounts.backends.ProfileModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 
 # Internationalization
 
@@ -169,6 +216,139 @@ EMAIL_HOST_PASSWORD = environ.get('EMAIL_HOST_PASSWORD')
 
 CELERY_BROKER_URL = environ.get('CELERY_BROKER_URL')
 
+CELERY_RESULT_BACKEND = environ.get('CELERY_RESULT_BACKEND', CELERY_BROKER_URL)
+
+# Results are stored only by tasks declared with ignore_result=False
+CELERY_TASK_IGNORE_RESULT = True
+
+CELERY_RESULT_EXPIRES = 60 * 60 * 24  # One day in seconds
+
+CELERY_TIMEZONE = TIME_ZONE
+
+# Auth emails go to their own queue, so diploma fan-outs and admin jobs never delay them.
+# Every queue is served by a separate worker pool (see docker-compose files)
+CELERY_TASK_DEFAULT_QUEUE = 'default'
+
+CELERY_TASK_ROUTES = {
+    'accounts.tasks.flush_user_activity': {'queue': 'bulk'},
+    'accounts.tasks.import_users_in_background': {'queue': 'bulk'},
+    'accounts.tasks.send_email_verification_codes': {'queue': 'bulk'},
+    'accounts.tasks.*': {'queue': 'priority'},
+    'common.tasks.*': {'queue': 'bulk'},
+    'events.tasks.*': {'queue': 'bulk'},
+    'mailings.tasks.*': {'queue': 'bulk'},
+}
+
+# Tasks are acknowledged after they finish, so a lost worker means redelivery, not a lost task.
+# Tasks with side effects are guarded by idempotency keys (see common/idempotency.py)
+CELERY_TASK_ACKS_LATE = True
+
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+
+# A worker reserves only the task it is going to run, long tasks do not hold short ones
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
+# Must exceed the longest retry countdown (one hour) and task time limit (35 minutes),
+# or Redis redelivers the task. Tasks of a lost worker are redelivered after this timeout
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'visibility_timeout': 60 * 60 * 2,  # 2 hours in seconds
+}
+
+CELERY_TASK_SOFT_TIME_LIMIT = 60 * 5  # 5 minutes in seconds
+
+CELERY_TASK_TIME_LIMIT = 60 * 6  # 6 minutes in seconds
+
+CELERY_BEAT_SCHEDULE = {
+    # Idempotent, so running it every hour also catches up after downtime
+    'advance-event-statuses': {
+        'task': 'events.tasks.advance_event_statuses',
+        'schedule': crontab(minute=5),
+    },
+    'flush-user-activity': {
+        'task': 'accounts.tasks.flush_user_activity',
+        'schedule': 60,
+    },
+}
+
+# Activity of users (last_seen) is collected in Redis and saved by the beat task above
+USER_ACTIVITY_FLUSH_BATCH_SIZE = 1000
+
+# Number of objects processed at once by background admin actions
+
+ADMIN_JOB_CHUNK_SIZE = int(environ.get('ADMIN_JOB_CHUNK_SIZE', 500))
+
+# Bulk user import: rows validated and created at once, activation emails per Celery task
+
+USER_IMPORT_CHUNK_SIZE = int(environ.get('USER_IMPORT_CHUNK_SIZE', 500))
+USER_IMPORT_EMAIL_BATCH_SIZE = 100
+
+# Bulk participant import: registrations (teams or individual participants) saved at once
+
+PARTICIPANT_IMPORT_CHUNK_SIZE = int(environ.get('PARTICIPANT_IMPORT_CHUNK_SIZE', 200))
+
+# Lifetime of per-user event lists in Redis (events.dashboard), seconds.
+# Lists are updated in place on writes, the timeout only bounds drift after missed updates
+
+USER_DASHBOARD_TIMEOUT = 60 * 60 * 24
+
+# Conditional GET for anonymous visitors of public event pages: shared caches (nginx)
+# keep pages for this many seconds, then revalidate them with ETag. RELEASE_VERSION
+# (for example the commit hash) is part of every ETag so deploys invalidate pages
+
+ANONYMOUS_PAGE_MAX_AGE = int(environ.get('ANONYMOUS_PAGE_MAX_AGE', 60))
+RELEASE_VERSION = environ.get('RELEASE_VERSION', '')
+
+# Event preview images: widths (px) of WebP and JPEG thumbnails made by Celery after
+# upload and their quality. Cards of the events list are about 360px wide, 720px is for 2x screens
+
+EVENT_IMAGE_THUMBNAIL_WIDTHS = (360, 720)
+EVENT_IMAGE_THUMBNAIL_QUALITY = int(environ.get('EVENT_IMAGE_THUMBNAIL_QUALITY', 80))
+
+# Number of events on one page of the events list and archive
+
+EVENTS_PAGE_SIZE = int(environ.get('EVENTS_PAGE_SIZE', 24))
+
+# Admin changelists of unfiltered tables with at least this many rows (by PostgreSQL
+# statistics) show an estimated number of rows instead of running COUNT(*)
+
+ESTIMATED_COUNT_THRESHOLD = int(environ.get('ESTIMATED_COUNT_THRESHOLD', 10000))
+
+# FIO autocomplete: minimum prefix length and lifetime of cached suggestions
+
+FIO_AUTOCOMPLETE_MIN_LENGTH = 2
+FIO_AUTOCOMPLETE_CACHE_SECONDS = int(environ.get('FIO_AUTOCOMPLETE_CACHE_SECONDS', 300))
+
+# Rate limits of POST requests per client IP and per account, as '<requests>/<s|m|h|d>'.
+# A whole class signs up and signs in from one school NAT address, so per-IP limits
+# must fit several classes at once
+
+RATE_LIMIT_ENABLED = bool(int(environ.get('RATE_LIMIT_ENABLED', 1)))
+
+# Behind nginx the client IP is the last X-Forwarded-For entry
+RATE_LIMIT_TRUST_X_FORWARDED_FOR = bool(int(environ.get('RATE_LIMIT_TRUST_X_FORWARDED_FOR', 1)))
+
+RATE_LIMITS = {
+    'signin': {
+        'ip': environ.get('RATE_LIMIT_SIGNIN_IP', '30/m'),
+        'account': environ.get('RATE_LIMIT_SIGNIN_ACCOUNT', '10/m'),
+    },
+    'signup': {
+        'ip': environ.get('RATE_LIMIT_SIGNUP_IP', '200/h'),
+    },
+    'password_reset': {
+        'ip': environ.get('RATE_LIMIT_PASSWORD_RESET_IP', '10/h'),
+        'account': environ.get('RATE_LIMIT_PASSWORD_RESET_ACCOUNT', '3/h'),
+    },
+    'register_on_event': {
+        'ip': environ.get('RATE_LIMIT_REGISTER_ON_EVENT_IP', '60/m'),
+        'account': environ.get('RATE_LIMIT_REGISTER_ON_EVENT_ACCOUNT', '20/m'),
+    },
+}
+
+# Load testing: expose number of SQL queries per request in `X-Query-Count` header
+
+QUERY_COUNT_HEADER = bool(int(environ.get('QUERY_COUNT_HEADER', 0)))
+
 # INTERNAL IPS configuration
 
 hostname, _, ips = gethostbyname_ex(gethostname())
@@ -177,7 +357,14 @@ INTERNAL_IPS = [ip[: ip.rfind('.')] + '.1' for ip in ips] + ['127.0.0.1', '10.0.
 # Ckeditor configuration
 
 CKEDITOR_UPLOAD_PATH = 'content/ckeditor/'
-CKEDITOR_IMAGE_BACKEND = 'pillow'
+
+# Uploads are saved as is, images are resized to CKEDITOR_IMAGE_MAX_WIDTH, converted
+# to WebP without EXIF and thumbnailed by a Celery task (see common/ckeditor.py).
+# Optimized copies live outside CKEDITOR_UPLOAD_PATH, so the file browser skips them
+CKEDITOR_IMAGE_BACKEND = 'common.ckeditor.DeferredPillowBackend'
+CKEDITOR_OPTIMIZED_PATH = 'content/ckeditor-optimized/'
+CKEDITOR_IMAGE_MAX_WIDTH = int(environ.get('CKEDITOR_IMAGE_MAX_WIDTH', 1600))
+CKEDITOR_IMAGE_QUALITY = int(environ.get('CKEDITOR_IMAGE_QUALITY', 80))
 CKEDITOR_CONFIGS = {
     'default': {
         'allowedContent': True,
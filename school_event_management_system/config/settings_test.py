@@ -0,0 +1,6 @@
+"""Settings for running tests: DJANGO_SETTINGS_MODULE=config.settings_test."""
+
+from config.settings import *  # noqa: F401, F403
+
+# Tests do not check hashing strength, a fast hasher keeps them quick
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
@@ -16,6 +16,7 @@ handler500 = ServerErrorView.as_view()
 urlpatterns = [
     path('admin/', admin.site.urls),
 
+    path('', include('common.urls')),
     path('', include('accounts.urls')),
     path('', include('events.urls')),
     path('', include('main.urls')),
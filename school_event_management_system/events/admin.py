@@ -1,13 +1,66 @@
+from pathlib import Path
+
 from django.contrib import admin
+from django.contrib.admin import helpers
+from django.core.exceptions import PermissionDenied
+from django.core.files.storage import default_storage
 from django.db.models import QuerySet
-from django.urls import reverse
+from django.shortcuts import get_object_or_404, redirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
 from django.utils.safestring import mark_safe
 
-from events.models import Event, EventDiplomas, Participant, Solution, Task, Team
+from common.filters import AutocompleteListFilter
+from common.jobs import create_admin_job
+from common.mixins import (
+    AutocompleteListFilterAdminMixin,
+    BackgroundActionsAdminMixin,
+    ReplicaChangelistAdminMixin,
+)
+from common.pagination import EstimatedCountPaginator
+from events.forms import ParticipantImportForm
+from events.models import (
+    Event,
+    EventDiplomas,
+    EventStatusChoices,
+    Participant,
+    Solution,
+    Task,
+    Team,
+)
+from events.services import filter_events_by_search_query
+from events.tasks import (
+    archive_past_school_years_events_in_background,
+    delete_events_in_background,
+    export_events_to_zip_in_background,
+    import_participants_in_background,
+    update_events_in_background,
+)
+
+
+def set_status_action(status: EventStatusChoices):
+    """Создать действие админ-панели, переводящее мероприятия в статус `status` в фоне."""
+
+    @admin.action(description=f'Сменить статус на «{status.label}»')
+    def action(modeladmin: 'EventAdmin', request, queryset: QuerySet):
+        return modeladmin.run_in_background(
+            request,
+            queryset,
+            update_events_in_background,
+            title=f'Смена статуса мероприятий на «{status.label}»',
+            values={'status': status.value},
+        )
+
+    action.__name__ = f'set_status_{status.name.lower()}'
+    return action
 
 
 @admin.register(Event)
-class EventAdmin(admin.ModelAdmin):
+class EventAdmin(
+    ReplicaChangelistAdminMixin,
+    BackgroundActionsAdminMixin,
+    admin.ModelAdmin,
+):
     prepopulated_fields = {
         'slug': ('name', ),
     }
@@ -18,6 +71,8 @@ class EventAdmin(admin.ModelAdmin):
         'date_of_starting_event',
         'published',
         'archived',
+        'participants_count',
+        'teams_count',
         'get_event_participants_link',
     )
     search_fields = (
@@ -38,8 +93,17 @@ class EventAdmin(admin.ModelAdmin):
     actions = (
         'set_published',
         'set_archived',
+        'archive_past_school_years',
+        *(set_status_action(status) for status in EventStatusChoices),
+        'export_participants_to_zip',
+        'delete_in_background',
+    )
+    readonly_fields = (
+        'participants_count',
+        'teams_count',
+        'get_event_participants_link',
     )
-    readonly_fields = ('get_event_participants_link', )
+    change_form_template = 'admin/events/event/change_form.html'
 
     fieldsets = (
         (
@@ -79,6 +143,8 @@ class EventAdmin(admin.ModelAdmin):
             'Настройки регистрации конкурса', {
                 'fields': (
                     'need_account',
+                    'maximum_number_of_participants',
+                    'maximum_number_of_teams',
                 ),
             },
         ),
@@ -96,34 +162,131 @@ class EventAdmin(admin.ModelAdmin):
             'Списки участников',
             {
                 'fields': (
+                    'participants_count',
+                    'teams_count',
                     'get_event_participants_link',
                 ),
             },
         ),
     )
 
+    def get_urls(self):
+        return [
+            path(
+                '<path:object_id>/import-participants/',
+                self.admin_site.admin_view(self.import_participants_view),
+                name='events_event_import_participants',
+            ),
+        ] + super(EventAdmin, self).get_urls()
+
+    def import_participants_view(self, request, object_id: str):
+        """Загрузить файл и зарегистрировать из него участников мероприятия фоновой задачей."""
+        event = get_object_or_404(Event, pk=object_id)
+        if not self.has_change_permission(request, event):
+            raise PermissionDenied
+        form = ParticipantImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            title = f'Импорт участников мероприятия «{event.name}»'
+            job_id = create_admin_job(user_id=request.user.pk, title=title, total=0)
+            upload = form.cleaned_data['file']
+            file = default_storage.save(
+                f'admin_jobs/{job_id}{Path(upload.name).suffix.lower()}',
+                upload,
+            )
+            import_participants_in_background.delay(job_id=job_id, event_id=event.pk, file=file)
+            return redirect('admin_job', job_id=job_id)
+        return TemplateResponse(
+            request,
+            'admin/events/event/import_participants.html',
+            context={
+                **self.admin_site.each_context(request),
+                'title': 'Импорт участников',
+                'opts': self.model._meta,
+                'original': event,
+                'form': form,
+            },
+        )
+
+    def get_search_results(self, request, queryset: QuerySet, search_term: str):
+        results, may_have_duplicates = super(EventAdmin, self).get_search_results(
+            request,
+            queryset,
+            search_term,
+        )
+        # Полнотекстовый поиск дополняет `icontains` по `search_fields`, а не заменяет его:
+        # автодополнение ищет по части слова и по slug, чего полнотекстовый поиск не умеет
+        if search_term.strip():
+            results |= filter_events_by_search_query(queryset, search_term)
+        return results, may_have_duplicates
+
+    def get_actions(self, request):
+        actions = super(EventAdmin, self).get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
     @admin.action(description='Опубликовать мероприятия')
     def set_published(self, request, queryset: QuerySet):
-        count = queryset.count()
-        queryset.update(published=True)
-        events_word = 'мероприятия'
-        if count == 1:
-            events_word = 'мероприятие'
-        self.message_user(
+        return self.run_in_background(
             request,
-            f'Опубликовано {count} {events_word}',
+            queryset,
+            update_events_in_background,
+            title='Публикация мероприятий',
+            values={'published': True},
         )
 
     @admin.action(description='Отправить мероприятия в архив')
     def set_archived(self, request, queryset: QuerySet):
-        count = queryset.count()
-        queryset.update(archived=True)
-        events_word = 'мероприятия'
-        if count == 1:
-            events_word = 'мероприятие'
-        self.message_user(
+        return self.run_in_background(
+            request,
+            queryset,
+            update_events_in_background,
+            title='Отправка мероприятий в архив',
+            values={'archived': True},
+        )
+
+    @admin.action(description='Отправить в архив мероприятия прошлых учебных лет')
+    def archive_past_school_years(self, request, queryset: QuerySet):
+        return self.run_in_background(
+            request,
+            queryset,
+            archive_past_school_years_events_in_background,
+            title='Архивирование мероприятий прошлых учебных лет',
+        )
+
+    @admin.action(description='Скачать списки участников одним архивом')
+    def export_participants_to_zip(self, request, queryset: QuerySet):
+        return self.run_in_background(
+            request,
+            queryset,
+            export_events_to_zip_in_background,
+            title='Выгрузка списков участников',
+        )
+
+    @admin.action(
+        description='Удалить мероприятия вместе с командами и участниками',
+        permissions=('delete', ),
+    )
+    def delete_in_background(self, request, queryset: QuerySet):
+        if request.POST.get('post'):
+            return self.run_in_background(
+                request,
+                queryset,
+                delete_events_in_background,
+                title='Удаление мероприятий',
+            )
+        return TemplateResponse(
             request,
-            f'В архив отправлено {count} {events_word}',
+            'admin/events/event/delete_in_background_confirmation.html',
+            context={
+                **self.admin_site.each_context(request),
+                'title': 'Вы уверены?',
+                'opts': self.model._meta,
+                'events': queryset.order_by('name')[:100],
+                'count': queryset.count(),
+                'selected_ids': queryset.values_list('pk', flat=True),
+                'select_across': request.POST.get('select_across', '0'),
+                'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+            },
         )
 
     def get_event_participants_link(self, obj: Event):
@@ -138,13 +301,22 @@ class EventAdmin(admin.ModelAdmin):
 
 
 @admin.register(Participant)
-class ParticipantAdmin(admin.ModelAdmin):
+class ParticipantAdmin(
+    ReplicaChangelistAdminMixin,
+    AutocompleteListFilterAdminMixin,
+    admin.ModelAdmin,
+):
     list_display = (
         'event',
         'fio',
         'team',
         'supervisor_fio',
     )
+    list_select_related = (
+        'event',
+        'team',
+        'user',
+    )
     search_fields = (
         'event__name',
         'fio',
@@ -152,39 +324,66 @@ class ParticipantAdmin(admin.ModelAdmin):
         'supervisor_fio',
     )
     list_filter = (
+        ('event', AutocompleteListFilter),
+        ('team', AutocompleteListFilter),
+    )
+    autocomplete_fields = (
         'event',
+        'user',
         'team',
+        'supervisor',
     )
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Team)
-class TeamAdmin(admin.ModelAdmin):
+class TeamAdmin(
+    ReplicaChangelistAdminMixin,
+    AutocompleteListFilterAdminMixin,
+    admin.ModelAdmin,
+):
     list_display = (
         'event',
         'name',
         'school_class',
         'supervisor_fio',
     )
+    list_select_related = ('event', )
     search_fields = (
         'event__name',
         'school_class',
         'name',
         'supervisor_fio',
     )
-    list_filter = ('event', )
+    list_filter = (
+        ('event', AutocompleteListFilter),
+    )
+    autocomplete_fields = (
+        'event',
+        'supervisor',
+    )
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(EventDiplomas)
-class EventDiplomasAdmin(admin.ModelAdmin):
+class EventDiplomasAdmin(ReplicaChangelistAdminMixin, admin.ModelAdmin):
     list_display = (
         'event',
         'url',
     )
+    list_select_related = ('event', )
     search_fields = ('event__name', )
+    autocomplete_fields = ('event', )
 
 
 @admin.register(Solution)
-class SolutionAdmin(admin.ModelAdmin):
+class SolutionAdmin(
+    ReplicaChangelistAdminMixin,
+    AutocompleteListFilterAdminMixin,
+    admin.ModelAdmin,
+):
     list_display = (
         'event',
         'participant',
@@ -192,16 +391,33 @@ class SolutionAdmin(admin.ModelAdmin):
         'topic',
         'url',
     )
+    list_select_related = (
+        'event',
+        'participant__event',
+        'participant__user',
+        'team',
+    )
     search_fields = (
         'event__name',
         'participant__fio',
         'team__name',
         'topic',
     )
-    list_filter = ('event', )
+    list_filter = (
+        ('event', AutocompleteListFilter),
+    )
+    autocomplete_fields = (
+        'event',
+        'participant',
+        'team',
+    )
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
+class TaskAdmin(ReplicaChangelistAdminMixin, admin.ModelAdmin):
     list_display = ('event', )
+    list_select_related = ('event', )
     search_fields = ('event__name', )
+    autocomplete_fields = ('event', )
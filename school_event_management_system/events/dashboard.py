@@ -0,0 +1,154 @@
+"""
+Мероприятия пользователя для страниц «Мои мероприятия», «Руководство» и «Дипломы».
+
+Для каждого пользователя в Redis хранятся хэши `events:user:{user_id}:dashboard:{role}`
+(id мероприятия -> количество записей, через которые пользователь с ним связан):
+`participant` - участник мероприятия, `supervisor` - руководитель участников или команд.
+Хэши обновляются на месте при создании, изменении и удалении `Participant` и `Team`,
+поэтому страницы выбирают мероприятия по первичному ключу вместо соединений с DISTINCT.
+
+Хэш строится из базы данных при первом чтении (`get_user_event_ids_queryset`, одним
+запросом) и живёт `USER_DASHBOARD_TIMEOUT`. Перед запросом ставится метка сборки
+`...:build`; изменение, пришедшее до записи хэша, снимает метку, и результат сборки
+не сохраняется (он мог не учесть изменение), хэш соберёт следующее чтение.
+Планы запросов проверяет `events.tests.DashboardQueryPlansTestCase` (PostgreSQL).
+"""
+
+from collections import Counter
+from typing import Iterable
+from uuid import uuid4
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
+
+from config.redis import redis_connection
+from events.models import Participant, Team
+
+DASHBOARD_PARTICIPANT = 'participant'
+DASHBOARD_SUPERVISOR = 'supervisor'
+
+# Поле-метка: хэш построен, даже если у пользователя нет ни одного мероприятия
+DASHBOARD_BUILT_FIELD = '_'
+
+# Время жизни метки сборки хэша, секунды: больше любого запроса сборки
+DASHBOARD_BUILD_TIMEOUT = 60
+
+# KEYS - пары (хэш, метка его сборки), ARGV - пары (id мероприятия, изменение).
+# Записи с нулевым количеством удаляются. Если хэша нет, снимается метка сборки.
+CHANGE_DASHBOARDS_SCRIPT = redis_connection.register_script(
+    """
+    for i = 1, #KEYS, 2 do
+        local key = KEYS[i]
+        if redis.call('EXISTS', key) == 1 then
+            if redis.call('HINCRBY', key, ARGV[i], ARGV[i + 1]) <= 0 then
+                redis.call('HDEL', key, ARGV[i])
+            end
+        else
+            redis.call('DEL', KEYS[i + 1])
+        end
+    end
+    """,
+)
+
+# KEYS[1] - хэш, KEYS[2] - метка сборки, ARGV[1] - значение метки, ARGV[2] - время жизни
+# хэша, далее пары (поле, значение). Хэш записывается, только если метка не изменилась.
+BUILD_DASHBOARD_SCRIPT = redis_connection.register_script(
+    """
+    if redis.call('GET', KEYS[2]) ~= ARGV[1] then
+        return 0
+    end
+    redis.call('DEL', KEYS[1], KEYS[2])
+    redis.call('HSET', KEYS[1], unpack(ARGV, 3))
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+    return 1
+    """,
+)
+
+# Изменение: (id пользователя, роль, id мероприятия, +1 или -1)
+DashboardChange = tuple[int, str, int, int]
+
+
+def _dashboard_key(user_id: int, role: str) -> str:
+    return f'events:user:{user_id}:dashboard:{role}'
+
+
+def _dashboard_build_key(user_id: int, role: str) -> str:
+    return f'{_dashboard_key(user_id, role)}:build'
+
+
+def get_participant_dashboard_changes(
+        event_id: int,
+        user_id: int | None,
+        supervisor_id: int | None,
+        delta: int,
+) -> list[DashboardChange]:
+    changes = []
+    if user_id:
+        changes.append((user_id, DASHBOARD_PARTICIPANT, event_id, delta))
+    if supervisor_id:
+        changes.append((supervisor_id, DASHBOARD_SUPERVISOR, event_id, delta))
+    return changes
+
+
+def get_team_dashboard_changes(
+        event_id: int,
+        supervisor_id: int | None,
+        delta: int,
+) -> list[DashboardChange]:
+    return [(supervisor_id, DASHBOARD_SUPERVISOR, event_id, delta)] if supervisor_id else []
+
+
+def change_user_dashboards(changes: Iterable[DashboardChange]) -> None:
+    """Применить изменения к построенным хэшам после фиксации текущей транзакции."""
+    totals = Counter()
+    for user_id, role, event_id, delta in changes:
+        totals[(user_id, role, event_id)] += delta
+    keys, args = [], []
+    for (user_id, role, event_id), delta in totals.items():
+        if delta:
+            keys.extend((_dashboard_key(user_id, role), _dashboard_build_key(user_id, role)))
+            args.extend((event_id, delta))
+    if keys:
+        transaction.on_commit(lambda: CHANGE_DASHBOARDS_SCRIPT(keys=keys, args=args))
+
+
+def get_user_event_ids_queryset(user_id: int, role: str) -> QuerySet:
+    """
+    id мероприятий пользователя по одному на каждую связывающую запись.
+
+    Для руководителя это UNION ALL двух поисков по индексам внешних ключей
+    `supervisor_id` вместо OR по двум соединениям с DISTINCT.
+    """
+    if role == DASHBOARD_PARTICIPANT:
+        return Participant.objects.filter(user_id=user_id).values_list('event_id', flat=True)
+    return Participant.objects.filter(
+        supervisor_id=user_id,
+    ).values_list('event_id', flat=True).union(
+        Team.objects.filter(supervisor_id=user_id).values_list('event_id', flat=True),
+        all=True,
+    )
+
+
+def get_user_dashboard_event_ids(user_id: int, role: str) -> list[int]:
+    """Вернуть id мероприятий, где пользователь `user_id` - участник или руководитель (`role`)."""
+    key = _dashboard_key(user_id, role)
+    fields = redis_connection.hkeys(key)
+    if fields:
+        return [int(field) for field in fields if field != DASHBOARD_BUILT_FIELD.encode()]
+
+    build_key = _dashboard_build_key(user_id, role)
+    build_token = uuid4().hex
+    redis_connection.set(build_key, build_token, ex=DASHBOARD_BUILD_TIMEOUT)
+    counts = Counter(get_user_event_ids_queryset(user_id, role))
+    BUILD_DASHBOARD_SCRIPT(
+        keys=[key, build_key],
+        args=[
+            build_token,
+            settings.USER_DASHBOARD_TIMEOUT,
+            DASHBOARD_BUILT_FIELD,
+            1,
+            *(value for item in counts.items() for value in item),
+        ],
+    )
+    return list(counts)
@@ -0,0 +1,10 @@
+class EventRegistrationError(Exception):
+    """Базовая ошибка регистрации на мероприятие."""
+
+
+class EventCapacityExceededError(EventRegistrationError):
+    """На мероприятии закончились места для участников или команд."""
+
+
+class AlreadyRegisteredError(EventRegistrationError):
+    """Участник или команда с таким названием уже зарегистрированы на мероприятии."""
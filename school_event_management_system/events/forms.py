@@ -1,13 +1,27 @@
 from phonenumber_field.formfields import PhoneNumberField
 
 from django import forms
-from django.core.validators import RegexValidator
+from django.core.validators import FileExtensionValidator, RegexValidator
+from django.urls import reverse_lazy
 
+from accounts.models import User
 from accounts.services import get_user_by_fio
+from common.imports import TABLE_FILE_EXTENSIONS
 from events.models import Solution
 from events.services import team_with_name_exist_in_event
 
 
+def fio_autocomplete_widget(role: str = '') -> forms.TextInput:
+    """Поле ввода ФИО с подсказками (см. `static/js/fio-autocomplete.js`)."""
+    return forms.TextInput(
+        attrs={
+            'autocomplete': 'off',
+            'data-fio-autocomplete': reverse_lazy('fio_autocomplete'),
+            'data-fio-autocomplete-role': role,
+        },
+    )
+
+
 class TeamForm(forms.Form):
     name = forms.CharField(
         max_length=255,
@@ -59,6 +73,7 @@ class ParticipantForm(forms.Form):
                 max_length=255,
                 label='ФИО участника*',
                 initial=None,
+                widget=fio_autocomplete_widget(role=User.RoleChoices.STUDENT),
             )
 
     def clean(self):
@@ -84,6 +99,7 @@ class SupervisorForm(forms.Form):
     fio = forms.CharField(
         max_length=255,
         label='ФИО руководителя*',
+        widget=fio_autocomplete_widget(),
     )
     phone_number = PhoneNumberField(
         label='Номер телефона руководителя',
@@ -162,6 +178,7 @@ class TeamParticipantsForm(forms.Form):
                 max_length=255,
                 label=f'ФИО {i}-го участника' + ('*' if required else ''),
                 required=required,
+                widget=fio_autocomplete_widget(role=User.RoleChoices.STUDENT),
             )
 
     def clean(self):
@@ -178,6 +195,16 @@ class TeamParticipantsForm(forms.Form):
                         self.add_error(field_name, 'Пользователь должен являться учеником')
         return cleaned_data
 
+    def get_participants(self) -> list[tuple[User | None, str]]:
+        """Вернуть пары (пользователь или None, ФИО) для заполненных полей участников."""
+        participants = []
+        for field_name in self.fields:
+            if field_name.startswith('participant_'):
+                fio = self.cleaned_data.get(field_name)
+                if fio:
+                    participants.append((get_user_by_fio(fio=fio), fio))
+        return participants
+
     def disable_fields(self):
         for field_name, field in self.fields.items():
             field.widget.attrs['disabled'] = True
@@ -214,3 +241,33 @@ class TeamOrParticipantForm(forms.Form):
             self.fields['participant_id'].choices = choices
             self.fields['team_id'].widget = forms.HiddenInput()
             self.fields['team_id'].required = False
+
+
+class ParticipantImportRowForm(forms.Form):
+    """Проверка одной строки файла импорта участников (без запросов к базе данных)."""
+
+    team = forms.CharField(max_length=100, required=False)
+    school_class = forms.CharField(max_length=5, required=False)
+    fio = forms.CharField(max_length=255)
+    supervisor_fio = forms.CharField(max_length=255)
+    supervisor_email = forms.EmailField(max_length=60, required=False)
+    supervisor_phone_number = PhoneNumberField(
+        required=False,
+        validators=[SupervisorForm.phone_regex],
+    )
+
+
+class ParticipantImportForm(forms.Form):
+    """Форма загрузки файла импорта участников мероприятия (используется в админ-панели)."""
+
+    file = forms.FileField(
+        label='Файл',
+        validators=[FileExtensionValidator(TABLE_FILE_EXTENSIONS)],
+        help_text=(
+            'CSV или XLSX с заголовком, по строке на участника. Столбцы: team, school_class, '
+            'fio, supervisor_fio, supervisor_email, supervisor_phone_number (или команда, '
+            'класс, фио, фио руководителя, почта руководителя, телефон руководителя). '
+            'Участники одной команды идут подряд, руководитель и класс берутся из первой '
+            'строки команды.'
+        ),
+    )
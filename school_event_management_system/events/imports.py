@@ -0,0 +1,296 @@
+"""
+Массовый импорт участников и команд мероприятия из CSV или XLSX.
+
+Файл - по строке на участника. Подряд идущие строки с одинаковым названием
+команды образуют одну команду. Регистрации обрабатываются частями: ФИО всех
+участников и руководителей части ищутся одним запросом, а команды и участники
+создаются через `bulk_create` в одной транзакции на часть с проверкой лимитов мест.
+"""
+
+from dataclasses import dataclass, field
+from itertools import groupby
+from typing import Callable, Iterable, Iterator
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from accounts.models import User
+from accounts.services import get_users_by_fios
+from common.imports import batched
+from events.dashboard import (
+    change_user_dashboards,
+    get_participant_dashboard_changes,
+    get_team_dashboard_changes,
+)
+from events.exceptions import EventCapacityExceededError
+from events.forms import ParticipantImportRowForm
+from events.models import Event, EventTypeChoices, Participant, Team
+from events.services import (
+    change_event_participants_count,
+    change_event_teams_count,
+    lock_event_for_registration,
+)
+
+PARTICIPANT_IMPORT_COLUMN_ALIASES = {
+    'команда': 'team',
+    'название команды': 'team',
+    'класс': 'school_class',
+    'фио': 'fio',
+    'фио участника': 'fio',
+    'фио руководителя': 'supervisor_fio',
+    'почта руководителя': 'supervisor_email',
+    'телефон руководителя': 'supervisor_phone_number',
+}
+
+
+@dataclass
+class ParticipantImportResult:
+    participants: int = 0
+    teams: int = 0
+    errors: list[tuple[int, str]] = field(default_factory=list)
+
+    def summary(self) -> str:
+        return (
+            f'Зарегистрировано команд: {self.teams}, участников: {self.participants}, '
+            f'строк с ошибками: {len(self.errors)}'
+        )
+
+
+@dataclass
+class Registration:
+    """Одна регистрация из файла: команда или индивидуальный участник."""
+
+    numbers: list[int]
+    rows: list[dict]
+    team: Team | None = None
+    participants: list[Participant] = field(default_factory=list)
+
+
+def _normalize_spaces(fio: str) -> str:
+    return ' '.join(fio.split())
+
+
+def _format_form_errors(form: ParticipantImportRowForm) -> str:
+    return ', '.join(
+        f'{name}: {" ".join(errors)}' for name, errors in form.errors.items()
+    )
+
+
+def _iter_registrations(
+        rows: Iterable[tuple[int, dict[str, str]]],
+        is_team_event: bool,
+        result: ParticipantImportResult,
+) -> Iterator[Registration]:
+    """Проверить строки формой и сгруппировать их в регистрации."""
+    if is_team_event:
+        groups = groupby(rows, key=lambda row: _normalize_spaces(row[1].get('team') or ''))
+    else:
+        groups = ((None, [row]) for row in rows)
+
+    for _, group in groups:
+        group = list(group)
+        forms = [(number, ParticipantImportRowForm(data=row)) for number, row in group]
+        invalid = [(number, form) for number, form in forms if not form.is_valid()]
+        for number, form in invalid:
+            result.errors.append((number, _format_form_errors(form)))
+        if invalid:
+            result.errors.extend(
+                (number, 'команда пропущена из-за ошибок в других строках')
+                for number, form in forms if form.is_valid()
+            )
+            continue
+        yield Registration(
+            numbers=[number for number, _ in forms],
+            rows=[form.cleaned_data for _, form in forms],
+        )
+
+
+def _build_registration(
+        event: Event,
+        registration: Registration,
+        users: dict[str, User],
+        seen_team_names: set[str],
+        seen_user_ids: set[int],
+) -> list[str]:
+    """Создать (не сохраняя) команду и участников регистрации. Вернуть список ошибок."""
+    first_row = registration.rows[0]
+    is_team_event = event.type != EventTypeChoices.INDIVIDUAL
+    errors = []
+
+    supervisor = users.get(_normalize_spaces(first_row['supervisor_fio']))
+    if supervisor and supervisor.role == User.RoleChoices.STUDENT:
+        errors.append('руководитель не должен являться учеником')
+    if not supervisor and not (
+        first_row['supervisor_email'] and first_row['supervisor_phone_number']
+    ):
+        errors.append('руководитель не зарегистрирован в системе, укажите его почту и телефон')
+    supervisor_values = {
+        'supervisor': supervisor,
+        'supervisor_fio': supervisor.full_name if supervisor else first_row['supervisor_fio'],
+        'supervisor_email': supervisor.email if supervisor else first_row['supervisor_email'],
+        'supervisor_phone_number': (
+            supervisor.profile.phone_number if supervisor
+            else first_row['supervisor_phone_number'] or ''
+        ),
+    }
+
+    if is_team_event:
+        is_class_team = event.type == EventTypeChoices.CLASS_TEAMS
+        name = _normalize_spaces(first_row['team'])
+        if not name:
+            errors.append('не указано название команды')
+        elif name in seen_team_names:
+            errors.append('команда с таким названием уже участвует в мероприятии')
+        members = len(registration.rows)
+        if not (
+            event.minimum_number_of_team_members <= members <=
+            event.maximum_number_of_team_members
+        ):
+            errors.append(
+                f'в команде должно быть от {event.minimum_number_of_team_members} '
+                f'до {event.maximum_number_of_team_members} участников',
+            )
+        if is_class_team and not first_row['school_class']:
+            errors.append('не указан класс, который представляет команда')
+        registration.team = Team(
+            event=event,
+            name=name,
+            school_class=first_row['school_class'] if is_class_team else '',
+            **supervisor_values,
+        )
+
+    for row in registration.rows:
+        fio = _normalize_spaces(row['fio'])
+        user = users.get(fio)
+        if not user and (not is_team_event or event.need_account):
+            errors.append(f'нет пользователя с ФИО «{fio}»')
+        elif user and user.role != User.RoleChoices.STUDENT:
+            errors.append(f'пользователь «{fio}» должен являться учеником')
+        elif user and user.pk in seen_user_ids:
+            errors.append(f'«{fio}» уже зарегистрирован на мероприятии')
+        registration.participants.append(
+            Participant(
+                event=event,
+                user=user,
+                fio=fio,
+                **({} if is_team_event else supervisor_values),
+            ),
+        )
+
+    if not errors:
+        if registration.team:
+            seen_team_names.add(registration.team.name)
+        seen_user_ids.update(
+            participant.user_id for participant in registration.participants
+            if participant.user_id
+        )
+    return errors
+
+
+def _import_registrations_chunk(
+        event: Event,
+        registrations: list[Registration],
+        seen_team_names: set[str],
+        seen_user_ids: set[int],
+        result: ParticipantImportResult,
+) -> None:
+    fios = [row['fio'] for registration in registrations for row in registration.rows]
+    fios += [registration.rows[0]['supervisor_fio'] for registration in registrations]
+    users = get_users_by_fios(fios)
+
+    # Уже зарегистрированные команды и участники - по одному запросу на часть
+    team_names = [_normalize_spaces(registration.rows[0]['team']) for registration in registrations]
+    seen_team_names.update(
+        Team.objects.filter(event=event, name__in=team_names).values_list('name', flat=True),
+    )
+    seen_user_ids.update(
+        Participant.objects.filter(
+            event=event,
+            user__in=[user.pk for user in users.values()],
+        ).values_list('user_id', flat=True),
+    )
+
+    valid = []
+    for registration in registrations:
+        errors = _build_registration(event, registration, users, seen_team_names, seen_user_ids)
+        if errors:
+            result.errors.append((registration.numbers[0], '; '.join(errors)))
+        else:
+            valid.append(registration)
+    if not valid:
+        return
+
+    teams = [registration.team for registration in valid if registration.team]
+    participants = [
+        participant for registration in valid for participant in registration.participants
+    ]
+    try:
+        with transaction.atomic():
+            lock_event_for_registration(
+                event=event,
+                participants=len(participants),
+                teams=len(teams),
+            )
+            Team.objects.bulk_create(teams)
+            for registration in valid:
+                for participant in registration.participants:
+                    participant.team = registration.team
+            Participant.objects.bulk_create(participants)
+            # `bulk_create` не вызывает сигналы, которые ведут счётчики мероприятия
+            # и мероприятия пользователей
+            change_event_teams_count(event_id=event.pk, delta=len(teams))
+            change_event_participants_count(event_id=event.pk, delta=len(participants))
+            change_user_dashboards(
+                [
+                    change for team in teams for change in get_team_dashboard_changes(
+                        event_id=event.pk,
+                        supervisor_id=team.supervisor_id,
+                        delta=1,
+                    )
+                ] + [
+                    change for participant in participants
+                    for change in get_participant_dashboard_changes(
+                        event_id=event.pk,
+                        user_id=participant.user_id,
+                        supervisor_id=participant.supervisor_id,
+                        delta=1,
+                    )
+                ],
+            )
+    except (EventCapacityExceededError, IntegrityError) as error:
+        message = (
+            str(error) if isinstance(error, EventCapacityExceededError)
+            else 'команда или участник уже зарегистрированы на мероприятии'
+        )
+        result.errors.extend((registration.numbers[0], message) for registration in valid)
+        return
+    result.teams += len(teams)
+    result.participants += len(participants)
+
+
+def import_participants(
+        event: Event,
+        rows: Iterable[tuple[int, dict[str, str]]],
+        on_chunk: Callable[[int], None] | None = None,
+) -> ParticipantImportResult:
+    """
+    Зарегистрировать на `event` команды и участников из строк `rows`
+    (см. `common.imports.iter_table_rows`).
+
+    Регистрации с ошибками пропускаются и попадают в `errors` результата с номером
+    первой строки. `on_chunk(rows_count)` вызывается после каждой части.
+    """
+    result = ParticipantImportResult()
+    seen_team_names = set()
+    seen_user_ids = set()
+    registrations = _iter_registrations(
+        rows,
+        is_team_event=event.type != EventTypeChoices.INDIVIDUAL,
+        result=result,
+    )
+    for chunk in batched(registrations, settings.PARTICIPANT_IMPORT_CHUNK_SIZE):
+        _import_registrations_chunk(event, chunk, seen_team_names, seen_user_ids, result)
+        if on_chunk:
+            on_chunk(sum(len(registration.numbers) for registration in chunk))
+    result.errors.sort()
+    return result
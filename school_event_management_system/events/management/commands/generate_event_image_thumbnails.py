@@ -0,0 +1,35 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from events.models import Event
+from events.tasks import generate_event_image_thumbnails
+
+
+class Command(BaseCommand):
+    """
+    Command for queueing thumbnails of event preview images.\n
+
+    Thumbnails are made by a Celery task after an image is uploaded, this
+    command queues them for images uploaded before that or after changing
+    `EVENT_IMAGE_THUMBNAIL_WIDTHS` (with `--all`).
+    """
+
+    help = 'Queue WebP and JPEG thumbnails of event preview images'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Regenerate thumbnails of all images, not only missing ones',
+        )
+
+    def handle(self, *args: Any, **kwargs: Any) -> None:
+        events = Event.objects.exclude(image='').exclude(image__isnull=True)
+        if not kwargs['all']:
+            events = events.filter(image_thumbnails={})
+        queued = 0
+        for event_id, image_name in events.values_list('pk', 'image').iterator():
+            generate_event_image_thumbnails.delay(event_id=event_id, image_name=image_name)
+            queued += 1
+        self.stdout.write(self.style.SUCCESS(f'Queued thumbnails of {queued} images'))
@@ -0,0 +1,68 @@
+from pathlib import Path
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+
+from common.imports import UnsupportedFileFormatError, iter_table_rows, write_error_report
+from events.imports import PARTICIPANT_IMPORT_COLUMN_ALIASES, import_participants
+from events.models import Event
+
+
+class Command(BaseCommand):
+    """
+    Command for registering teams and participants on an event from a CSV or XLSX file.\n
+
+    The file needs a header row with `fio`, `supervisor_fio` and optional `team`,
+    `school_class`, `supervisor_email`, `supervisor_phone_number` columns (Russian
+    names from the admin upload form work too). Consecutive rows with the same team
+    name form one team. Registrations with errors are skipped and reported.
+    """
+
+    help = 'Import event participants and teams from a CSV or XLSX file'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            'slug',
+            help='Slug of the event',
+        )
+        parser.add_argument(
+            'path',
+            help='Path to a .csv or .xlsx file',
+        )
+        parser.add_argument(
+            '--report',
+            default=None,
+            help='Save row errors to this CSV file instead of printing them',
+        )
+
+    def handle(self, *args: Any, **kwargs: Any) -> None:
+        path = Path(kwargs['path'])
+        if not path.is_file():
+            raise CommandError(f'File {path} does not exist')
+        try:
+            event = Event.objects.get(slug=kwargs['slug'])
+        except Event.DoesNotExist:
+            raise CommandError(f'Event {kwargs["slug"]} does not exist')
+
+        with open(path, 'rb') as table:
+            try:
+                result = import_participants(
+                    event,
+                    iter_table_rows(table, path.name, aliases=PARTICIPANT_IMPORT_COLUMN_ALIASES),
+                    on_chunk=lambda rows_count: self.stdout.write(f'Processed {rows_count} rows'),
+                )
+            except UnsupportedFileFormatError:
+                raise CommandError('Only .csv and .xlsx files are supported')
+
+        if kwargs['report'] and result.errors:
+            write_error_report(Path(kwargs['report']), result.errors)
+            self.stderr.write(f'Row errors saved to {kwargs["report"]}')
+        else:
+            for number, error in result.errors:
+                self.stderr.write(f'Row {number}: {error}')
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Registered {result.teams} teams and {result.participants} participants, '
+                f'skipped rows with {len(result.errors)} errors',
+            ),
+        )
@@ -0,0 +1,31 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from events.models import Event
+from events.services import recalculate_event_counters
+
+
+class Command(BaseCommand):
+    """
+    Command for recalculating `participants_count` and `teams_count` of events.\n
+
+    Counters are maintained by signals, this command fixes them after bulk
+    operations that bypass signals (`bulk_create`, raw SQL, restored dumps).
+    """
+
+    help = 'Recalculate participants and teams counters of events'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            'slugs',
+            nargs='*',
+            help='Slugs of events to recalculate (all events by default)',
+        )
+
+    def handle(self, *args: Any, **kwargs: Any) -> None:
+        events = Event.objects.all()
+        if kwargs['slugs']:
+            events = events.filter(slug__in=kwargs['slugs'])
+        updated = recalculate_event_counters(events=events)
+        self.stdout.write(self.style.SUCCESS(f'Recalculated counters of {updated} events'))
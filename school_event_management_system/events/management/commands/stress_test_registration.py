@@ -0,0 +1,149 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from uuid import uuid4
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+
+from accounts.models import User
+from events.exceptions import AlreadyRegisteredError, EventCapacityExceededError
+from events.models import Event, EventStatusChoices, EventTypeChoices, Participant, Team
+from events.services import register_participant_on_event, register_team_on_event
+
+
+class Command(BaseCommand):
+    """
+    Command for stress testing registration on events under concurrency.\n
+
+    Creates a temporary individual and a temporary team event with limited
+    capacity and fires parallel registrations (every one of them twice, like a
+    double-submitted form). Then checks that capacity limits hold, that there are
+    no duplicate participants or teams and that counters match real rows.
+    Temporary data is deleted at the end.
+
+    Meaningful only on PostgreSQL: SQLite serializes all writes anyway.
+    """
+
+    help = 'Fire parallel registrations and check capacity and uniqueness invariants'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            '--registrations',
+            type=int,
+            default=300,
+            help='Number of distinct users registering (default 300)',
+        )
+        parser.add_argument(
+            '--capacity',
+            type=int,
+            default=100,
+            help='Maximum number of participants and teams of test events (default 100)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=50,
+            help='Number of parallel threads (default 50)',
+        )
+
+    def handle(self, *args: Any, **kwargs: Any) -> None:
+        registrations = kwargs['registrations']
+        capacity = kwargs['capacity']
+        prefix = f'stress-{uuid4().hex[:8]}'
+
+        users = User.objects.bulk_create(
+            [
+                User(
+                    email=f'{prefix}-{i}@example.com',
+                    name=f'Участник{i}',
+                    surname=prefix,
+                    password=make_password(None),
+                )
+                for i in range(registrations)
+            ],
+        )
+        individual_event = Event.objects.create(
+            name=f'{prefix} individual',
+            slug=f'{prefix}-individual',
+            type=EventTypeChoices.INDIVIDUAL,
+            status=EventStatusChoices.REGISTRATION_OPEN,
+            maximum_number_of_participants=capacity,
+        )
+        team_event = Event.objects.create(
+            name=f'{prefix} team',
+            slug=f'{prefix}-team',
+            type=EventTypeChoices.TEAM,
+            status=EventStatusChoices.REGISTRATION_OPEN,
+            maximum_number_of_teams=capacity,
+        )
+
+        def register(index: int) -> str:
+            user = users[index // 2]
+            try:
+                if index % 4 < 2:
+                    register_participant_on_event(
+                        supervisor=None,
+                        supervisor_fio='Руководитель',
+                        supervisor_email='supervisor@example.com',
+                        supervisor_phone_number='',
+                        user=user,
+                        event=individual_event,
+                    )
+                else:
+                    register_team_on_event(
+                        supervisor=None,
+                        supervisor_fio='Руководитель',
+                        supervisor_email='supervisor@example.com',
+                        supervisor_phone_number='',
+                        name=f'Команда {index // 2}',
+                        event=team_event,
+                        participants=[(user, user.full_name)],
+                    )
+                return 'registered'
+            except EventCapacityExceededError:
+                return 'capacity exceeded'
+            except AlreadyRegisteredError:
+                return 'duplicate rejected'
+            finally:
+                connection.close()
+
+        try:
+            with ThreadPoolExecutor(max_workers=kwargs['workers']) as executor:
+                results = list(executor.map(register, range(registrations * 2)))
+            for outcome in sorted(set(results)):
+                self.stdout.write(f'{outcome}: {results.count(outcome)}')
+            self._check_invariants(individual_event, team_event, capacity)
+        finally:
+            individual_event.delete()
+            team_event.delete()
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+        self.stdout.write(self.style.SUCCESS('All registration invariants hold'))
+
+    def _check_invariants(self, individual_event: Event, team_event: Event, capacity: int):
+        individual_event.refresh_from_db()
+        team_event.refresh_from_db()
+        participants = Participant.objects.filter(event=individual_event).count()
+        teams = Team.objects.filter(event=team_event).count()
+        errors = []
+        if participants > capacity:
+            errors.append(f'{participants} participants registered, capacity is {capacity}')
+        if teams > capacity:
+            errors.append(f'{teams} teams registered, capacity is {capacity}')
+        if individual_event.participants_count != participants:
+            errors.append(
+                f'participants_count is {individual_event.participants_count}, '
+                f'real count is {participants}',
+            )
+        if team_event.teams_count != teams:
+            errors.append(f'teams_count is {team_event.teams_count}, real count is {teams}')
+        duplicates = Participant.objects.filter(
+            event__in=(individual_event, team_event),
+            user__isnull=False,
+        ).values('event', 'user').annotate(count=Count('id')).filter(count__gt=1)
+        if duplicates.exists():
+            errors.append(f'{duplicates.count()} duplicated participants')
+        if errors:
+            raise CommandError('; '.join(errors))
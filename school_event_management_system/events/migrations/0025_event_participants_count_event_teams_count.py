@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:03
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_event_counters(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    Participant = apps.get_model('events', 'Participant')
+    Team = apps.get_model('events', 'Team')
+    participants_count = Participant.objects.filter(
+        event=OuterRef('pk'),
+    ).order_by().values('event').annotate(count=Count('pk')).values('count')
+    teams_count = Team.objects.filter(
+        event=OuterRef('pk'),
+    ).order_by().values('event').annotate(count=Count('pk')).values('count')
+    Event.objects.update(
+        participants_count=Coalesce(Subquery(participants_count), 0),
+        teams_count=Coalesce(Subquery(teams_count), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0024_alter_participant_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='participants_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='количество участников'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='teams_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='количество команд'),
+        ),
+        migrations.RunPython(fill_event_counters, migrations.RunPython.noop),
+    ]
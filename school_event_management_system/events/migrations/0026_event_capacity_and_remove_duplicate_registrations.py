@@ -0,0 +1,69 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:05
+
+from django.db import migrations, models
+from django.db.models import Count, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def remove_duplicate_registrations(apps, schema_editor):
+    """
+    Удалить повторные регистрации одного пользователя на мероприятие (остаётся первая)
+    и переименовать команды с одинаковыми названиями в рамках мероприятия.
+    """
+    Event = apps.get_model('events', 'Event')
+    Participant = apps.get_model('events', 'Participant')
+    Team = apps.get_model('events', 'Team')
+
+    duplicated_participants = Participant.objects.filter(
+        user__isnull=False,
+    ).values('event', 'user').annotate(
+        first_id=Min('id'),
+        count=Count('id'),
+    ).filter(count__gt=1)
+    for duplicate in duplicated_participants:
+        Participant.objects.filter(
+            event=duplicate['event'],
+            user=duplicate['user'],
+        ).exclude(id=duplicate['first_id']).delete()
+
+    duplicated_teams = Team.objects.values('event', 'name').annotate(
+        first_id=Min('id'),
+        count=Count('id'),
+    ).filter(count__gt=1)
+    for duplicate in duplicated_teams:
+        teams = Team.objects.filter(
+            event=duplicate['event'],
+            name=duplicate['name'],
+        ).exclude(id=duplicate['first_id'])
+        for team in teams:
+            suffix = f' ({team.id})'
+            team.name = team.name[:100 - len(suffix)] + suffix
+            team.save(update_fields=['name'])
+
+    participants_count = Participant.objects.filter(
+        event=OuterRef('pk'),
+    ).order_by().values('event').annotate(count=Count('pk')).values('count')
+    Event.objects.update(
+        participants_count=Coalesce(Subquery(participants_count), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0025_event_participants_count_event_teams_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='maximum_number_of_participants',
+            field=models.PositiveIntegerField(blank=True, help_text='Оставьте пустым, чтобы не ограничивать количество участников.', null=True, verbose_name='максимальное количество участников'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='maximum_number_of_teams',
+            field=models.PositiveIntegerField(blank=True, help_text='Оставьте пустым, чтобы не ограничивать количество команд.', null=True, verbose_name='максимальное количество команд'),
+        ),
+        migrations.RunPython(remove_duplicate_registrations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0027_participant_unique_event_participant_user_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['published', 'archived', 'date_of_starting_event', 'id'], name='event_listing_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['published', 'date_of_starting_event', 'id'], name='event_archive_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+from django.db import migrations
+
+ADD_SEARCH_VECTOR_SQL = (
+    r"""
+ALTER TABLE events_event ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('russian'::regconfig, coalesce(name, '')), 'A') ||
+    setweight(
+        to_tsvector('russian'::regconfig, coalesce(stage, '') || ' ' || coalesce(type, '')),
+        'B'
+    ) ||
+    setweight(
+        to_tsvector(
+            'russian'::regconfig,
+            regexp_replace(
+                regexp_replace(coalesce(description, ''), '<[^>]*>', ' ', 'g'),
+                '&[#a-zA-Z0-9]+;', ' ', 'g'
+            )
+        ),
+        'C'
+    )
+) STORED
+""",
+    'CREATE INDEX event_search_vector_idx ON events_event USING GIN (search_vector)',
+)
+
+REMOVE_SEARCH_VECTOR_SQL = (
+    'DROP INDEX IF EXISTS event_search_vector_idx',
+    'ALTER TABLE events_event DROP COLUMN IF EXISTS search_vector',
+)
+
+
+def add_search_vector(apps, schema_editor):
+    """
+    Добавить генерируемую колонку `search_vector` (название, этап и тип, описание без HTML)
+    с GIN индексом. Только для PostgreSQL: на других СУБД поиск работает через `icontains`.
+
+    Колонка не описана в модели. Чтобы изменить тип `name`, `stage`, `type` или
+    `description`, колонку нужно удалить и создать заново в той же миграции.
+    """
+    if schema_editor.connection.vendor == 'postgresql':
+        for sql in ADD_SEARCH_VECTOR_SQL:
+            schema_editor.execute(sql)
+
+
+def remove_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for sql in REMOVE_SEARCH_VECTOR_SQL:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0028_event_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_vector, remove_search_vector),
+    ]
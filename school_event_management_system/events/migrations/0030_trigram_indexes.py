@@ -0,0 +1,44 @@
+from django.db import migrations
+
+TRIGRAM_INDEXED_COLUMNS = (
+    ('events_event', 'name'),
+    ('events_participant', 'fio'),
+    ('events_participant', 'supervisor_fio'),
+    ('events_team', 'name'),
+    ('events_team', 'supervisor_fio'),
+)
+
+
+def add_trigram_indexes(apps, schema_editor):
+    """
+    Добавить GIN индексы pg_trgm по `UPPER(column)` для поиска в панели администратора.
+
+    Django компилирует `icontains` на PostgreSQL в `UPPER(column) LIKE UPPER(%s)`,
+    поэтому индексируется именно это выражение. Только для PostgreSQL.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table, column in TRIGRAM_INDEXED_COLUMNS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {table}_{column}_trgm_idx '
+            f'ON {table} USING GIN (UPPER("{column}"::text) gin_trgm_ops)',
+        )
+
+
+def remove_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, column in TRIGRAM_INDEXED_COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {table}_{column}_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0029_event_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_trigram_indexes, remove_trigram_indexes),
+    ]
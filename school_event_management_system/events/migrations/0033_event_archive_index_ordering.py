@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0032_event_image_thumbnails'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='event',
+            name='event_archive_idx',
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(
+                fields=['published', '-date_of_starting_event', '-id'],
+                name='event_archive_idx',
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0001_initial'),
+        ('events', '0033_event_archive_index_ordering'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='ckeditor_images',
+            field=models.ManyToManyField(blank=True, editable=False, related_name='events', to='common.ckeditorimage', verbose_name='изображения CKEditor'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from ckeditor_uploader.fields import RichTextUploadingField
+from model_utils import FieldTracker
 from phonenumber_field.modelfields import PhoneNumberField
 
 from django.core.validators import MaxValueValidator, MinValueValidator, RegexValidator
@@ -52,6 +53,14 @@ class Event(models.Model):
         null=True,
         upload_to=get_event_image_upload_path,
     )
+    # Уменьшенные копии `image` по форматам: {'webp': [[ширина, имя файла], ...], 'jpeg': ...}.
+    # Пусто, пока задача `generate_event_image_thumbnails` их не создала
+    image_thumbnails = models.JSONField(
+        verbose_name=_('миниатюры изображения'),
+        default=dict,
+        blank=True,
+        editable=False,
+    )
     name = models.CharField(
         verbose_name=_('название мероприятия'),
         max_length=100,
@@ -108,6 +117,19 @@ class Event(models.Model):
         default=1,
     )
 
+    maximum_number_of_participants = models.PositiveIntegerField(
+        verbose_name=_('максимальное количество участников'),
+        help_text=_('Оставьте пустым, чтобы не ограничивать количество участников.'),
+        blank=True,
+        null=True,
+    )
+    maximum_number_of_teams = models.PositiveIntegerField(
+        verbose_name=_('максимальное количество команд'),
+        help_text=_('Оставьте пустым, чтобы не ограничивать количество команд.'),
+        blank=True,
+        null=True,
+    )
+
     status = models.CharField(
         verbose_name=_('статус мероприятия'),
         blank=True,
@@ -161,13 +183,73 @@ class Event(models.Model):
         default=False,
     )
 
+    participants_count = models.PositiveIntegerField(
+        verbose_name=_('количество участников'),
+        default=0,
+        editable=False,
+    )
+    teams_count = models.PositiveIntegerField(
+        verbose_name=_('количество команд'),
+        default=0,
+        editable=False,
+    )
+    # Для `ETag`/`Last-Modified` публичных страниц. Массовые `update()` задают его явно
+    updated_at = models.DateTimeField(
+        verbose_name=_('дата изменения'),
+        auto_now=True,
+    )
+
+    # Изображения CKEditor в описании и задании: по ним обновляется `updated_at`,
+    # когда готова сжатая копия (`events.signals`)
+    ckeditor_images = models.ManyToManyField(
+        'common.CKEditorImage',
+        verbose_name=_('изображения CKEditor'),
+        blank=True,
+        editable=False,
+        related_name='events',
+    )
+
+    image_tracker = FieldTracker(fields=['image'])
+    description_tracker = FieldTracker(fields=['description'])
+
     class Meta:
         verbose_name = _('мероприятие')
         verbose_name_plural = _('мероприятия')
+        indexes = [
+            models.Index(
+                fields=['published', 'archived', 'date_of_starting_event', 'id'],
+                name='event_listing_idx',
+            ),
+            # Архив идёт от последних к первым: порядок индекса совпадает с ORDER BY
+            models.Index(
+                fields=['published', '-date_of_starting_event', '-id'],
+                name='event_archive_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    def _get_image_srcset(self, image_format: str) -> str:
+        return ', '.join(
+            f'{self.image.storage.url(name)} {width}w'
+            for width, name in self.image_thumbnails.get(image_format, [])
+        )
+
+    @property
+    def image_webp_srcset(self) -> str:
+        return self._get_image_srcset('webp')
+
+    @property
+    def image_jpeg_srcset(self) -> str:
+        return self._get_image_srcset('jpeg')
+
+    @property
+    def image_preview_url(self) -> str:
+        """Наименьшая JPEG-копия `image` или, пока копий нет, сам `image`."""
+        thumbnails = self.image_thumbnails.get('jpeg')
+        return self.image.storage.url(thumbnails[0][1]) if thumbnails else self.image.url
+
 
 class Team(models.Model):
     event = models.ForeignKey(
@@ -213,9 +295,18 @@ class Team(models.Model):
         blank=True,
     )
 
+    # Прежние значения для обновления мероприятий пользователей (`events.dashboard`)
+    dashboard_tracker = FieldTracker(fields=['event', 'supervisor'])
+
     class Meta:
         verbose_name = _('команда')
         verbose_name_plural = _('команды')
+        constraints = [
+            models.UniqueConstraint(
+                fields=('event', 'name'),
+                name='unique_event_team_name',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.name}'
@@ -278,9 +369,19 @@ class Participant(models.Model):
         blank=True,
     )
 
+    # Прежние значения для обновления мероприятий пользователей (`events.dashboard`)
+    dashboard_tracker = FieldTracker(fields=['event', 'user', 'supervisor'])
+
     class Meta:
         verbose_name = _('участник')
         verbose_name_plural = _('участники')
+        constraints = [
+            models.UniqueConstraint(
+                fields=('event', 'user'),
+                condition=models.Q(user__isnull=False),
+                name='unique_event_participant_user',
+            ),
+        ]
 
     def __str__(self):
         if self.user:
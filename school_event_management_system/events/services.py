@@ -1,9 +1,37 @@
-from django.db.models import Q, QuerySet
+from datetime import date, datetime
+from typing import Sequence
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Max, OuterRef, Prefetch, Q, QuerySet, Subquery, Sum, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce, Greatest
 from django.shortcuts import get_object_or_404
 from django.template.loader import get_template, render_to_string
+from django.utils import timezone
 
 from accounts.models import User
-from events.models import Event, EventDiplomas, Participant, Solution, Task, Team
+from common.ckeditor import get_ckeditor_images, get_uploaded_image_names
+from common.images import encode_image, get_image_rendition_name, open_image, resize_image
+from common.metrics import increment_metric
+from common.pagination import KeysetPage, keyset_paginate
+from events.dashboard import (
+    DASHBOARD_PARTICIPANT,
+    DASHBOARD_SUPERVISOR,
+    get_user_dashboard_event_ids,
+)
+from events.exceptions import AlreadyRegisteredError, EventCapacityExceededError
+from events.models import (
+    Event,
+    EventDiplomas,
+    EventStatusChoices,
+    Participant,
+    Solution,
+    Task,
+    Team,
+)
 from events.tasks import send_notify_about_diplomas_appearance_email
 from mailings.services import send_email_with_attachments
 
@@ -21,11 +49,245 @@ def get_published_not_archived_events() -> QuerySet[Event]:
     )
 
 
+def get_published_not_archived_events_page(cursor: str | None = None) -> KeysetPage:
+    """Вернуть страницу опубликованных не заархивированных `Event` (ближайшие первыми)."""
+    return keyset_paginate(
+        queryset=get_published_not_archived_events(),
+        field='date_of_starting_event',
+        cursor=cursor,
+        page_size=settings.EVENTS_PAGE_SIZE,
+    )
+
+
+def get_published_events_page(cursor: str | None = None) -> KeysetPage:
+    """Вернуть страницу всех опубликованных `Event` (последние первыми)."""
+    return keyset_paginate(
+        queryset=get_published_events(),
+        field='date_of_starting_event',
+        cursor=cursor,
+        page_size=settings.EVENTS_PAGE_SIZE,
+        descending=True,
+    )
+
+
+def _get_event_search_query(query: str) -> SearchQuery:
+    return SearchQuery(query, config='russian', search_type='websearch')
+
+
+def filter_events_by_search_query(queryset: QuerySet[Event], query: str) -> QuerySet[Event]:
+    """
+    Отфильтровать `queryset` по поисковому запросу (название, этап, тип, описание).
+
+    На PostgreSQL используется колонка `search_vector` с GIN индексом
+    (см. миграцию `0029_event_search_vector`), на остальных СУБД - `icontains` по словам.
+    """
+    if connection.vendor == 'postgresql':
+        return queryset.alias(
+            search=RawSQL(
+                f'"{Event._meta.db_table}"."search_vector"',
+                [],
+                output_field=SearchVectorField(),
+            ),
+        ).filter(search=_get_event_search_query(query))
+    for word in query.split():
+        queryset = queryset.filter(
+            Q(name__icontains=word) |
+            Q(stage__icontains=word) |
+            Q(type__icontains=word) |
+            Q(description__icontains=word),
+        )
+    return queryset
+
+
+def search_published_events(query: str) -> QuerySet[Event]:
+    """Вернуть опубликованные `Event`, найденные по запросу, самые релевантные первыми."""
+    query = query.strip()
+    if not query:
+        return Event.objects.none()
+    events = filter_events_by_search_query(get_published_events(), query)
+    if connection.vendor == 'postgresql':
+        events = events.annotate(
+            rank=SearchRank(F('search'), _get_event_search_query(query)),
+        ).order_by('-rank', '-date_of_starting_event', '-id')
+    else:
+        events = events.order_by('-date_of_starting_event', '-id')
+    return events
+
+
 def get_event_by_slug(slug: int) -> Event:
     """Вернуть `Event` по `slug`."""
     return get_object_or_404(Event, slug=slug)
 
 
+def get_event_updated_at(slug: str) -> datetime | None:
+    """Вернуть время последнего изменения `Event` по `slug` (без загрузки самого `Event`)."""
+    return Event.objects.filter(slug=slug).values_list('updated_at', flat=True).first()
+
+
+def get_events_etag(events: QuerySet[Event]) -> str:
+    """
+    Вернуть `ETag` списка `events` одним агрегирующим запросом: он меняется при
+    добавлении, изменении и удалении мероприятий и при изменении счётчиков участников.
+    """
+    state = events.aggregate(
+        count=Count('pk'),
+        updated_at=Max('updated_at'),
+        participants=Sum('participants_count'),
+        teams=Sum('teams_count'),
+    )
+    updated_at = state['updated_at'].timestamp() if state['updated_at'] else 0
+    return f'{state["count"]}-{updated_at}-{state["participants"]}-{state["teams"]}'
+
+
+def change_event_participants_count(event_id: int, delta: int) -> None:
+    """Атомарно изменить счётчик участников `Event` на `delta`."""
+    Event.objects.filter(pk=event_id).update(
+        participants_count=Greatest(F('participants_count') + delta, Value(0)),
+    )
+
+
+def change_event_teams_count(event_id: int, delta: int) -> None:
+    """Атомарно изменить счётчик команд `Event` на `delta`."""
+    Event.objects.filter(pk=event_id).update(
+        teams_count=Greatest(F('teams_count') + delta, Value(0)),
+    )
+
+
+def recalculate_event_counters(events: QuerySet[Event] | None = None) -> int:
+    """Пересчитать счётчики участников и команд одним `UPDATE`. Вернуть число `Event`."""
+    if events is None:
+        events = Event.objects.all()
+    participants_count = Participant.objects.filter(
+        event=OuterRef('pk'),
+    ).order_by().values('event').annotate(count=Count('pk')).values('count')
+    teams_count = Team.objects.filter(
+        event=OuterRef('pk'),
+    ).order_by().values('event').annotate(count=Count('pk')).values('count')
+    return events.update(
+        participants_count=Coalesce(Subquery(participants_count), 0),
+        teams_count=Coalesce(Subquery(teams_count), 0),
+    )
+
+
+def get_current_school_year_start(today: date | None = None) -> date:
+    """Вернуть 1 сентября текущего учебного года."""
+    today = today or timezone.localdate()
+    year = today.year if today.month >= 9 else today.year - 1
+    return date(year, 9, 1)
+
+
+def update_events(event_ids: Sequence[int], **values) -> int:
+    """Обновить поля `Event` с `event_ids` одним `UPDATE`. Вернуть число `Event`."""
+    updated = Event.objects.filter(pk__in=event_ids).update(**values, updated_at=timezone.now())
+    return updated
+
+
+def generate_event_image_thumbnails(event_id: int, image_name: str) -> bool:
+    """
+    Сохранить рядом с изображением `Event` его копии WebP и JPEG шириной
+    `EVENT_IMAGE_THUMBNAIL_WIDTHS` и записать их в `image_thumbnails`.
+
+    Вернуть False, если мероприятие удалено или его изображение уже заменено
+    (копии нового изображения сделает своя задача).
+    """
+    event = Event.objects.filter(pk=event_id, image=image_name).first()
+    if event is None:
+        return False
+    with event.image.open('rb') as file:
+        image = open_image(file)
+
+    thumbnails = {}
+    # Копии не бывают шире оригинала: для маленького изображения хватит одной
+    widths = {min(width, image.width) for width in settings.EVENT_IMAGE_THUMBNAIL_WIDTHS}
+    for width in sorted(widths):
+        resized = resize_image(image, width)
+        for image_format in ('WEBP', 'JPEG'):
+            name = get_image_rendition_name(image_name, width, image_format)
+            # Повторный запуск перезаписывает копии, а не создаёт файлы с суффиксами
+            event.image.storage.delete(name)
+            name = event.image.storage.save(
+                name,
+                ContentFile(
+                    encode_image(resized, image_format, settings.EVENT_IMAGE_THUMBNAIL_QUALITY),
+                ),
+            )
+            thumbnails.setdefault(image_format.lower(), []).append([width, name])
+
+    updated = Event.objects.filter(pk=event_id, image=image_name).update(
+        image_thumbnails=thumbnails,
+        updated_at=timezone.now(),
+    )
+    return bool(updated)
+
+
+def advance_event_statuses(today: date | None = None) -> dict[str, int]:
+    """
+    Перевести мероприятия в следующий статус по датам, по одному `UPDATE` на переход.
+
+    - `Ожидание регистрации` -> `Регистрация открыта`, когда наступила дата начала
+      регистрации, а дата окончания регистрации ещё не прошла;
+    - `Ожидание регистрации`, `Регистрация открыта` -> `В процессе`, когда прошла дата
+      окончания регистрации (или, если она не указана, наступила дата мероприятия).
+
+    Отменённые, отложенные и завершённые мероприятия не меняются.
+    Вернуть число мероприятий, изменённых каждым переходом.
+    """
+    today = today or timezone.localdate()
+    with transaction.atomic():
+        started = Event.objects.filter(
+            Q(date_of_ending_registration__lt=today) |
+            Q(date_of_ending_registration__isnull=True, date_of_starting_event__lte=today),
+            status__in=(
+                EventStatusChoices.REGISTRATION_PENDING,
+                EventStatusChoices.REGISTRATION_OPEN,
+            ),
+        ).update(status=EventStatusChoices.ONGOING, updated_at=timezone.now())
+        opened = Event.objects.filter(
+            Q(date_of_ending_registration__gte=today) |
+            Q(date_of_ending_registration__isnull=True),
+            status=EventStatusChoices.REGISTRATION_PENDING,
+            date_of_starting_registration__lte=today,
+        ).update(status=EventStatusChoices.REGISTRATION_OPEN, updated_at=timezone.now())
+    transitions = {
+        'registration_opened': opened,
+        'started': started,
+    }
+    for transition, count in transitions.items():
+        if count:
+            increment_metric(f'events.status.{transition}', count)
+    return transitions
+
+
+def archive_past_school_years_events(event_ids: Sequence[int]) -> int:
+    """
+    Отправить в архив `Event` с `event_ids`, прошедшие до начала текущего учебного года.
+
+    Незавершённые (ожидающие регистрации, открытые и проходящие) мероприятия
+    при этом получают статус `Завершено`. Вернуть число заархивированных `Event`.
+    """
+    events = Event.objects.filter(
+        pk__in=event_ids,
+        date_of_starting_event__lt=get_current_school_year_start(),
+    )
+    with transaction.atomic():
+        events.filter(
+            status__in=(
+                EventStatusChoices.REGISTRATION_PENDING,
+                EventStatusChoices.REGISTRATION_OPEN,
+                EventStatusChoices.ONGOING,
+            ),
+        ).update(status=EventStatusChoices.COMPLETED, updated_at=timezone.now())
+        archived = events.update(archived=True, updated_at=timezone.now())
+    return archived
+
+
+def delete_events(event_ids: Sequence[int]) -> int:
+    """Удалить `Event` с `event_ids` вместе с командами, участниками и решениями."""
+    with transaction.atomic():
+        _, deleted = Event.objects.filter(pk__in=event_ids).delete()
+    return deleted.get(Event._meta.label, 0)
+
+
 def create_team(
         supervisor: User | None,
         supervisor_fio: str | None,
@@ -102,24 +364,130 @@ def join_event(
         )
 
 
-def get_user_diplomas(user: User) -> QuerySet[EventDiplomas]:
-    return EventDiplomas.objects.filter(
-        Q(
-            event_id__in=Participant.objects.filter(
+def _check_event_capacity(
+        event: Event,
+        participants: int = 0,
+        teams: int = 0,
+) -> None:
+    if (
+        teams > 0 and
+        event.maximum_number_of_teams is not None and
+        event.teams_count + teams > event.maximum_number_of_teams
+    ):
+        raise EventCapacityExceededError('На мероприятии не осталось мест для команд')
+    if (
+        participants > 0 and
+        event.maximum_number_of_participants is not None and
+        event.participants_count + participants > event.maximum_number_of_participants
+    ):
+        raise EventCapacityExceededError('На мероприятии не осталось мест для участников')
+
+
+def lock_event_for_registration(
+        event: Event,
+        participants: int = 0,
+        teams: int = 0,
+) -> Event:
+    """
+    Заблокировать строку `Event` до конца транзакции и проверить лимиты мест.
+
+    Вызывается внутри `transaction.atomic()`: конкурирующие регистрации на это же
+    мероприятие ждут, пока текущая транзакция не зафиксирует счётчики.
+    """
+    locked_event = Event.objects.select_for_update().get(pk=event.pk)
+    _check_event_capacity(event=locked_event, participants=participants, teams=teams)
+    return locked_event
+
+
+def register_participant_on_event(
+        supervisor_fio: str | None,
+        supervisor_email: str | None,
+        supervisor_phone_number: str | None,
+        supervisor: User | None,
+        user: User,
+        event: Event,
+) -> Participant:
+    """Зарегистрировать участника с учётом лимита мест и без дублей при повторной отправке."""
+    try:
+        with transaction.atomic():
+            lock_event_for_registration(event=event, participants=1)
+            return join_event(
+                supervisor_fio=supervisor_fio,
+                supervisor_email=supervisor_email,
+                supervisor_phone_number=supervisor_phone_number,
+                supervisor=supervisor,
                 user=user,
-            ).values_list('event_id', flat=True),
-        ) |
-        Q(
-            event_id__in=Team.objects.filter(
-                supervisor=user,
-            ).values_list('event_id', flat=True),
-        ) |
-        Q(
-            event_id__in=Participant.objects.filter(
-                supervisor=user,
-            ).values_list('event_id', flat=True),
-        ),
-    )
+                event=event,
+            )
+    except IntegrityError as error:
+        raise AlreadyRegisteredError('Участник уже зарегистрирован на мероприятии') from error
+
+
+def register_team_on_event(
+        supervisor: User | None,
+        supervisor_fio: str | None,
+        supervisor_email: str | None,
+        supervisor_phone_number: str | None,
+        name: str,
+        event: Event,
+        participants: list[tuple[User | None, str]],
+        school_class: str = '',
+) -> Team:
+    """
+    Зарегистрировать команду вместе с участниками одной транзакцией.
+
+    `participants` - список пар (пользователь или None, ФИО).
+    """
+    participants = [(user, fio) for user, fio in participants if user or fio]
+    try:
+        with transaction.atomic():
+            lock_event_for_registration(event=event, participants=len(participants), teams=1)
+            team = create_team(
+                supervisor=supervisor,
+                supervisor_fio=supervisor_fio,
+                supervisor_email=supervisor_email,
+                supervisor_phone_number=supervisor_phone_number,
+                name=name,
+                event=event,
+                school_class=school_class,
+            )
+            for user, fio in participants:
+                join_team(user=user, team=team, event=event, fio=fio)
+            return team
+    except IntegrityError as error:
+        raise AlreadyRegisteredError(
+            'Команда с таким названием или один из участников уже зарегистрированы на мероприятии',
+        ) from error
+
+
+def replace_team_participants(
+        team: Team,
+        event: Event,
+        participants: list[tuple[User | None, str]],
+) -> Team:
+    """Заменить состав команды одной транзакцией с учётом лимита мест."""
+    participants = [(user, fio) for user, fio in participants if user or fio]
+    try:
+        with transaction.atomic():
+            locked_event = lock_event_for_registration(event=event)
+            _check_event_capacity(
+                event=locked_event,
+                participants=len(participants) - team.participants.count(),
+            )
+            disband_team_participants(team=team)
+            for user, fio in participants:
+                join_team(user=user, team=team, event=event, fio=fio)
+            return team
+    except IntegrityError as error:
+        raise AlreadyRegisteredError(
+            'Один из участников уже зарегистрирован на мероприятии',
+        ) from error
+
+
+def get_user_diplomas(user: User) -> QuerySet[EventDiplomas]:
+    event_ids = set(get_user_dashboard_event_ids(user.pk, DASHBOARD_PARTICIPANT))
+    event_ids.update(get_user_dashboard_event_ids(user.pk, DASHBOARD_SUPERVISOR))
+    return EventDiplomas.objects.filter(event_id__in=event_ids)
 
 
 def team_with_name_exist_in_event(
@@ -275,14 +643,27 @@ def get_events_where_user_are_participant(
         user: User,
 ) -> QuerySet[Event]:
     return Event.objects.filter(
-        participants__user=user,
+        pk__in=get_user_dashboard_event_ids(user.pk, DASHBOARD_PARTICIPANT),
     )
 
 
 def get_events_where_user_are_supervisor(user: User) -> QuerySet[Event]:
     return Event.objects.filter(
-        Q(participants__supervisor=user) | Q(teams__supervisor=user),
-    ).distinct()
+        pk__in=get_user_dashboard_event_ids(user.pk, DASHBOARD_SUPERVISOR),
+    )
+
+
+def update_event_ckeditor_images(event: Event) -> None:
+    """Запомнить изображения CKEditor в описании и заданиях мероприятия `event`."""
+    tasks = Task.objects.filter(event=event).values_list('task', flat=True)
+    event.ckeditor_images.set(
+        get_ckeditor_images(get_uploaded_image_names(event.description, *tasks)),
+    )
+
+
+def touch_events_with_ckeditor_image(name: str) -> None:
+    """Обновить `updated_at` (и `ETag` страниц) мероприятий с изображением CKEditor `name`."""
+    Event.objects.filter(ckeditor_images__name=name).update(updated_at=timezone.now())
 
 
 def get_event_task(event: Event) -> Task:
@@ -329,11 +710,16 @@ def get_participant_by_id(id: int) -> Participant:
 
 
 def get_event_participants(event):
-    return Participant.objects.filter(event=event)
+    return Participant.objects.filter(event=event).select_related('user__profile')
 
 
 def get_event_teams(event):
-    return Team.objects.filter(event=event)
+    return Team.objects.filter(event=event).select_related(
+        'event',
+        'supervisor__profile',
+    ).prefetch_related(
+        Prefetch('participants', queryset=Participant.objects.select_related('user__profile')),
+    )
 
 
 def get_team_participants_fio_string(team):
@@ -444,6 +830,7 @@ def notify_about_diplomas_appearance(
         event: str,
         diplomas_url: str,
         emails: list[str],
+        event_id: int | None = None,
 ) -> None:
     for email in emails:
         send_notify_about_diplomas_appearance_email.delay(
@@ -452,4 +839,5 @@ def notify_about_diplomas_appearance(
             to_email=email,
             diplomas_url=diplomas_url,
             event=event,
+            event_id=event_id,
         )
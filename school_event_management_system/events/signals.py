@@ -1,15 +1,27 @@
 from os import environ
 
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
-from events.models import EventDiplomas
+from common.ckeditor import ckeditor_image_optimized
+from events.dashboard import (
+    change_user_dashboards,
+    get_participant_dashboard_changes,
+    get_team_dashboard_changes,
+)
+from events.models import Event, EventDiplomas, Participant, Task, Team
 from events.services import (
+    change_event_participants_count,
+    change_event_teams_count,
     get_emails_of_event_participants_and_supervisors,
     get_event_diplomas_url,
     notify_about_diplomas_appearance,
+    touch_events_with_ckeditor_image,
+    update_event_ckeditor_images,
 )
+from events.tasks import generate_event_image_thumbnails
 
 
 @receiver(post_save, sender=EventDiplomas)
@@ -19,8 +31,127 @@ def notify_about_diplomas_appearance_receiver(sender, instance: EventDiplomas, c
             domain=environ.get('DOMAIN'),
             from_email=settings.DEFAULT_FROM_EMAIL,
             event=instance.event.name,
+            event_id=instance.event_id,
             diplomas_url=get_event_diplomas_url(event=instance.event),
             emails=get_emails_of_event_participants_and_supervisors(
                 event=instance.event,
             ),
         )
+
+
+@receiver(post_save, sender=Participant)
+def increment_event_participants_count(sender, instance: Participant, created, **kwargs):
+    if created:
+        change_event_participants_count(event_id=instance.event_id, delta=1)
+
+
+@receiver(post_delete, sender=Participant)
+def decrement_event_participants_count(sender, instance: Participant, **kwargs):
+    change_event_participants_count(event_id=instance.event_id, delta=-1)
+
+
+@receiver(post_save, sender=Team)
+def increment_event_teams_count(sender, instance: Team, created, **kwargs):
+    if created:
+        change_event_teams_count(event_id=instance.event_id, delta=1)
+
+
+@receiver(post_delete, sender=Team)
+def decrement_event_teams_count(sender, instance: Team, **kwargs):
+    change_event_teams_count(event_id=instance.event_id, delta=-1)
+
+
+@receiver(post_save, sender=Participant)
+def update_participant_dashboards(sender, instance: Participant, created, **kwargs):
+    tracker = instance.dashboard_tracker
+    if not created and not tracker.changed():
+        return
+    changes = get_participant_dashboard_changes(
+        event_id=instance.event_id,
+        user_id=instance.user_id,
+        supervisor_id=instance.supervisor_id,
+        delta=1,
+    )
+    if not created:
+        changes += get_participant_dashboard_changes(
+            event_id=tracker.previous('event'),
+            user_id=tracker.previous('user'),
+            supervisor_id=tracker.previous('supervisor'),
+            delta=-1,
+        )
+    change_user_dashboards(changes)
+
+
+@receiver(post_delete, sender=Participant)
+def remove_participant_from_dashboards(sender, instance: Participant, **kwargs):
+    change_user_dashboards(
+        get_participant_dashboard_changes(
+            event_id=instance.event_id,
+            user_id=instance.user_id,
+            supervisor_id=instance.supervisor_id,
+            delta=-1,
+        ),
+    )
+
+
+@receiver(post_save, sender=Team)
+def update_team_dashboards(sender, instance: Team, created, **kwargs):
+    tracker = instance.dashboard_tracker
+    if not created and not tracker.changed():
+        return
+    changes = get_team_dashboard_changes(
+        event_id=instance.event_id,
+        supervisor_id=instance.supervisor_id,
+        delta=1,
+    )
+    if not created:
+        changes += get_team_dashboard_changes(
+            event_id=tracker.previous('event'),
+            supervisor_id=tracker.previous('supervisor'),
+            delta=-1,
+        )
+    change_user_dashboards(changes)
+
+
+@receiver(post_delete, sender=Team)
+def remove_team_from_dashboards(sender, instance: Team, **kwargs):
+    change_user_dashboards(
+        get_team_dashboard_changes(
+            event_id=instance.event_id,
+            supervisor_id=instance.supervisor_id,
+            delta=-1,
+        ),
+    )
+
+
+@receiver(pre_save, sender=Event)
+def reset_event_image_thumbnails(sender, instance: Event, **kwargs):
+    # Копии прежнего изображения не показываются вместо нового
+    if instance.pk and instance.image_tracker.has_changed('image'):
+        instance.image_thumbnails = {}
+
+
+@receiver(post_save, sender=Event)
+def generate_event_image_thumbnails_receiver(sender, instance: Event, created, **kwargs):
+    if instance.image and (created or instance.image_tracker.has_changed('image')):
+        event_id, image_name = instance.pk, instance.image.name
+        transaction.on_commit(
+            lambda: generate_event_image_thumbnails.delay(event_id=event_id, image_name=image_name),
+        )
+
+
+@receiver(post_save, sender=Event)
+def update_event_ckeditor_images_receiver(sender, instance: Event, created, **kwargs):
+    if created or instance.description_tracker.has_changed('description'):
+        update_event_ckeditor_images(instance)
+
+
+@receiver(post_save, sender=Task)
+def update_task_event_ckeditor_images(sender, instance: Task, **kwargs):
+    update_event_ckeditor_images(instance.event)
+
+
+@receiver(ckeditor_image_optimized)
+def touch_events_with_optimized_image(sender, name: str, **kwargs):
+    # Описание или задание теперь показывает сжатую копию: `ETag` и кэш nginx должны обновиться
+    touch_events_with_ckeditor_image(name)
@@ -1,24 +1,186 @@
+from pathlib import Path
+from smtplib import SMTPException
+from zipfile import ZIP_DEFLATED, ZipFile
+
 from celery import shared_task
 
+from django.conf import settings
+
+from common.idempotency import deduplicate, get_email_deduplication_key
+from common.jobs import (
+    ADMIN_JOB_SOFT_TIME_LIMIT,
+    ADMIN_JOB_TIME_LIMIT,
+    advance_admin_job,
+    fail_admin_job,
+    finish_admin_job,
+    run_admin_job_in_chunks,
+    set_admin_job_total,
+)
+
 
 @shared_task(
     bind=True,
-    max_retries=1,
-    default_retry_delay=60 * 60 * 24,  # Один день в секундах
+    autoretry_for=(SMTPException, OSError),
+    max_retries=5,
+    retry_backoff=60,
+    retry_backoff_max=60 * 60,  # Один час в секундах
+    retry_jitter=True,
+    rate_limit='60/m',
+    soft_time_limit=30,
+    time_limit=60,
 )
 def send_notify_about_diplomas_appearance_email(
+        self,
         from_email: str,
         to_email: str,
         domain: str,
         diplomas_url: str,
         event: str,
+        event_id: int | None = None,
 ) -> None:
     from .services import _send_diplomas_notification_email
 
-    _send_diplomas_notification_email(
-        from_email=from_email,
-        to_email=to_email,
-        domain=domain,
-        diplomas_url=diplomas_url,
-        event=event,
+    key = get_email_deduplication_key('diplomas_appearance', to_email, event_id or event)
+    with deduplicate(key, owner=self.request.id) as should_send:
+        if should_send:
+            _send_diplomas_notification_email(
+                from_email=from_email,
+                to_email=to_email,
+                domain=domain,
+                diplomas_url=diplomas_url,
+                event=event,
+            )
+
+
+@shared_task(
+    soft_time_limit=ADMIN_JOB_SOFT_TIME_LIMIT,
+    time_limit=ADMIN_JOB_TIME_LIMIT,
+)
+def update_events_in_background(job_id: str, event_ids: list[int], values: dict) -> None:
+    """Массово обновить поля `Event` (публикация, архив, статус) частями."""
+    from .services import update_events
+
+    run_admin_job_in_chunks(
+        job_id=job_id,
+        ids=event_ids,
+        process_chunk=lambda chunk: update_events(chunk, **values),
+    )
+    finish_admin_job(job_id)
+
+
+@shared_task(
+    soft_time_limit=ADMIN_JOB_SOFT_TIME_LIMIT,
+    time_limit=ADMIN_JOB_TIME_LIMIT,
+)
+def archive_past_school_years_events_in_background(job_id: str, event_ids: list[int]) -> None:
+    """Отправить в архив мероприятия прошлых учебных лет частями."""
+    from .services import archive_past_school_years_events
+
+    archived = []
+    run_admin_job_in_chunks(
+        job_id=job_id,
+        ids=event_ids,
+        process_chunk=lambda chunk: archived.append(archive_past_school_years_events(chunk)),
+    )
+    finish_admin_job(job_id, message=f'В архив отправлено мероприятий: {sum(archived)}')
+
+
+@shared_task(
+    soft_time_limit=ADMIN_JOB_SOFT_TIME_LIMIT,
+    time_limit=ADMIN_JOB_TIME_LIMIT,
+)
+def export_events_to_zip_in_background(job_id: str, event_ids: list[int]) -> None:
+    """Выгрузить списки участников нескольких мероприятий в один zip-архив."""
+    from .models import Event
+    from .utils import add_events_to_zip
+
+    file = f'admin_jobs/{job_id}.zip'
+    path = Path(settings.MEDIA_ROOT) / file
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with ZipFile(path, 'w', compression=ZIP_DEFLATED) as archive:
+        run_admin_job_in_chunks(
+            job_id=job_id,
+            ids=event_ids,
+            process_chunk=lambda chunk: add_events_to_zip(
+                archive=archive,
+                events=Event.objects.filter(pk__in=chunk),
+            ),
+            chunk_size=10,
+        )
+    finish_admin_job(job_id, file=file)
+
+
+@shared_task(
+    soft_time_limit=ADMIN_JOB_SOFT_TIME_LIMIT,
+    time_limit=ADMIN_JOB_TIME_LIMIT,
+)
+def delete_events_in_background(job_id: str, event_ids: list[int]) -> None:
+    """Удалить мероприятия с командами, участниками и решениями частями."""
+    from .services import delete_events
+
+    run_admin_job_in_chunks(
+        job_id=job_id,
+        ids=event_ids,
+        process_chunk=delete_events,
+        chunk_size=20,
     )
+    finish_admin_job(job_id)
+
+
+@shared_task(
+    soft_time_limit=ADMIN_JOB_SOFT_TIME_LIMIT,
+    time_limit=ADMIN_JOB_TIME_LIMIT,
+)
+def import_participants_in_background(job_id: str, event_id: int, file: str) -> None:
+    """
+    Зарегистрировать на мероприятие команды и участников из файла `file`
+    (путь относительно `MEDIA_ROOT`). Ошибки по строкам сохраняются в CSV-отчёт задачи.
+    """
+    from common.imports import iter_table_rows, write_error_report
+
+    from .imports import PARTICIPANT_IMPORT_COLUMN_ALIASES, import_participants
+    from .models import Event
+
+    path = Path(settings.MEDIA_ROOT) / file
+    try:
+        event = Event.objects.get(pk=event_id)
+        with open(path, 'rb') as table:
+            set_admin_job_total(job_id, sum(1 for _ in iter_table_rows(table, path.name)))
+        with open(path, 'rb') as table:
+            result = import_participants(
+                event,
+                iter_table_rows(table, path.name, aliases=PARTICIPANT_IMPORT_COLUMN_ALIASES),
+                on_chunk=lambda rows_count: advance_admin_job(job_id, rows_count),
+            )
+        report = ''
+        if result.errors:
+            report = f'admin_jobs/{job_id}_errors.csv'
+            write_error_report(Path(settings.MEDIA_ROOT) / report, result.errors)
+    except Exception as error:
+        fail_admin_job(job_id, message=str(error))
+        raise
+    finally:
+        path.unlink(missing_ok=True)
+    finish_admin_job(job_id, message=result.summary(), file=report)
+
+
+@shared_task(ignore_result=False)
+def advance_event_statuses() -> dict[str, int]:
+    """Перевести мероприятия в следующий статус по датам (запускается Celery beat)."""
+    from . import services
+
+    return services.advance_event_statuses()
+
+
+@shared_task(
+    autoretry_for=(OSError,),
+    max_retries=3,
+    retry_backoff=60,
+    soft_time_limit=60,
+    time_limit=120,
+)
+def generate_event_image_thumbnails(event_id: int, image_name: str) -> None:
+    """Сделать уменьшенные копии изображения предварительного просмотра мероприятия."""
+    from . import services
+
+    services.generate_event_image_thumbnails(event_id=event_id, image_name=image_name)
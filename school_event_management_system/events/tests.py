@@ -0,0 +1,390 @@
+from collections import Counter
+from datetime import date, timedelta
+from unittest import mock, skipUnless
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.db.models import Count, Q, QuerySet
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from common.ckeditor import ckeditor_image_optimized
+from common.models import CKEditorImage
+from config.redis import redis_connection
+from events import dashboard
+from events.dashboard import (
+    DASHBOARD_PARTICIPANT,
+    DASHBOARD_SUPERVISOR,
+    get_user_dashboard_event_ids,
+    get_user_event_ids_queryset,
+)
+from events.models import (
+    Event,
+    EventDiplomas,
+    EventStageChoices,
+    EventTypeChoices,
+    Participant,
+    Task,
+    Team,
+)
+
+
+class EventCKEditorImagesTestCase(TestCase):
+    """Мероприятия запоминают изображения CKEditor, чтобы обновить `ETag`, когда готова копия."""
+
+    image_name = 'content/ckeditor/2024/01/01/photo.jpg'
+    image_html = f'<p><img src="/media/{image_name}"></p>'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.described_event, cls.event_with_task, cls.other_event = (
+            Event.objects.create(
+                name=f'Мероприятие {number}',
+                slug=f'images-{number}',
+                type=EventTypeChoices.INDIVIDUAL,
+                description=description,
+            )
+            for number, description in enumerate((cls.image_html, '', '<p>Без изображений</p>'))
+        )
+        Task.objects.create(event=cls.event_with_task, task=cls.image_html)
+
+    def test_events_remember_images_of_description_and_task(self):
+        for event in (self.described_event, self.event_with_task):
+            with self.subTest(event=event.slug):
+                self.assertEqual(
+                    list(event.ckeditor_images.values_list('name', flat=True)),
+                    [self.image_name],
+                )
+        self.assertFalse(self.other_event.ckeditor_images.exists())
+
+    def test_changed_description_forgets_removed_image(self):
+        self.described_event.description = '<p>Изображение удалено</p>'
+        self.described_event.save()
+
+        self.assertFalse(self.described_event.ckeditor_images.exists())
+
+    def test_optimized_image_refreshes_updated_at_of_its_events(self):
+        Event.objects.update(updated_at=timezone.now() - timedelta(days=1))
+        before = timezone.now()
+
+        ckeditor_image_optimized.send(sender=CKEditorImage, name=self.image_name)
+
+        updated = Event.objects.filter(updated_at__gte=before)
+        self.assertCountEqual(updated, [self.described_event, self.event_with_task])
+
+
+class EventAdminSearchTestCase(TestCase):
+    """Поиск мероприятий в списке админ-панели и в автодополнении."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            email='admin@example.com',
+            name='Админ',
+            surname='Админов',
+            password='Admin-passw0rd',
+        )
+        cls.olympiad = Event.objects.create(
+            name='Олимпиада по информатике',
+            slug='informatics-2024',
+            type=EventTypeChoices.INDIVIDUAL,
+        )
+        cls.contest = Event.objects.create(
+            name='Конкурс чтецов',
+            slug='readers',
+            type=EventTypeChoices.INDIVIDUAL,
+            stage=EventStageChoices.CITY,
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin, backend='django.contrib.auth.backends.ModelBackend')
+
+    def get_changelist_events(self, search_term: str) -> set[Event]:
+        response = self.client.get(reverse('admin:events_event_changelist'), {'q': search_term})
+        self.assertEqual(response.status_code, 200)
+        return set(response.context['cl'].result_list)
+
+    def get_autocomplete_event_ids(self, search_term: str) -> set[str]:
+        response = self.client.get(
+            reverse('admin:autocomplete'),
+            {
+                'term': search_term,
+                'app_label': 'events',
+                'model_name': 'participant',
+                'field_name': 'event',
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        return {result['id'] for result in response.json()['results']}
+
+    def test_search_by_part_of_word(self):
+        self.assertEqual(self.get_changelist_events('информат'), {self.olympiad})
+        self.assertEqual(self.get_autocomplete_event_ids('Олимп'), {str(self.olympiad.pk)})
+
+    def test_search_by_slug(self):
+        self.assertEqual(self.get_changelist_events('informatics-2024'), {self.olympiad})
+        self.assertEqual(self.get_autocomplete_event_ids('readers'), {str(self.contest.pk)})
+
+    def test_search_by_stage(self):
+        self.assertEqual(self.get_changelist_events('Городской'), {self.contest})
+
+
+class UserDashboardEventIdsTestCase(TestCase):
+    """Хэши мероприятий пользователя в Redis (`events.dashboard`)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='student@example.com',
+            name='Иван',
+            surname='Иванов',
+            password='Student-passw0rd',
+        )
+        cls.first_event, cls.second_event = (
+            Event.objects.create(
+                name=f'Мероприятие {number}',
+                slug=f'dashboard-{number}',
+                type=EventTypeChoices.INDIVIDUAL,
+            )
+            for number in range(2)
+        )
+
+    def setUp(self):
+        keys = redis_connection.keys(f'events:user:{self.user.pk}:dashboard:*')
+        if keys:
+            redis_connection.delete(*keys)
+        with self.captureOnCommitCallbacks(execute=True):
+            Participant.objects.create(event=self.first_event, user=self.user, fio='Иванов Иван')
+
+    def test_changes_update_built_list(self):
+        get_user_dashboard_event_ids(self.user.pk, DASHBOARD_PARTICIPANT)
+        with self.captureOnCommitCallbacks(execute=True):
+            participant = Participant.objects.create(
+                event=self.second_event,
+                user=self.user,
+                fio='Иванов Иван',
+            )
+
+        self.assertCountEqual(
+            get_user_dashboard_event_ids(self.user.pk, DASHBOARD_PARTICIPANT),
+            [self.first_event.pk, self.second_event.pk],
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            participant.delete()
+
+        self.assertEqual(
+            get_user_dashboard_event_ids(self.user.pk, DASHBOARD_PARTICIPANT),
+            [self.first_event.pk],
+        )
+
+    def test_change_during_build_is_not_lost(self):
+        def get_ids_and_register_concurrently(user_id: int, role: str) -> list[int]:
+            # Запрос сборки уже выполнен, регистрация фиксируется до записи хэша
+            event_ids = list(get_user_event_ids_queryset(user_id, role))
+            with self.captureOnCommitCallbacks(execute=True):
+                Participant.objects.create(
+                    event=self.second_event,
+                    user=self.user,
+                    fio='Иванов Иван',
+                )
+            return event_ids
+
+        with mock.patch.object(
+            dashboard,
+            'get_user_event_ids_queryset',
+            side_effect=get_ids_and_register_concurrently,
+        ):
+            self.assertEqual(
+                get_user_dashboard_event_ids(self.user.pk, DASHBOARD_PARTICIPANT),
+                [self.first_event.pk],
+            )
+
+        self.assertCountEqual(
+            get_user_dashboard_event_ids(self.user.pk, DASHBOARD_PARTICIPANT),
+            [self.first_event.pk, self.second_event.pk],
+        )
+
+
+class UserEventIdsQuerysetTestCase(TestCase):
+    """
+    `get_user_event_ids_queryset` (UNION ALL) находит те же мероприятия, что и прежние
+    запросы страниц с соединениями и DISTINCT, по одному id на каждую связывающую запись.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(
+                email=f'user-{number}@example.com',
+                name=f'Пользователь{number}',
+                surname='Тестов',
+                password='User-passw0rd',
+            )
+            for number in range(4)
+        ]
+        events = [
+            Event.objects.create(
+                name=f'Мероприятие {number}',
+                slug=f'union-{number}',
+                type=EventTypeChoices.TEAM,
+            )
+            for number in range(5)
+        ]
+        first, second, third, fourth = cls.users
+        teams = [
+            Team.objects.create(event=events[0], name='Команда 1', supervisor=first),
+            Team.objects.create(event=events[0], name='Команда 2', supervisor=first),
+            Team.objects.create(event=events[1], name='Команда 3', supervisor=second),
+            Team.objects.create(event=events[2], name='Команда 4'),
+        ]
+        for event, user, team, supervisor in (
+            (events[0], second, teams[0], first),
+            (events[0], third, teams[1], first),
+            (events[1], first, teams[2], second),
+            (events[2], second, teams[3], None),
+            (events[3], first, None, first),
+            (events[3], third, None, second),
+            (events[4], third, None, None),
+        ):
+            Participant.objects.create(
+                event=event,
+                user=user,
+                fio=user.full_name,
+                team=team,
+                supervisor=supervisor,
+            )
+
+    def get_link_counts(self, querysets: list[QuerySet]) -> Counter:
+        counts = Counter()
+        for queryset in querysets:
+            for row in queryset.values('event_id').annotate(count=Count('pk')).order_by():
+                counts[row['event_id']] += row['count']
+        return counts
+
+    def test_participant_event_ids(self):
+        for user in self.users:
+            with self.subTest(user=user.email):
+                event_ids = list(get_user_event_ids_queryset(user.pk, DASHBOARD_PARTICIPANT))
+                self.assertEqual(
+                    set(event_ids),
+                    set(Event.objects.filter(participants__user=user).values_list('pk', flat=True)),
+                )
+                self.assertEqual(
+                    Counter(event_ids),
+                    self.get_link_counts([Participant.objects.filter(user=user)]),
+                )
+
+    def test_supervisor_event_ids(self):
+        for user in self.users:
+            with self.subTest(user=user.email):
+                event_ids = list(get_user_event_ids_queryset(user.pk, DASHBOARD_SUPERVISOR))
+                self.assertEqual(
+                    set(event_ids),
+                    set(
+                        Event.objects.filter(
+                            Q(participants__supervisor=user) | Q(teams__supervisor=user),
+                        ).distinct().values_list('pk', flat=True),
+                    ),
+                )
+                self.assertEqual(
+                    Counter(event_ids),
+                    self.get_link_counts([
+                        Participant.objects.filter(supervisor=user),
+                        Team.objects.filter(supervisor=user),
+                    ]),
+                )
+
+
+QUERY_PLANS_EVENTS = 100
+QUERY_PLANS_USERS_PER_EVENT = 1000
+
+
+@skipUnless(connection.vendor == 'postgresql', 'планы запросов проверяются на PostgreSQL')
+class DashboardQueryPlansTestCase(TestCase):
+    """
+    Запросы страниц «Мои мероприятия», «Руководство» и «Дипломы» (`events.dashboard`)
+    не должны полностью сканировать таблицы участников и команд.
+
+    Данные (100 000 участников, 20 000 команд) создаются один раз на класс, после чего
+    статистика планировщика обновляется через ANALYZE.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        password = make_password(None)
+        users = User.objects.bulk_create(
+            [
+                User(
+                    email=f'plans-{number}@example.com',
+                    name=f'Участник{number}',
+                    surname='Планов',
+                    password=password,
+                )
+                for number in range(QUERY_PLANS_USERS_PER_EVENT)
+            ],
+        )
+        today = date.today()
+        events = Event.objects.bulk_create(
+            [
+                Event(
+                    name=f'Мероприятие {number}',
+                    slug=f'plans-{number}',
+                    type=EventTypeChoices.TEAM,
+                    date_of_starting_registration=today,
+                    date_of_ending_registration=today,
+                    date_of_starting_event=today,
+                )
+                for number in range(QUERY_PLANS_EVENTS)
+            ],
+        )
+        EventDiplomas.objects.bulk_create(
+            [
+                EventDiplomas(event=event, url=f'https://example.com/{event.slug}')
+                for event in events
+            ],
+        )
+        teams_per_event = QUERY_PLANS_USERS_PER_EVENT // 5
+        teams = Team.objects.bulk_create(
+            [
+                Team(event=event, name=f'Команда {number}', supervisor=users[number])
+                for event in events
+                for number in range(teams_per_event)
+            ],
+        )
+        Participant.objects.bulk_create(
+            [
+                Participant(
+                    event=event,
+                    user=user,
+                    fio=user.full_name,
+                    team=teams[event_number * teams_per_event + number % teams_per_event],
+                    supervisor=users[(number + 1) % len(users)],
+                )
+                for event_number, event in enumerate(events)
+                for number, user in enumerate(users)
+            ],
+            batch_size=5000,
+        )
+        with connection.cursor() as cursor:
+            for model in (User, Event, EventDiplomas, Team, Participant):
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+        cls.user = users[0]
+
+    def assert_no_full_scans(self, queryset: QuerySet) -> None:
+        plan = queryset.explain()
+        for model in (Participant, Team):
+            self.assertNotRegex(plan, rf'Seq Scan on "?{model._meta.db_table}"?\b', msg=plan)
+
+    def test_participant_events(self):
+        self.assert_no_full_scans(get_user_event_ids_queryset(self.user.pk, DASHBOARD_PARTICIPANT))
+
+    def test_supervised_events(self):
+        self.assert_no_full_scans(get_user_event_ids_queryset(self.user.pk, DASHBOARD_SUPERVISOR))
+
+    def test_events_and_diplomas_by_ids(self):
+        event_ids = list(get_user_event_ids_queryset(self.user.pk, DASHBOARD_PARTICIPANT))
+        self.assert_no_full_scans(Event.objects.filter(pk__in=event_ids))
+        self.assert_no_full_scans(EventDiplomas.objects.filter(event_id__in=event_ids))
@@ -4,10 +4,13 @@ from django.urls import path
 from events.views import (
     DiplomasListView,
     EditParticipantEventView,
+    EventArchivePageView,
     EventArchiveView,
     EventDetailView,
+    EventListPageView,
     EventListView,
     EventQRCodeView,
+    EventSearchView,
     EventSolutionView,
     ParticipantEventsView,
     RegisterOnEventView,
@@ -21,6 +24,16 @@ urlpatterns = [
         view=EventListView.as_view(),
         name='events_list',
     ),
+    path(
+        route='events/page/',
+        view=EventListPageView.as_view(),
+        name='events_list_page',
+    ),
+    path(
+        route='events/search/',
+        view=EventSearchView.as_view(),
+        name='events_search',
+    ),
     path(
         route='events/participant/',
         view=ParticipantEventsView.as_view(),
@@ -36,6 +49,11 @@ urlpatterns = [
         view=EventArchiveView.as_view(),
         name='events_archive',
     ),
+    path(
+        route='events/archive/page/',
+        view=EventArchivePageView.as_view(),
+        name='events_archive_page',
+    ),
     path(
         route='event/<slug:slug>/',
         view=EventDetailView.as_view(),
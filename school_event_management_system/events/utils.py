@@ -1,3 +1,5 @@
+from zipfile import ZipFile
+
 from openpyxl import Workbook
 from openpyxl.styles import Font
 
@@ -13,6 +15,22 @@ from events.services import (
 )
 
 
+def get_event_excel_path(event) -> str:
+    """Path of the excel table written by `export_event_to_excel`"""
+    return f'media/event_{event.id}.xlsx'
+
+
+def get_event_excel_filename(event) -> str:
+    return f'{event.slug}_spiski_uchastnikov.xlsx'
+
+
+def add_events_to_zip(archive: ZipFile, events) -> None:
+    """Export participants data of `events` to excel tables inside `archive`"""
+    for event in events:
+        export_event_to_excel(event=event)
+        archive.write(get_event_excel_path(event), arcname=get_event_excel_filename(event))
+
+
 def export_event_to_excel(event) -> None:
     """Export participants data to excel table"""
     if event.type == 'Индивидуальное':
@@ -96,7 +114,7 @@ def create_workbook_for_individual_event(event):
                     participant.user.profile.year_of_study,
                 )
 
-    wb.save(f'media/event_{event.id}.xlsx')
+    wb.save(get_event_excel_path(event))
 
 
 def create_workbook_for_team_event(event):
@@ -191,4 +209,4 @@ def create_workbook_for_team_event(event):
                     solution.subject if solution else '',
                 )
 
-    wb.save(f'media/event_{event.id}.xlsx')
+    wb.save(get_event_excel_path(event))
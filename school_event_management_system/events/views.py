@@ -3,16 +3,23 @@ from io import BytesIO
 
 import qrcode
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.paginator import Paginator
 from django.db.models import QuerySet
-from django.http import HttpRequest, HttpResponse
+from django.http import Http404, HttpRequest, HttpResponse
 from django.shortcuts import redirect
 from django.urls import reverse
+from django.utils.decorators import method_decorator
 from django.views.generic import View
 from django.views.generic.base import TemplateResponseMixin
 
 from accounts.services import get_user_by_fio
+from common.mixins import AnonymousConditionalGetMixin, RateLimitMixin
+from common.pagination import InvalidCursorError
+from common.routers import use_replica
+from events.exceptions import EventRegistrationError
 from events.forms import (
     ParticipantForm,
     SolutionForm,
@@ -28,30 +35,36 @@ from events.services import (
     change_team_school_class,
     change_team_supervisor,
     create_initial_data_for_team_participants_form,
-    create_team,
-    disband_team_participants,
     get_event_by_slug,
     get_event_participant,
     get_event_task,
+    get_event_updated_at,
+    get_events_etag,
     get_events_where_user_are_participant,
     get_events_where_user_are_supervisor,
     get_participant_by_id,
     get_participant_solution,
     get_participants_with_supervisor,
     get_published_events,
+    get_published_events_page,
     get_published_not_archived_events,
+    get_published_not_archived_events_page,
     get_team_by_id,
     get_team_solution,
     get_teams_with_supervisor,
     get_user_diplomas,
     is_user_participation_of_event,
-    join_event,
-    join_team,
+    register_participant_on_event,
+    register_team_on_event,
+    replace_team_participants,
+    search_published_events,
 )
-from events.utils import export_event_to_excel
+from events.utils import export_event_to_excel, get_event_excel_filename, get_event_excel_path
 
 
+@method_decorator(use_replica, name='dispatch')
 class EventListView(
+    AnonymousConditionalGetMixin,
     TemplateResponseMixin,
     View,
 ):
@@ -59,15 +72,34 @@ class EventListView(
 
     template_name = 'events/events_list.html'
 
+    def get_etag(self, request: HttpRequest, *args, **kwargs) -> str:
+        return get_events_etag(get_published_not_archived_events())
+
+    def get_page(self, cursor: str | None):
+        return get_published_not_archived_events_page(cursor=cursor)
+
     def get(self, request: HttpRequest, *args, **kwargs):
+        try:
+            page = self.get_page(cursor=request.GET.get('cursor'))
+        except InvalidCursorError:
+            raise Http404
         return self.render_to_response(
             context={
-                'events': get_published_not_archived_events().order_by('date_of_starting_event'),
+                'events': page.object_list,
+                'page': page,
             },
         )
 
 
+class EventListPageView(EventListView):
+    """Следующая страница списка событий (фрагмент для бесконечной прокрутки)."""
+
+    template_name = 'events/includes/events_list_page.html'
+
+
+@method_decorator(use_replica, name='dispatch')
 class EventArchiveView(
+    AnonymousConditionalGetMixin,
     TemplateResponseMixin,
     View,
 ):
@@ -75,15 +107,71 @@ class EventArchiveView(
 
     template_name = 'events/events_archive.html'
 
+    def get_etag(self, request: HttpRequest, *args, **kwargs) -> str:
+        return get_events_etag(get_published_events())
+
+    def get_page(self, cursor: str | None):
+        return get_published_events_page(cursor=cursor)
+
+    def get(self, request: HttpRequest, *args, **kwargs):
+        try:
+            page = self.get_page(cursor=request.GET.get('cursor'))
+        except InvalidCursorError:
+            raise Http404
+        return self.render_to_response(
+            context={
+                'events': page.object_list,
+                'page': page,
+            },
+        )
+
+
+class EventArchivePageView(EventArchiveView):
+    """Следующая страница архива событий (фрагмент для бесконечной прокрутки)."""
+
+    template_name = 'events/includes/events_archive_page.html'
+
+
+@method_decorator(use_replica, name='get')
+class EventSearchView(
+    TemplateResponseMixin,
+    View,
+):
+    """Поиск событий."""
+
+    template_name = 'events/events_search.html'
+
     def get(self, request: HttpRequest, *args, **kwargs):
+        query = request.GET.get('q', '')[:200]
+        paginator = Paginator(
+            object_list=search_published_events(query=query),
+            per_page=settings.EVENTS_PAGE_SIZE,
+        )
+        page = paginator.get_page(request.GET.get('page'))
         return self.render_to_response(
             context={
-                'events': get_published_events(),
+                'query': query,
+                'page': page,
+                'events': page.object_list,
             },
         )
 
 
+class EventConditionalGetMixin(AnonymousConditionalGetMixin):
+    """Условные ответы для страниц одного события: они меняются вместе с `Event.updated_at`."""
+
+    def get_etag(self, request: HttpRequest, slug: str, *args, **kwargs) -> str | None:
+        updated_at = self.get_last_modified(request, slug)
+        return f'{slug}-{updated_at.timestamp()}' if updated_at else None
+
+    def get_last_modified(self, request: HttpRequest, slug: str, *args, **kwargs):
+        if not hasattr(self, '_updated_at'):
+            self._updated_at = get_event_updated_at(slug=slug)
+        return self._updated_at
+
+
 class EventDetailView(
+    EventConditionalGetMixin,
     TemplateResponseMixin,
     View,
 ):
@@ -120,6 +208,7 @@ class EventDetailView(
 
 
 class EventQRCodeView(
+    EventConditionalGetMixin,
     TemplateResponseMixin,
     View,
 ):
@@ -172,11 +261,13 @@ class EventQRCodeView(
 
 class RegisterOnEventView(
     LoginRequiredMixin,
+    RateLimitMixin,
     TemplateResponseMixin,
     View,
 ):
     """Просмотр регистрации на мероприятие."""
 
+    ratelimit_scope = 'register_on_event'
     template_name = 'events/register_on_event.html'
     team_form: TeamForm = None
     supervisor_form: SupervisorForm = None
@@ -238,8 +329,14 @@ class RegisterOnEventView(
             if self.supervisor_form.is_valid() and self.participant_form.is_valid():
                 supervisor = get_user_by_fio(fio=self.supervisor_form.cleaned_data['fio'])
                 if request.user.role == 'ученик':
-                    join_event(
-                        user=request.user,
+                    user = request.user
+                else:
+                    user = get_user_by_fio(
+                        fio=self.participant_form.cleaned_data['participant_fio'],
+                    )
+                try:
+                    register_participant_on_event(
+                        user=user,
                         supervisor=supervisor,
                         supervisor_email=(
                             supervisor.email if supervisor else self
@@ -255,86 +352,23 @@ class RegisterOnEventView(
                         ),
                         event=self.event,
                     )
+                except EventRegistrationError as error:
+                    messages.add_message(request, messages.ERROR, str(error))
                 else:
-                    join_event(
-                        user=get_user_by_fio(
-                            fio=self.participant_form.cleaned_data['participant_fio'],
-                        ),
-                        supervisor=supervisor,
-                        supervisor_email=(
-                            supervisor.email if supervisor else self
-                            .supervisor_form.cleaned_data['email']
-                        ),
-                        supervisor_fio=(
-                            supervisor.full_name if supervisor else self
-                            .supervisor_form.cleaned_data['fio']
-                        ),
-                        supervisor_phone_number=(
-                            supervisor.profile.phone_number if supervisor else self
-                            .supervisor_form.cleaned_data['phone_number']
-                        ),
-                        event=self.event,
+                    messages.add_message(
+                        request,
+                        messages.SUCCESS,
+                        'Участник успешно зарегистрирован на мероприятии',
                     )
-                messages.add_message(
-                    request,
-                    messages.SUCCESS,
-                    'Участник успешно зарегистрирован на мероприятии',
-                )
-                return redirect('edit_participant_event', slug=self.event.slug)
+                    return redirect('edit_participant_event', slug=self.event.slug)
         elif (
-            self.event.type == 'Командное' or
-            self.event.type == 'Индивидуальное, коллективное'
+            self.team_participants_form.is_valid() and
+            self.team_form.is_valid() and
+            self.supervisor_form.is_valid()
         ):
-            if (
-                self.team_participants_form.is_valid() and
-                self.team_form.is_valid() and
-                self.supervisor_form.is_valid()
-            ):
-                supervisor = get_user_by_fio(fio=self.supervisor_form.cleaned_data['fio'])
-                team = create_team(
-                    event=self.event,
-                    name=self.team_form.cleaned_data['name'],
-                    supervisor=supervisor,
-                    supervisor_email=(
-                        supervisor.email if supervisor else self
-                        .supervisor_form.cleaned_data['email']
-                    ),
-                    supervisor_fio=(
-                        supervisor.full_name if supervisor else self
-                        .supervisor_form.cleaned_data['fio']
-                    ),
-                    supervisor_phone_number=(
-                        supervisor.profile.phone_number if supervisor else self.
-                        supervisor_form.cleaned_data['phone_number']
-                    ),
-                )
-                for field_name, field in self.team_participants_form.fields.items():
-                    if field_name.startswith('participant_'):
-                        fio = self.team_participants_form.cleaned_data[field_name]
-                        if fio:
-                            user = get_user_by_fio(
-                                fio=fio,
-                            )
-                            join_team(
-                                event=self.event,
-                                user=user,
-                                team=team,
-                                fio=fio,
-                            )
-                messages.add_message(
-                    request,
-                    messages.SUCCESS,
-                    f"Комманда \'{team.name}\' успешно зарегистрирована на мероприятии",
-                )
-                return redirect('edit_participant_event', slug=self.event.slug)
-        else:
-            if (
-                self.team_participants_form.is_valid() and
-                self.team_form.is_valid() and
-                self.supervisor_form.is_valid()
-            ):
-                supervisor = get_user_by_fio(fio=self.supervisor_form.cleaned_data['fio'])
-                team = create_team(
+            supervisor = get_user_by_fio(fio=self.supervisor_form.cleaned_data['fio'])
+            try:
+                team = register_team_on_event(
                     event=self.event,
                     name=self.team_form.cleaned_data['name'],
                     supervisor=supervisor,
@@ -350,21 +384,15 @@ class RegisterOnEventView(
                         supervisor.profile.phone_number if supervisor else self
                         .supervisor_form.cleaned_data['phone_number']
                     ),
-                    school_class=self.team_form.cleaned_data['school_class'],
+                    school_class=(
+                        self.team_form.cleaned_data['school_class']
+                        if self.event.type == 'Командное от классов' else ''
+                    ),
+                    participants=self.team_participants_form.get_participants(),
                 )
-                for field_name, field in self.team_participants_form.fields.items():
-                    if field_name.startswith('participant_'):
-                        fio = self.team_participants_form.cleaned_data[field_name]
-                        if fio:
-                            user = get_user_by_fio(
-                                fio=fio,
-                            )
-                            join_team(
-                                event=self.event,
-                                user=user,
-                                team=team,
-                                fio=fio,
-                            )
+            except EventRegistrationError as error:
+                messages.add_message(request, messages.ERROR, str(error))
+            else:
                 messages.add_message(
                     request,
                     messages.SUCCESS,
@@ -610,20 +638,14 @@ class EditParticipantEventView(
                             team=self.participant.team,
                             name=self.team_form.cleaned_data['name'],
                         )
-                    disband_team_participants(team=self.participant.team)
-                    for field_name, field in self.team_participants_form.fields.items():
-                        if field_name.startswith('participant_'):
-                            fio = self.team_participants_form.cleaned_data[field_name]
-                            if fio:
-                                user = get_user_by_fio(
-                                    fio=fio,
-                                )
-                                join_team(
-                                    event=self.event,
-                                    user=user,
-                                    team=self.participant.team,
-                                    fio=fio,
-                                )
+                    try:
+                        replace_team_participants(
+                            team=self.participant.team,
+                            event=self.event,
+                            participants=self.team_participants_form.get_participants(),
+                        )
+                    except EventRegistrationError as error:
+                        messages.add_message(request, messages.ERROR, str(error))
             else:
                 if (
                     self.team_participants_form.is_valid() and
@@ -667,20 +689,14 @@ class EditParticipantEventView(
                             team=self.participant.team,
                             name=self.team_form.cleaned_data['name'],
                         )
-                    disband_team_participants(team=self.participant.team)
-                    for field_name, field in self.team_participants_form.fields.items():
-                        if field_name.startswith('participant_'):
-                            fio = self.team_participants_form.cleaned_data[field_name]
-                            if fio:
-                                user = get_user_by_fio(
-                                    fio=fio,
-                                )
-                                join_team(
-                                    event=self.event,
-                                    user=user,
-                                    team=self.participant.team,
-                                    fio=fio,
-                                )
+                    try:
+                        replace_team_participants(
+                            team=self.participant.team,
+                            event=self.event,
+                            participants=self.team_participants_form.get_participants(),
+                        )
+                    except EventRegistrationError as error:
+                        messages.add_message(request, messages.ERROR, str(error))
         else:
             if self.event.type == 'Индивидуальное':
                 if self.supervisor_form.is_valid():
@@ -721,20 +737,14 @@ class EditParticipantEventView(
                             team=self.team,
                             name=self.team_form.cleaned_data['name'],
                         )
-                    disband_team_participants(team=self.team)
-                    for field_name, field in self.team_participants_form.fields.items():
-                        if field_name.startswith('participant_'):
-                            fio = self.team_participants_form.cleaned_data[field_name]
-                            if fio:
-                                user = get_user_by_fio(
-                                    fio=fio,
-                                )
-                                join_team(
-                                    event=self.event,
-                                    user=user,
-                                    team=self.team,
-                                    fio=fio,
-                                )
+                    try:
+                        replace_team_participants(
+                            team=self.team,
+                            event=self.event,
+                            participants=self.team_participants_form.get_participants(),
+                        )
+                    except EventRegistrationError as error:
+                        messages.add_message(request, messages.ERROR, str(error))
             else:
                 if (
                     self.team_participants_form.is_valid() and
@@ -767,19 +777,14 @@ class EditParticipantEventView(
                             team=self.team,
                             name=self.team_form.cleaned_data['name'],
                         )
-                    disband_team_participants(team=self.team)
-                    for field_name, field in self.team_participants_form.fields.items():
-                        if field_name.startswith('participant_'):
-                            fio = self.team_participants_form.cleaned_data[field_name]
-                            user = get_user_by_fio(
-                                fio=fio,
-                            )
-                            join_team(
-                                event=self.event,
-                                user=user,
-                                team=self.team,
-                                fio=fio,
-                            )
+                    try:
+                        replace_team_participants(
+                            team=self.team,
+                            event=self.event,
+                            participants=self.team_participants_form.get_participants(),
+                        )
+                    except EventRegistrationError as error:
+                        messages.add_message(request, messages.ERROR, str(error))
 
         return self.render_to_response(
             context={
@@ -799,6 +804,7 @@ class EditParticipantEventView(
         )
 
 
+@method_decorator(use_replica, name='get')
 class DiplomasListView(
     LoginRequiredMixin,
     TemplateResponseMixin,
@@ -984,6 +990,7 @@ class SupervisorEventsView(
         )
 
 
+@use_replica
 def export_event_participants(request, slug):
     if not request.user.is_superuser and not request.user.is_staff:
         return HttpResponse('У вас нет доступа', status=302)
@@ -994,11 +1001,11 @@ def export_event_participants(request, slug):
 
     export_event_to_excel(event)
 
-    file_path = f'media/event_{event.id}.xlsx'
+    file_path = get_event_excel_path(event)
     with open(file_path, 'rb') as excel_file:
         response = HttpResponse(excel_file.read())
         response['Content-Disposition'] = \
-            f'attachment; filename={event.slug}_spiski_uchastnikov.xlsx'
+            f'attachment; filename={get_event_excel_filename(event)}'
         response['Content-Type'] = \
             'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
 
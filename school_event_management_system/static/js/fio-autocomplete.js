@@ -0,0 +1,57 @@
+/*!
+ * FIO autocomplete for registration forms.
+ * Inputs with `data-fio-autocomplete` get a <datalist> filled with suggestions
+ * from that URL (`?q=<typed text>&role=<data-fio-autocomplete-role>`).
+ */
+
+(() => {
+  'use strict'
+
+  const minimumLength = 2
+  const delay = 200
+
+  const attach = (input, index) => {
+    const datalist = document.createElement('datalist')
+    datalist.id = `fio-autocomplete-${index}`
+    input.setAttribute('list', datalist.id)
+    input.after(datalist)
+
+    let timer = null
+    let controller = null
+
+    input.addEventListener('input', () => {
+      clearTimeout(timer)
+      const query = input.value.trim()
+      if (query.length < minimumLength) {
+        return
+      }
+      timer = setTimeout(async () => {
+        if (controller) {
+          controller.abort()
+        }
+        controller = new AbortController()
+        const url = new URL(input.dataset.fioAutocomplete, window.location.origin)
+        url.searchParams.set('q', query)
+        if (input.dataset.fioAutocompleteRole) {
+          url.searchParams.set('role', input.dataset.fioAutocompleteRole)
+        }
+        try {
+          const response = await fetch(url, { signal: controller.signal })
+          if (!response.ok) {
+            return
+          }
+          const { results } = await response.json()
+          datalist.replaceChildren(...results.map((fio) => new Option(fio)))
+        } catch (error) {
+          if (error.name !== 'AbortError') {
+            throw error
+          }
+        }
+      }, delay)
+    })
+  }
+
+  window.addEventListener('DOMContentLoaded', () => {
+    document.querySelectorAll('input[data-fio-autocomplete]').forEach(attach)
+  })
+})()
@@ -0,0 +1,44 @@
+/*!
+ * Infinite scroll for keyset-paginated lists.
+ * An element with `data-infinite-scroll-next` is replaced by the next page
+ * fragment loaded from its URL as soon as it becomes visible.
+ */
+
+(() => {
+  'use strict'
+
+  const selector = '[data-infinite-scroll-next]'
+
+  if (!('IntersectionObserver' in window)) {
+    return
+  }
+
+  const loadNextPage = async (sentinel, observer) => {
+    observer.unobserve(sentinel)
+    const response = await fetch(sentinel.dataset.infiniteScrollNext, {
+      headers: { 'X-Requested-With': 'XMLHttpRequest' }
+    })
+    if (!response.ok) {
+      return
+    }
+    sentinel.insertAdjacentHTML('afterend', await response.text())
+    const next = sentinel.parentElement.querySelector(`${selector}:not([data-loaded])`)
+    sentinel.remove()
+    if (next && next !== sentinel) {
+      observer.observe(next)
+    }
+  }
+
+  const observer = new IntersectionObserver((entries) => {
+    entries.forEach((entry) => {
+      if (entry.isIntersecting) {
+        entry.target.dataset.loaded = 'true'
+        loadNextPage(entry.target, observer)
+      }
+    })
+  }, { rootMargin: '400px' })
+
+  window.addEventListener('DOMContentLoaded', () => {
+    document.querySelectorAll(selector).forEach((sentinel) => observer.observe(sentinel))
+  })
+})()